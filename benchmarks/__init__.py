@@ -0,0 +1,9 @@
+"""Benchmarks for the near-Earth object explorer.
+
+Each module in this package can be run from the project root, for example:
+
+    $ python3 -m benchmarks.cd_to_datetime
+
+The `run` module is the benchmark suite of the load, link, query and write
+phases, which saves its results for comparison with a baseline.
+"""
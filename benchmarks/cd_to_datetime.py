@@ -0,0 +1,54 @@
+"""Compare `cd_to_datetime` with a plain `datetime.strptime` on the test data.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.cd_to_datetime
+
+Both parsers are timed over every `cd` field of `tests/test-cad-2020.json`, and
+the best of several repetitions is reported.
+"""
+import datetime
+import json
+import pathlib
+import timeit
+
+from helpers import cd_to_datetime, _cd_date
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+TEST_CAD_FILE = PROJECT_ROOT / 'tests' / 'test-cad-2020.json'
+
+
+def strptime_cd_to_datetime(calendar_date):
+    """Convert a calendar date the way `cd_to_datetime` used to."""
+    return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+
+
+def main(repeat=5):
+    """Time both parsers, and print the results."""
+    with open(TEST_CAD_FILE) as infile:
+        calendar_dates = [row[3] for row in json.load(infile)['data']]
+
+    def run(parse):
+        for calendar_date in calendar_dates:
+            parse(calendar_date)
+
+    # Warm up the fast path's memo of dates, as a full data load would have.
+    run(cd_to_datetime)
+    baseline = min(timeit.repeat(lambda: run(strptime_cd_to_datetime), number=1, repeat=repeat))
+    warm = min(timeit.repeat(lambda: run(cd_to_datetime), number=1, repeat=repeat))
+    cold = []
+    for _ in range(repeat):
+        _cd_date.cache_clear()
+        cold.append(timeit.timeit(lambda: run(cd_to_datetime), number=1))
+
+    count = len(calendar_dates)
+    print(f"Parsed {count} calendar dates from {TEST_CAD_FILE.name}.")
+    print(f"  datetime.strptime:      {baseline * 1e3:8.2f} ms ({baseline / count * 1e6:.2f} us/date)")
+    print(f"  cd_to_datetime (cold):  {min(cold) * 1e3:8.2f} ms ({min(cold) / count * 1e6:.2f} us/date), "
+          f"{baseline / min(cold):.1f}x faster")
+    print(f"  cd_to_datetime (warm):  {warm * 1e3:8.2f} ms ({warm / count * 1e6:.2f} us/date), "
+          f"{baseline / warm:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
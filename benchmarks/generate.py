@@ -0,0 +1,306 @@
+"""Generate large synthetic data files of NEOs and close approaches.
+
+To generate a dataset from the project root, run, for example:
+
+    $ python3 -m benchmarks.generate --approaches 10000000 --seed 1 --output data/synthetic
+
+This writes `neos.csv` and `cad.json` to the output folder, in the formats of
+NASA's small-body database query and close approach data API, which can then be
+loaded with `--neofile` and `--cadfile`:
+
+    $ python3 main.py --neofile data/synthetic/neos.csv --cadfile data/synthetic/cad.json query --limit 5
+
+The datasets imitate the distributions of the real data:
+
+- The number of approaches of each NEO is heavy-tailed: each NEO is given a
+  log-normally distributed weight, and approaches are assigned to NEOs in
+  proportion to their weights, so some NEOs have no approaches at all.
+- About a third of the NEOs are numbered, and a few of those have names. The
+  rest have provisional designations, such as `2004 MN4`.
+- A few percent of the NEOs have known diameters (with albedos). NEOs are
+  potentially hazardous if they're bright (H <= 22) and their orbits come close
+  to Earth's (MOID <= 0.05 au), as in the real definition, which makes about a
+  tenth of them hazardous; a few (like comets) have no hazardous flag.
+- The approach times are spread uniformly over the date range (by default from
+  1900 through 2200), and the approaches are in chronological order.
+- Approach distances are at most 0.5 au, with a median near 0.2 au, and
+  velocities are log-normally distributed around 11.5 km/s.
+
+The output is fully determined by the seed and the sizes. Both files are
+written while they're generated, and the approach times are generated in
+sorted order, so tens of millions of approaches take no more memory than
+the NEOs do.
+"""
+import argparse
+import bisect
+import csv
+import datetime
+import itertools
+import json
+import math
+import pathlib
+import random
+
+# The columns of the NEO file, as in NASA's small-body database query results.
+NEO_FIELDS = (
+    'id', 'spkid', 'full_name', 'pdes', 'name', 'prefix', 'neo', 'pha', 'H', 'G', 'M1', 'M2', 'K1', 'K2',
+    'PC', 'diameter', 'extent', 'albedo', 'rot_per', 'GM', 'BV', 'UB', 'IR', 'spec_B', 'spec_T', 'H_sigma',
+    'diameter_sigma', 'orbit_id', 'epoch', 'epoch_mjd', 'epoch_cal', 'equinox', 'e', 'a', 'q', 'i', 'om',
+    'w', 'ma', 'ad', 'n', 'tp', 'tp_cal', 'per', 'per_y', 'moid', 'moid_ld', 'moid_jup', 't_jup', 'sigma_e',
+    'sigma_a', 'sigma_q', 'sigma_i', 'sigma_om', 'sigma_w', 'sigma_ma', 'sigma_ad', 'sigma_n', 'sigma_tp',
+    'sigma_per', 'class', 'producer', 'data_arc', 'first_obs', 'last_obs', 'n_obs_used', 'n_del_obs_used',
+    'n_dop_obs_used', 'condition_code', 'rms', 'two_body', 'A1', 'A2', 'A3', 'DT',
+)
+
+# The fields of each close approach, as in NASA's close approach data API.
+CAD_FIELDS = ('des', 'orbit_id', 'jd', 'cd', 'dist', 'dist_min', 'dist_max', 'v_rel', 'v_inf', 't_sigma_f', 'h')
+
+# The average number of approaches per NEO in the real data, used if only one size is given.
+APPROACHES_PER_NEO = 17
+
+_NUMBERED = 0.35
+_NAMED = 0.05
+_DIAMETER = 0.05
+_UNKNOWN_HAZARD = 0.002
+_CLASSES = ('APO', 'AMO', 'ATE', 'IEO')
+_CLASS_WEIGHTS = (0.55, 0.35, 0.09, 0.01)
+
+# The letters of provisional designations, which skip I (and Z for the half-month).
+_HALF_MONTHS = 'ABCDEFGHJKLMNOPQRSTUVWXY'
+_ORDERS = 'ABCDEFGHJKLMNOPQRSTUVWXYZ'
+_SYLLABLES = ('ka', 'ro', 'mi', 'tu', 'sel', 'an', 'dor', 'e', 'li', 'vo', 'nar', 'is', 'tha', 'pe', 'ul')
+
+# The Julian date of the Unix epoch.
+_EPOCH_JD = 2440587.5
+_EPOCH_DAY = datetime.date(1970, 1, 1).toordinal()
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# The number of approaches whose NEOs are chosen at once.
+_BATCH_SIZE = 1 << 14
+
+
+def _provisional(index):
+    """Build the `index`th distinct provisional designation, such as `2004 MN4`."""
+    index, order = divmod(index, len(_ORDERS))
+    index, half_month = divmod(index, len(_HALF_MONTHS))
+    cycle, year = divmod(index, 35)
+    return f"{1990 + year} {_HALF_MONTHS[half_month]}{_ORDERS[order]}{cycle if cycle else ''}"
+
+
+def _name(rng, names):
+    """Make up a name that's not yet in a set of names, and add it to the set."""
+    while True:
+        name = ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if name not in names:
+            names.add(name)
+            return name
+
+
+def generate_neos(rng, count):
+    """Generate the rows of an NEO file.
+
+    :param rng: A `random.Random`.
+    :param count: The number of NEOs.
+    :yield: For each NEO, a dictionary of the non-empty columns of its row, plus its weight.
+    """
+    names = set()
+    number = 1000
+    provisional = 0
+    for _ in range(count):
+        h = rng.triangular(14.0, 30.0, 25.0)
+        moid = rng.expovariate(1 / 0.17)
+        row = {
+            'neo': 'Y',
+            'H': f"{h:.1f}",
+            'moid': f"{moid:.6f}",
+            'class': rng.choices(_CLASSES, _CLASS_WEIGHTS)[0],
+            'pha': 'Y' if h <= 22 and moid <= 0.05 else 'N',
+            'weight': rng.lognormvariate(0.0, 1.0),
+        }
+        if rng.random() < _NUMBERED:
+            number += rng.randint(1, 40)
+            row['pdes'] = str(number)
+            row['spkid'] = str(2000000 + number)
+            row['id'] = f"a{number:07d}"
+            if rng.random() < _NAMED:
+                row['name'] = _name(rng, names)
+                row['full_name'] = f"{number:>7} {row['name']}"
+            else:
+                row['full_name'] = f"{number:>7} ({_provisional(provisional)})"
+                provisional += 1
+        else:
+            row['pdes'] = _provisional(provisional)
+            provisional += 1
+            row['spkid'] = str(3000000 + provisional)
+            row['id'] = f"b{provisional:07d}"
+            row['full_name'] = f"       ({row['pdes']})"
+        if rng.random() < _DIAMETER:
+            albedo = rng.uniform(0.03, 0.45)
+            row['albedo'] = f"{albedo:.3f}"
+            row['diameter'] = f"{1329 / math.sqrt(albedo) * 10 ** (-h / 5):.3f}"
+        if rng.random() < _UNKNOWN_HAZARD:
+            row['pha'] = ''
+        yield row
+
+
+def _sorted_uniforms(rng, count):
+    """Generate `count` independent uniform random numbers in [0, 1), in ascending order.
+
+    The largest of k uniform numbers is distributed as U ** (1 / k), so the numbers
+    are generated from the largest down, and then reflected, without storing them.
+
+    :param rng: A `random.Random`.
+    :param count: The number of numbers.
+    :yield: The numbers, in ascending order.
+    """
+    current = 1.0
+    for remaining in range(count, 0, -1):
+        current *= rng.random() ** (1 / remaining)
+        yield 1.0 - current
+
+
+def _calendar_date(day):
+    """Format a day ordinal as in the close approach data, such as `2020-Jan-01`."""
+    date = datetime.date.fromordinal(day)
+    return f"{date.year:04d}-{_MONTHS[date.month - 1]}-{date.day:02d}"
+
+
+def generate_approaches(rng, neos, count, start, stop):
+    """Generate the rows of a close approach file, in chronological order.
+
+    :param rng: A `random.Random`.
+    :param neos: The rows of the NEOs, as from `generate_neos`.
+    :param count: The number of approaches.
+    :param start: The first date of the approaches.
+    :param stop: The date after the last date of the approaches.
+    :yield: For each approach, a list of the values of its `CAD_FIELDS`.
+    """
+    cumulative = list(itertools.accumulate(neo['weight'] for neo in neos))
+    first = (start.toordinal() - _EPOCH_DAY) * 1440
+    span = (stop.toordinal() - start.toordinal()) * 1440
+    times = _sorted_uniforms(rng, count)
+    day, calendar_date = None, None
+    for batch in range(0, count, _BATCH_SIZE):
+        size = min(_BATCH_SIZE, count - batch)
+        total = cumulative[-1]
+        chosen = [bisect.bisect_right(cumulative, rng.random() * total) for _ in range(size)]
+        for index, u in zip(chosen, itertools.islice(times, size)):
+            neo = neos[min(index, len(neos) - 1)]
+            minutes = first + min(int(u * span), span - 1)
+            if minutes // 1440 + _EPOCH_DAY != day:
+                day = minutes // 1440 + _EPOCH_DAY
+                calendar_date = _calendar_date(day)
+            minute = minutes % 1440
+            seconds = rng.random() * 60
+            distance = 0.5 * rng.random() ** 1.3
+            spread = distance * rng.uniform(0.0, 0.01)
+            velocity = max(0.3, rng.lognormvariate(math.log(11.5), 0.5))
+            yield [
+                neo['pdes'],
+                str(rng.randint(1, 300)),
+                f"{_EPOCH_JD + (minutes + seconds / 60) / 1440:.9f}",
+                f"{calendar_date} {minute // 60:02d}:{minute % 60:02d}",
+                repr(distance),
+                repr(distance - spread),
+                repr(distance + spread),
+                repr(velocity),
+                repr(velocity * rng.uniform(0.98, 1.0)),
+                '< 00:01' if rng.random() < 0.5 else f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+                neo['H'],
+            ]
+
+
+def write_neos(neos, path):
+    """Write the rows of NEOs to a CSV file.
+
+    :param neos: The rows of the NEOs, as from `generate_neos`.
+    :param path: The path of the CSV file.
+    """
+    with open(path, 'w', newline='') as outfile:
+        writer = csv.DictWriter(outfile, NEO_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(neos)
+
+
+def write_approaches(rows, count, path):
+    """Write the rows of close approaches to a JSON file, one at a time.
+
+    :param rows: An iterable of the values of each approach's `CAD_FIELDS`, all strings
+        without quotes or backslashes.
+    :param count: The number of rows.
+    :param path: The path of the JSON file.
+    """
+    header = json.dumps({
+        'signature': {'source': 'NASA/JPL SBDB Close Approach Data API', 'version': '1.1'},
+        'count': str(count),
+        'fields': list(CAD_FIELDS),
+    })
+    with open(path, 'w') as outfile:
+        # Write the header without its closing brace, followed by the `data` array.
+        outfile.write(header[:-1] + ', "data": [\n')
+        separator = ''
+        for row in rows:
+            outfile.write(separator)
+            outfile.write('["' + '","'.join(row) + '"]')
+            separator = ',\n'
+        outfile.write(']}\n')
+
+
+def generate(output, approaches, neos=None, seed=0, start_year=1900, end_year=2200):
+    """Generate an NEO file and a close approach file.
+
+    :param output: The folder in which to write `neos.csv` and `cad.json`.
+    :param approaches: The number of close approaches.
+    :param neos: The number of NEOs, or None for one per `APPROACHES_PER_NEO` approaches.
+    :param seed: The seed of the random number generator.
+    :param start_year: The year of the first approaches.
+    :param end_year: The year of the last approaches.
+    :return: The paths of the NEO file and of the close approach file.
+    """
+    if neos is None:
+        neos = max(1, approaches // APPROACHES_PER_NEO)
+    rng = random.Random(seed)
+    output = pathlib.Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    neofile, cadfile = output / 'neos.csv', output / 'cad.json'
+
+    rows = list(generate_neos(rng, neos))
+    write_neos(rows, neofile)
+    write_approaches(generate_approaches(rng, rows, approaches, datetime.date(start_year, 1, 1),
+                                         datetime.date(end_year + 1, 1, 1)),
+                     approaches, cadfile)
+    return neofile, cadfile
+
+
+def make_parser():
+    """Create an ArgumentParser for this script."""
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic NEO and close approach data files for stress testing."
+    )
+    parser.add_argument('--approaches', type=int, default=1000000, metavar='N',
+                        help="The number of close approaches. Defaults to 1000000.")
+    parser.add_argument('--neos', type=int, metavar='N',
+                        help=f"The number of NEOs. Defaults to one per {APPROACHES_PER_NEO} approaches.")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="The seed of the random number generator. Defaults to 0.")
+    parser.add_argument('--start-year', type=int, default=1900,
+                        help="The year of the first approaches. Defaults to 1900.")
+    parser.add_argument('--end-year', type=int, default=2200,
+                        help="The year of the last approaches. Defaults to 2200.")
+    parser.add_argument('--output', type=pathlib.Path, default=pathlib.Path('synthetic'),
+                        help="The folder in which to write neos.csv and cad.json. Defaults to 'synthetic'.")
+    return parser
+
+
+def main():
+    """Generate the data files, and print where they were written."""
+    args = make_parser().parse_args()
+    if args.end_year < args.start_year:
+        make_parser().error("--end-year must not precede --start-year.")
+    neofile, cadfile = generate(args.output, args.approaches, args.neos, args.seed,
+                                args.start_year, args.end_year)
+    print(f"Wrote {neofile} and {cadfile}.")
+
+
+if __name__ == '__main__':
+    main()
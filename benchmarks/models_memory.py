@@ -0,0 +1,60 @@
+"""Compare the memory footprint of the slotted models with per-instance dicts.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.models_memory
+
+The test data is loaded and linked twice: once with the `NearEarthObject` and
+`CloseApproach` classes from `models`, and once with otherwise-identical
+copies of those classes that store their attributes in a `__dict__`. The
+memory held by each database (as traced by `tracemalloc`) is reported.
+"""
+import gc
+import pathlib
+import tracemalloc
+import unittest.mock
+
+import extract
+from database import NEODatabase
+from models import NearEarthObject, CloseApproach
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+TEST_NEO_FILE = PROJECT_ROOT / 'tests' / 'test-neos-2020.csv'
+TEST_CAD_FILE = PROJECT_ROOT / 'tests' / 'test-cad-2020.json'
+
+
+def unslotted(cls):
+    """Return a copy of a slotted class whose instances store attributes in a `__dict__`."""
+    namespace = {key: value for key, value in vars(cls).items()
+                 if key not in cls.__slots__ and key not in ('__slots__', '__dict__', '__weakref__')}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def measure():
+    """Load and link the test data, and return the number of bytes it holds."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        database = NEODatabase(extract.load_neos(TEST_NEO_FILE), extract.load_approaches(TEST_CAD_FILE))
+        gc.collect()
+        size, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del database
+    return size
+
+
+def main():
+    """Measure both variants of the models, and print the results."""
+    with unittest.mock.patch('extract.NearEarthObject', unslotted(NearEarthObject)), \
+            unittest.mock.patch('extract.CloseApproach', unslotted(CloseApproach)):
+        before = measure()
+    after = measure()
+
+    print(f"Loaded and linked {TEST_NEO_FILE.name} and {TEST_CAD_FILE.name}.")
+    print(f"  models with __dict__:   {before / 2**20:8.2f} MiB")
+    print(f"  models with __slots__:  {after / 2**20:8.2f} MiB ({1 - after / before:.0%} smaller)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""Time the load, link, query and write phases, and compare them with a baseline.
+
+To run the benchmark suite from the project root, run:
+
+    $ python3 -m benchmarks.run
+
+Each phase is timed on the test data (`tests/test-neos-2020.csv` and
+`tests/test-cad-2020.json`), and on the test data scaled up by replicating
+every NEO and close approach under new designations:
+
+- `load_neos` and `load_approaches` extract the data files.
+- `link` constructs an `NEODatabase` from freshly extracted objects.
+- `query:*` run the representative queries from the `main.py` docstring.
+- `write_csv` and `write_json` save every close approach to an output file.
+
+Larger datasets, spread over a wider range of dates, can be generated by
+`benchmarks.generate` with `--synthetic`, given numbers of close approaches:
+
+    $ python3 -m benchmarks.run --scale 1 --synthetic 100000 1000000 --repeat 3
+
+Every phase is run once to warm up, and then repeatedly, and the median and
+95th percentile of its run times are reported. The peak memory allocated by
+the phase is measured by `tracemalloc` in a separate, untimed run.
+
+The results can be saved as JSON, and compared with previously saved results:
+
+    $ python3 -m benchmarks.run --output baseline.json
+    $ python3 -m benchmarks.run --baseline baseline.json --tolerance 0.1
+
+When comparing, the script exits with a non-zero status if any phase's median
+run time regressed by more than the tolerance.
+"""
+import argparse
+import csv
+import datetime
+import functools
+import json
+import math
+import pathlib
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generate import generate
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from write import write_to_csv, write_to_json
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+TEST_NEO_FILE = PROJECT_ROOT / 'tests' / 'test-neos-2020.csv'
+TEST_CAD_FILE = PROJECT_ROOT / 'tests' / 'test-cad-2020.json'
+
+# The representative queries, named after their `main.py query` options.
+QUERIES = {
+    'all': {},
+    'date': {'date': datetime.date(1969, 7, 29)},
+    'month-close': {'start_date': datetime.date(2020, 1, 1), 'end_date': datetime.date(2020, 1, 31),
+                    'distance_max': 0.025},
+    'future-fast': {'start_date': datetime.date(2050, 1, 1), 'distance_min': 0.2, 'velocity_min': 50},
+    'day-large-hazardous': {'date': datetime.date(2020, 3, 14), 'velocity_max': 25, 'diameter_min': 0.5,
+                            'hazardous': True},
+    'small-not-hazardous': {'start_date': datetime.date(2000, 1, 1), 'diameter_max': 0.1, 'hazardous': False},
+    'hazardous-close-fast': {'hazardous': True, 'distance_max': 0.05, 'velocity_min': 30},
+}
+
+
+def scale_data(scale, root):
+    """Write the test data, replicated under new designations, to a folder.
+
+    Copy `k` of each NEO (for k > 0) has the designation and name of the NEO with a
+    `-k` suffix, and copy `k` of each close approach refers to copy `k` of its NEO.
+
+    :param scale: The number of copies of the test data.
+    :param root: The folder in which to write the data files.
+    :return: The paths of the NEO file and of the close approach file.
+    """
+    neofile, cadfile = root / f'neos-x{scale}.csv', root / f'cad-x{scale}.json'
+    with open(TEST_NEO_FILE, newline='') as infile:
+        reader = csv.reader(infile)
+        header = next(reader)
+        rows = list(reader)
+    pdes, name = header.index('pdes'), header.index('name')
+    with open(neofile, 'w', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(header)
+        for copy in range(scale):
+            for row in rows:
+                if copy:
+                    row = list(row)
+                    row[pdes] = f"{row[pdes]}-{copy}"
+                    row[name] = f"{row[name]}-{copy}" if row[name] else ''
+                writer.writerow(row)
+
+    with open(TEST_CAD_FILE) as infile:
+        contents = json.load(infile)
+    des = contents['fields'].index('des')
+    data = []
+    for copy in range(scale):
+        for row in contents['data']:
+            if copy:
+                row = list(row)
+                row[des] = f"{row[des]}-{copy}"
+            data.append(row)
+    contents['data'], contents['count'] = data, str(len(data))
+    with open(cadfile, 'w') as outfile:
+        json.dump(contents, outfile)
+    return neofile, cadfile
+
+
+def phases(neofile, cadfile, root):
+    """Define the phases to benchmark on a pair of data files.
+
+    Each phase is a pair of functions: one that prepares the phase's input,
+    untimed, and one that runs the phase on that input.
+
+    :param neofile: Path to the CSV file of near-Earth objects.
+    :param cadfile: Path to the JSON file of close approach data.
+    :param root: A folder for the output files.
+    :return: A dictionary mapping phase names to their setup and run functions.
+    """
+    database = NEODatabase(load_neos(neofile), load_approaches(cadfile))
+    approaches = list(database.query())
+
+    def no_setup():
+        return None
+
+    def fresh_objects():
+        return load_neos(neofile), load_approaches(cadfile)
+
+    defined = {
+        'load_neos': (no_setup, lambda _: load_neos(neofile)),
+        'load_approaches': (no_setup, lambda _: load_approaches(cadfile)),
+        'link': (fresh_objects, lambda objects: NEODatabase(*objects)),
+    }
+    for name, criteria in QUERIES.items():
+        filters = create_filters(**criteria)
+        defined[f'query:{name}'] = (no_setup, lambda _, filters=filters: list(database.query(filters)))
+    defined['write_csv'] = (no_setup, lambda _: write_to_csv(approaches, root / 'results.csv'))
+    defined['write_json'] = (no_setup, lambda _: write_to_json(approaches, root / 'results.json'))
+    return defined
+
+
+def percentile(values, fraction):
+    """Find a percentile of some values, by the nearest-rank method.
+
+    :param values: A non-empty collection of numbers.
+    :param fraction: The fraction of values at or below the percentile, between 0 and 1.
+    :return: The percentile.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(setup, run, repeat):
+    """Time a phase, and measure its peak memory.
+
+    :param setup: A function that prepares the input of the phase.
+    :param run: A function that runs the phase on its input.
+    :param repeat: The number of timed runs.
+    :return: A dictionary of the median and 95th percentile run times, in seconds,
+        and of the peak memory allocated by a run, in bytes.
+    """
+    run(setup())
+    times = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+
+    argument = setup()
+    tracemalloc.start()
+    try:
+        run(argument)
+        _size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'median': statistics.median(times), 'p95': percentile(times, 0.95), 'peak_bytes': peak,
+            'runs': repeat}
+
+
+def compare(results, baseline):
+    """Compare the median run times of phases with those of a baseline.
+
+    :param results: The results of this run, by dataset and phase.
+    :param baseline: The results of a previous run, by dataset and phase.
+    :return: A dictionary mapping (dataset, phase) pairs to the ratio of this run's
+        median run time to the baseline's, for every phase in both runs.
+    """
+    ratios = {}
+    for dataset, measured in results.items():
+        for phase, result in measured.items():
+            previous = baseline.get(dataset, {}).get(phase)
+            if previous and previous['median'] > 0:
+                ratios[dataset, phase] = result['median'] / previous['median']
+    return ratios
+
+
+def report(dataset, measured, ratios, tolerance):
+    """Print the results of the phases on one dataset.
+
+    :param dataset: The name of the dataset.
+    :param measured: The results of each phase on the dataset.
+    :param ratios: The ratios of median run times to the baseline's, by (dataset, phase).
+    :param tolerance: The largest acceptable relative slowdown.
+    """
+    print(f"{dataset}:")
+    print(f"  {'phase':<28} {'median':>10} {'p95':>10} {'peak memory':>12}  vs baseline")
+    for phase, result in measured.items():
+        line = (f"  {phase:<28} {result['median'] * 1e3:8.2f}ms {result['p95'] * 1e3:8.2f}ms "
+                f"{result['peak_bytes'] / 2**20:9.2f}MiB")
+        ratio = ratios.get((dataset, phase))
+        if ratio is not None:
+            line += f"  {ratio - 1:+7.1%}{'  REGRESSION' if ratio > 1 + tolerance else ''}"
+        print(line)
+
+
+def make_parser():
+    """Create an ArgumentParser for this script."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the load, link, query and write phases on the test data."
+    )
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10], metavar='N',
+                        help="The numbers of copies of the test data to benchmark on. Defaults to 1 and 10.")
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[], metavar='N',
+                        help="The numbers of close approaches of synthetic datasets to benchmark on.")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="The seed of the synthetic datasets. Defaults to 0.")
+    parser.add_argument('--repeat', type=int, default=5, metavar='N',
+                        help="The number of timed runs of each phase. Defaults to 5.")
+    parser.add_argument('--only', metavar='PREFIX',
+                        help="Only run the phases whose names start with this prefix, e.g. 'query'.")
+    parser.add_argument('--output', type=pathlib.Path,
+                        help="Save the results to this JSON file.")
+    parser.add_argument('--baseline', type=pathlib.Path,
+                        help="Compare the results with those saved in this JSON file.")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="The largest acceptable slowdown relative to the baseline, as a fraction. "
+                             "Defaults to 0.1.")
+    return parser
+
+
+def main():
+    """Run the benchmark suite, and print, save and compare its results."""
+    args = make_parser().parse_args()
+    baseline = {}
+    if args.baseline is not None:
+        with open(args.baseline) as infile:
+            baseline = json.load(infile)['results']
+
+    results = {}
+    ratios = {}
+    root = pathlib.Path(tempfile.mkdtemp())
+    try:
+        datasets = [(f"x{scale}", functools.partial(scale_data, scale, root)) for scale in args.scale]
+        datasets += [(f"synthetic-{count}-{args.seed}",
+                      functools.partial(generate, root / f"synthetic-{count}", count, seed=args.seed))
+                     for count in args.synthetic]
+        for dataset, make_data in datasets:
+            neofile, cadfile = (TEST_NEO_FILE, TEST_CAD_FILE) if dataset == 'x1' else make_data()
+            measured = results[dataset] = {}
+            for phase, (setup, run) in phases(neofile, cadfile, root).items():
+                if args.only is None or phase.startswith(args.only):
+                    measured[phase] = measure(setup, run, args.repeat)
+            ratios.update(compare({dataset: measured}, baseline))
+            report(dataset, measured, ratios, args.tolerance)
+    finally:
+        shutil.rmtree(root)
+
+    if args.output is not None:
+        with open(args.output, 'w') as outfile:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'repeat': args.repeat,
+                'results': results,
+            }, outfile, indent=2)
+
+    regressions = [key for key, ratio in ratios.items() if ratio > 1 + args.tolerance]
+    if regressions:
+        print(f"{len(regressions)} phase(s) regressed by more than {args.tolerance:.0%}: "
+              f"{', '.join(f'{dataset}/{phase}' for dataset, phase in regressions)}.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
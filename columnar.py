@@ -0,0 +1,158 @@
+"""A columnar, NumPy-backed query engine for close approaches.
+
+The `ColumnarNEODatabase` is a drop-in alternative to `NEODatabase`. In addition
+to the usual collections of NEOs and close approaches, it stores the attributes
+that the filters from `create_filters` inspect - the approach date, distance
+and velocity, and the NEO's diameter and hazardous flag - as NumPy arrays.
+The approaches' attributes are parallel arrays, aligned with the chronological
+index of the `NEODatabase`. Each NEO is given a dense integer id, which the
+approaches refer to in another such array, and the NEOs' attributes are arrays
+indexed by id, so they're stored once per NEO rather than once per approach.
+
+A query evaluates each filter on a whole column at once (with `AttributeFilter.mask`),
+combines the resulting boolean masks, and only then looks up the `CloseApproach`
+objects at the matching positions. The results are still `CloseApproach`
+objects, generated in chronological order, so `limit`, `write_to_csv` and
+`write_to_json` work unchanged.
+
+NumPy is an optional dependency of this project; it is only required to
+construct a `ColumnarNEODatabase`.
+"""
+import itertools
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from database import NEODatabase
+from planner import plan_query
+
+
+class ColumnarNEODatabase(NEODatabase):
+    """A database of near-Earth objects that answers queries with vectorized masks."""
+
+    def __init__(self, neos, approaches):
+        """Initialize a new `ColumnarNEODatabase` instance.
+
+        :param neos: A collection of `NearEarthObject` instances.
+        :param approaches: A collection of `CloseApproach` instances.
+        :raise ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("The columnar query engine requires NumPy. Install it with `pip install numpy`.")
+        super().__init__(neos, approaches)
+        self._build_neo_columns()
+        self._columns = self._build_columns()
+
+    def _build_neo_columns(self):
+        """Assign each NEO a dense integer id, and build the arrays of the NEOs' attributes.
+
+        The id of an NEO is its position in the database's list of NEOs. The attribute
+        arrays end with an extra entry - a NaN diameter, and not potentially hazardous -
+        which id -1, given to approaches without a linked NEO, refers to.
+        """
+        self._neo_ids = {neo.designation: index for index, neo in enumerate(self._neos)}
+        count = len(self._neos) + 1
+        self._neo_columns = {
+            'diameter': np.fromiter(itertools.chain((neo.diameter for neo in self._neos), (math.nan,)),
+                                    dtype=np.float64, count=count),
+            'hazardous': np.fromiter(itertools.chain((neo.hazardous for neo in self._neos), (False,)),
+                                     dtype=np.bool_, count=count),
+        }
+
+    def _neo_id(self, approach):
+        """Find the id of the NEO of an approach, or -1 if it has none."""
+        return self._neo_ids.get(approach._designation, -1) if approach.neo else -1
+
+    def _build_columns(self, names=('date', 'distance', 'velocity', 'neo')):
+        """Build column arrays from the chronological index.
+
+        :param names: The names of the columns to build.
+        :return: A dictionary mapping column names to NumPy arrays.
+        """
+        ordered = self._approaches_by_time
+        count = len(ordered)
+        builders = {
+            'date': lambda: np.fromiter(self._approach_days, dtype=np.int64, count=count),
+            'distance': lambda: np.fromiter((approach.distance for approach in ordered),
+                                            dtype=np.float64, count=count),
+            'velocity': lambda: np.fromiter((approach.velocity for approach in ordered),
+                                            dtype=np.float64, count=count),
+            'neo': lambda: np.fromiter(map(self._neo_id, ordered), dtype=np.int32, count=count),
+        }
+        return {name: builders[name]() for name in names}
+
+    def _approaches_inserted(self, positions, approaches):
+        """Insert the values of new approaches into the column arrays.
+
+        :param positions: The positions in the previous chronological index before which
+            each of the approaches was inserted, in ascending order.
+        :param approaches: The inserted approaches, in chronological order.
+        """
+        values = {
+            'date': [approach.day for approach in approaches],
+            'distance': [approach.distance for approach in approaches],
+            'velocity': [approach.velocity for approach in approaches],
+            'neo': [self._neo_id(approach) for approach in approaches],
+        }
+        self._columns = {name: np.insert(column, positions, values[name])
+                         for name, column in self._columns.items()}
+
+    def _approaches_changed(self):
+        """Rebuild the distance and velocity columns after approaches are updated in place."""
+        self._columns.update(self._build_columns(('distance', 'velocity')))
+
+    def _neos_changed(self):
+        """Rebuild the NEO attribute arrays after NEOs are added or updated.
+
+        Only the ids of approaches that had no NEO can change, as NEOs are only
+        ever appended to the list of NEOs.
+        """
+        self._build_neo_columns()
+        ids = self._columns['neo']
+        for position in np.flatnonzero(ids == -1):
+            ids[position] = self._neo_id(self._approaches_by_time[position])
+
+    def plan(self, filters=()):
+        """Plan the evaluation of a query, without running it.
+
+        The columnar engine masks whole columns, so it always scans the window of
+        the date index, and never uses the NEO index.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :return: A `planner.QueryPlan` for the query.
+        """
+        return plan_query(filters, self._statistics, self._approach_days)
+
+    def query(self, filters=(), jobs=1):
+        """Query close approaches based on specified filters.
+
+        The filters are planned as for `NEODatabase.query`. The fused predicates
+        are then evaluated as vectorized masks over the date window of the plan,
+        and any other callable filters are applied to the `CloseApproach` objects
+        that survive the masks.
+
+        The masks are evaluated in this process, so no worker processes are used.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :param jobs: Ignored, for compatibility with `NEODatabase.query`.
+        :return: An iterator yielding `CloseApproach` objects that match the filters.
+        """
+        plan = self.plan(filters)
+        start, stop = plan.window
+        window = {name: column[start:stop] for name, column in self._columns.items()}
+        # Look up the attributes of each approach's NEO by the NEO's id, only if they're needed.
+        for name, column in self._neo_columns.items():
+            if any(predicate.column == name for predicate in plan.predicates):
+                window[name] = column[window['neo']]
+
+        mask = np.ones(stop - start, dtype=np.bool_)
+        for predicate in plan.predicates:
+            mask &= predicate.mask(window)
+
+        for index in np.flatnonzero(mask):
+            approach = self._approaches_by_time[start + index]
+            if all(f(approach) for f in plan.opaque):
+                yield approach
@@ -7,10 +7,82 @@ user-specified criteria.
 
 Under normal circumstances, the main module creates one NEODatabase from the
 data on NEOs and close approaches extracted by `extract.load_neos` and
-`extract.load_approaches`.
+`extract.load_approaches`. More NEOs and close approaches can be added later
+with `add_neos` and `add_approaches`, which keep the lookups, the chronological
+index and the links between NEOs and approaches up to date without rebuilding them.
+
+A query over a wide date window can be evaluated by several worker processes
+at once, each scanning one shard (a contiguous time range) of the chronological
+index. The workers are forked from the process holding the database, so they
+share it without copying or pickling it, and only send back the positions of
+the matching approaches.
 
 You will edit this file in Tasks 2 and 3.
 """
+import array
+import bisect
+import math
+import multiprocessing
+import operator
+import os
+
+from planner import NEOIndex, collect_statistics, plan_query
+
+# The fewest candidate approaches scanned by one shard of a parallel query.
+_MIN_SHARD_SIZE = 1 << 15
+
+# The number of shards of a parallel query, per worker process.
+_SHARDS_PER_JOB = 4
+
+# The attributes that identify a close approach, and order the chronological index.
+_SORT_KEY = operator.attrgetter('sort_key')
+
+# The chronological index and the tests of the query, in a worker process of a parallel query.
+_shard_query = None
+
+
+def _bisect_sort_key(approaches, key, lo, hi):
+    """Find where an approach with a sort key belongs among chronologically ordered approaches.
+
+    :param approaches: A list of approaches, ordered by `sort_key`.
+    :param key: The sort key of the approach.
+    :param lo: The position from which to search.
+    :param hi: The position up to which to search.
+    :return: The position of the first approach in `approaches[lo:hi]` whose sort key
+        isn't less than `key`, or `hi` if there is none.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if approaches[mid].sort_key < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _init_shard_worker(approaches, tests):
+    """Hold the chronological index and the tests of a parallel query in a worker process."""
+    global _shard_query
+    _shard_query = (approaches, tests)
+
+
+def _match_shard(shard):
+    """Find the approaches in one shard of a parallel query that pass every test.
+
+    :param shard: The start and stop positions of the shard in the chronological index.
+    :return: An array of the positions of the matching approaches, in order.
+    """
+    approaches, tests = _shard_query
+    start, stop = shard
+    matches = array.array('q')
+    for index in range(start, stop):
+        approach = approaches[index]
+        for test in tests:
+            if not test(approach):
+                break
+        else:
+            matches.append(index)
+    return matches
 
 
 class NEODatabase:
@@ -31,21 +103,38 @@ class NEODatabase:
         `designation` attribute of the `NearEarthObject`.
 
         :param neos: A collection of `NearEarthObject` instances.
-        :param approaches: A collection of `CloseApproach` instances.
+        :param approaches: An iterable of `CloseApproach` instances, such as the
+                           generator returned by `extract.iter_approaches`.
         """
-        self._neos = neos
-        self._approaches = approaches
+        self._neos = list(neos)
+        self._approaches = list(approaches)
 
         # Create auxiliary data structures for quick lookups
-        self._designation_dict = {neo.designation: neo for neo in neos}
-        self._name_dict = {neo.name: neo for neo in neos if neo.name}
+        self._designation_dict = {neo.designation: neo for neo in self._neos}
+        self._name_dict = {neo.name: neo for neo in self._neos if neo.name}
+
+        # Index the close approaches chronologically, so that date criteria can
+        # be answered by bisecting into a contiguous window of this list.
+        self._approaches_by_time = sorted(self._approaches, key=_SORT_KEY)
+        self._approach_days = [approach.day for approach in self._approaches_by_time]
 
-        # Link NEOs and their close approaches
-        for approach in self._approaches:
+        # Link NEOs and their close approaches, so each NEO's approaches are chronological.
+        # Approaches of unknown NEOs are kept by designation, until their NEO is added.
+        self._orphans = {}
+        for approach in self._approaches_by_time:
             neo = self._designation_dict.get(approach._designation)
             approach.neo = neo
             if neo:
                 neo.approaches.append(approach)
+            else:
+                self._orphans.setdefault(approach._designation, []).append(approach)
+
+        # Index the NEOs by diameter and by hazardous flag, so that criteria on
+        # the NEOs can be answered by only visiting the qualifying NEOs' approaches.
+        self._neo_index = NEOIndex(self._neos)
+
+        # Summarize the distribution of each filterable column, for the query planner.
+        self._statistics = collect_statistics(self._approaches_by_time)
 
     def get_neo_by_designation(self, designation):
         """Retrieve an NEO by its primary designation.
@@ -69,18 +158,201 @@ class NEODatabase:
         """
         return self._name_dict.get(name)
 
-    def query(self, filters=()):
+    def add_neos(self, neos):
+        """Add NEOs to the database, and link them to any known approaches of theirs.
+
+        An NEO with the designation of a known NEO is rejected as a duplicate.
+
+        :param neos: A collection of `NearEarthObject` instances.
+        :return: The number of NEOs that were added.
+        """
+        added = 0
+        for neo in neos:
+            if neo.designation in self._designation_dict:
+                continue
+            self._neos.append(neo)
+            self._designation_dict[neo.designation] = neo
+            if neo.name:
+                self._name_dict[neo.name] = neo
+            added += 1
+
+            orphans = self._orphans.pop(neo.designation, None)
+            if orphans:
+                for approach in orphans:
+                    approach.neo = neo
+                neo.approaches.extend(orphans)
+                self._neo_index.add(neo)
+        if added:
+            self._neos_changed()
+        return added
+
+    def add_approaches(self, approaches):
+        """Add close approaches to the database, and link them to their NEOs.
+
+        Each approach is inserted into the chronological index, and into its NEO's
+        approaches, at a position found by bisection, so adding k approaches to a
+        database of N approaches takes O(k log N) comparisons. An approach by the
+        same NEO at the same time as a known approach is rejected as a duplicate,
+        which is detected among the known approaches of the same NEO.
+
+        :param approaches: An iterable of `CloseApproach` instances.
+        :return: The number of approaches that were added.
+        """
+        added = []
+        for approach in sorted(approaches, key=_SORT_KEY):
+            neo = self._designation_dict.get(approach._designation)
+            siblings = neo.approaches if neo else self._orphans.setdefault(approach._designation, [])
+            position = _bisect_sort_key(siblings, approach.sort_key, 0, len(siblings))
+            if position < len(siblings) and siblings[position].sort_key == approach.sort_key:
+                continue
+            if neo and not siblings:
+                self._neo_index.add(neo)
+            siblings.insert(position, approach)
+            approach.neo = neo
+            added.append(approach)
+        if not added:
+            return 0
+
+        # The approaches are inserted in chronological order, so each is inserted
+        # after any approaches inserted before it, at its final position.
+        positions = []
+        days, ordered = self._approach_days, self._approaches_by_time
+        for approach in added:
+            position = _bisect_sort_key(ordered, approach.sort_key, bisect.bisect_left(days, approach.day),
+                                        bisect.bisect_right(days, approach.day))
+            ordered.insert(position, approach)
+            days.insert(position, approach.day)
+            positions.append(position - len(positions))
+        self._approaches.extend(added)
+        self._statistics = collect_statistics(ordered)
+        self._approaches_inserted(positions, added)
+        return len(added)
+
+    def _approaches_inserted(self, positions, approaches):
+        """Update any data aligned with the chronological index after approaches are inserted.
+
+        :param positions: The positions in the previous chronological index before which
+            each of the approaches was inserted, in ascending order.
+        :param approaches: The inserted approaches, in chronological order.
+        """
+
+    def _approaches_changed(self):
+        """Update any data derived from the distances and velocities of approaches after they change."""
+
+    def _neos_changed(self):
+        """Update any data derived from the NEOs after NEOs are added or updated."""
+
+    def ingest(self, neos=(), approaches=()):
+        """Add new NEOs and close approaches to the database, or update known ones.
+
+        An NEO with the designation of a known NEO updates the known NEO's name,
+        diameter and hazardous flag. A close approach by the same NEO at the same
+        time as a known approach updates the known approach's distance and velocity.
+        Other NEOs and approaches are added with `add_neos` and `add_approaches`.
+
+        :param neos: A collection of `NearEarthObject` instances.
+        :param approaches: An iterable of `CloseApproach` instances.
+        :return: A dictionary counting the NEOs and approaches that were added or updated.
+        """
+        summary = dict.fromkeys(('neos_added', 'neos_updated', 'approaches_added', 'approaches_updated'), 0)
+
+        added_neos = []
+        for neo in neos:
+            known = self._designation_dict.get(neo.designation)
+            if known is None:
+                added_neos.append(neo)
+            elif (known.name, known.hazardous) != (neo.name, neo.hazardous) or not (
+                    known.diameter == neo.diameter or math.isnan(known.diameter) and math.isnan(neo.diameter)):
+                if known.name != neo.name:
+                    if self._name_dict.get(known.name) is known:
+                        del self._name_dict[known.name]
+                    if neo.name:
+                        self._name_dict[neo.name] = known
+                if known.approaches:
+                    self._neo_index.discard(known)
+                known.name, known.diameter, known.hazardous = neo.name, neo.diameter, neo.hazardous
+                if known.approaches:
+                    self._neo_index.add(known)
+                summary['neos_updated'] += 1
+        if summary['neos_updated']:
+            self._neos_changed()
+        summary['neos_added'] = self.add_neos(added_neos)
+
+        added_approaches = []
+        for approach in approaches:
+            neo = self._designation_dict.get(approach._designation)
+            siblings = neo.approaches if neo else self._orphans.get(approach._designation, ())
+            position = _bisect_sort_key(siblings, approach.sort_key, 0, len(siblings))
+            if position == len(siblings) or siblings[position].sort_key != approach.sort_key:
+                added_approaches.append(approach)
+                continue
+            known = siblings[position]
+            if (known.distance, known.velocity) != (approach.distance, approach.velocity):
+                known.distance, known.velocity = approach.distance, approach.velocity
+                summary['approaches_updated'] += 1
+        if summary['approaches_updated']:
+            self._approaches_changed()
+        summary['approaches_added'] = self.add_approaches(added_approaches)
+        return summary
+
+    def plan(self, filters=()):
+        """Plan the evaluation of a query, without running it.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :return: A `planner.QueryPlan` for the query.
+        """
+        return plan_query(filters, self._statistics, self._approach_days, self._neo_index)
+
+    def explain(self, filters=()):
+        """Explain how a query would be evaluated, without running it.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :return: A human-readable description of the query plan.
+        """
+        return str(self.plan(filters))
+
+    def query(self, filters=(), jobs=1):
         """Query close approaches based on specified filters.
 
         This method generates `CloseApproach` objects that match all provided filters.
         If no filters are provided, it yields all known close approaches.
 
-        The results are generated in internal order, which is often chronological but
-        not guaranteed to be sorted.
+        The results are generated in chronological order. The filters are first
+        planned with `plan`: date criteria are answered from the date index, or
+        criteria on NEOs from the NEO index, whichever leaves fewer candidates. The
+        other criteria are fused per attribute and evaluated on the candidates,
+        most selective first.
+
+        With more than one job, a date window with enough candidates is split into
+        shards that are scanned by a pool of forked worker processes, and the matches
+        of each shard are generated in turn, so the results are still chronological.
+        Where processes can't be forked, the query is evaluated in this process.
 
         :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :param jobs: The number of worker processes, or 0 to use one per CPU.
         :return: An iterator yielding `CloseApproach` objects that match the filters.
         """
-        for approach in self._approaches:
-            if all(f(approach) for f in filters):
-                yield approach
+        plan = self.plan(filters)
+        jobs = jobs or os.cpu_count() or 1
+        start, stop = plan.window
+        shards = min(jobs * _SHARDS_PER_JOB, (stop - start) // _MIN_SHARD_SIZE)
+        if (jobs == 1 or plan.neos is not None or shards < 2
+                or 'fork' not in multiprocessing.get_all_start_methods()):
+            return plan(self._approaches_by_time)
+        bounds = [start + (stop - start) * shard // shards for shard in range(shards + 1)]
+        return self._query_shards(plan, jobs, list(zip(bounds, bounds[1:])))
+
+    def _query_shards(self, plan, jobs, shards):
+        """Generate the matches of a plan, scanning shards of its window in worker processes.
+
+        :param plan: The `planner.QueryPlan` of the query.
+        :param jobs: The number of worker processes.
+        :param shards: The (start, stop) positions of the shards, in chronological order.
+        :yield: The matching `CloseApproach` objects, in chronological order.
+        """
+        context = multiprocessing.get_context('fork')
+        approaches = self._approaches_by_time
+        with context.Pool(jobs, _init_shard_worker, (approaches, plan.tests())) as pool:
+            for matches in pool.imap(_match_shard, shards):
+                for index in matches:
+                    yield approaches[index]
@@ -2,10 +2,24 @@
 
 The `load_neos` function extracts NEO data from a CSV file, formatted as
 described in the project instructions, into a collection of `NearEarthObject`s.
+Only the columns that it needs are extracted from each row of the CSV file.
 
 The `load_approaches` function extracts close approach data from a JSON file,
 formatted as described in the project instructions, into a collection of
-`CloseApproach` objects.
+`CloseApproach` objects. The `iter_approaches` function generates the same
+`CloseApproach` objects one at a time, while streaming through the JSON file,
+so the raw rows of the file are never held in memory all at once.
+
+The `neo_checkpoint` and `cad_checkpoint` functions describe the records that
+a data file holds, so that `load_neos_since` and `load_approaches_since` can
+later extract only the records appended to the file since then.
+
+The `load_parallel` function extracts both files at once with a pool of worker
+processes: one parses the CSV file, while the others each decode a contiguous
+range of the rows of the JSON file.
+
+Designations are interned, so that the many approaches of an NEO, and the NEO
+itself, share one copy of its designation.
 
 The main module calls these functions with the arguments provided at the command
 line, and uses the resulting collections to build an `NEODatabase`.
@@ -13,58 +27,641 @@ line, and uses the resulting collections to build an `NEODatabase`.
 You will edit this file in Task 2.
 """
 
+import array
+import concurrent.futures
+import contextlib
 import csv
+import hashlib
+import io
+import itertools
 import json
+import mmap
+import operator
+import os
+import re
+import sys
 
+from helpers import cd_to_day_minute
 from models import NearEarthObject, CloseApproach
 
+# The number of characters read from a JSON file at a time while streaming it.
+_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Characters that may continue a JSON number, such as the fraction or exponent of `12345`.
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+# The boundary between two consecutive rows of a JSON array of arrays.
+_ROW_BOUNDARY = re.compile(rb'\][ \t\n\r]*,[ \t\n\r]*\[')
+
+# The smallest range of a JSON file, in bytes, decoded by one worker process.
+_MIN_RANGE_SIZE = 1 << 20
+
+# The number of ranges into which a JSON file is split, per worker process.
+_RANGES_PER_JOB = 4
+
+# The columns of the CSV file from which `NearEarthObject`s are created.
+_NEO_COLUMNS = ('pdes', 'name', 'diameter', 'pha')
+
+# The fields of the JSON file from which `CloseApproach`es are created.
+_CAD_FIELDS = ('des', 'cd', 'dist', 'v_rel')
+
+# The end of a JSON document whose last member is an array.
+_DOCUMENT_END = re.compile(rb'\][ \t\n\r]*\}[ \t\n\r]*\Z')
+
+# The number of bytes at the end of a JSON file in which to look for the end of the document.
+_DOCUMENT_END_SIZE = 1 << 12
+
+# Shared `int` objects for the minutes of the day, as in `helpers.cd_to_day_minute`.
+_MINUTE_INTS = tuple(range(24 * 60))
+
+
+class _JSONReader:
+    """Read the values of a JSON document one at a time from a text file.
+
+    A `_JSONReader` holds a sliding window of the file's text, and decodes one
+    JSON value at a time from it with `json.JSONDecoder.raw_decode`. It lets the
+    caller step into objects (with `members`) and arrays (with `items`), so that
+    a large array can be consumed element by element.
+    """
+
+    def __init__(self, infile):
+        """Create a new `_JSONReader` reading from an open text file."""
+        self._file = infile
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self):
+        """Discard the consumed text, and read the next chunk of the file.
+
+        :return: Whether any more text was read.
+        """
+        chunk = self._file.read(_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def tell(self):
+        """Return the offset in the file, in characters, of the next unconsumed character."""
+        return self._offset + self._pos
+
+    def peek(self):
+        """Skip whitespace, and return the next character without consuming it.
+
+        :return: The next character, or an empty string at the end of the file.
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, characters):
+        """Consume the next character, which must be one of the given characters.
+
+        :param characters: The acceptable characters.
+        :return: The consumed character.
+        :raise ValueError: If the next character is not acceptable.
+        """
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Malformed JSON: expected one of {characters!r}, found {character!r}.")
+        self._pos += 1
+        return character
+
+    def value(self):
+        """Decode and consume the next complete JSON value.
+
+        A value is only accepted once some text other than digits, a decimal
+        point or an exponent follows it (or the file ends), so that a number
+        split across two chunks - such as `12345.5` cut after `12345` or after
+        `12345.` - isn't decoded prematurely.
+
+        :return: The decoded value.
+        :raise json.JSONDecodeError: If the next value is malformed.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                if self._eof or _NUMBER_TAIL.match(self._buffer, end).end() < len(self._buffer):
+                    self._pos = end
+                    return value
+            self._fill()
+
+    def skip(self):
+        """Consume the next JSON value, stepping through it if it's an array."""
+        if self.peek() == '[':
+            for _ in self.items():
+                pass
+        else:
+            self.value()
+
+    def members(self):
+        """Step into an object, and generate its keys.
+
+        After each key is generated, the caller must consume its value (with
+        `value`, `skip` or `items`) before advancing the generator.
+
+        :yield: The keys of the object, in order.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+    def items(self):
+        """Step into an array, and generate its elements.
+
+        :yield: The decoded elements of the array, in order.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+
+def _iter_cad_rows(cad_json_path, fields):
+    """Generate the given fields of each row of the `data` array of a JSON file.
+
+    The positions of the fields within each row are looked up in the file's
+    `fields` header. If the `data` array precedes the `fields` header in the
+    file, it's skipped over on a first pass and streamed on a second pass.
+
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :param fields: The names of the fields to extract from each row.
+    :yield: A tuple of the values of the given fields, for each row.
+    :raise ValueError: If the file has no `fields` header or `data` array, or a field is missing.
+    """
+    header = None
+    for _pass in range(2):
+        with open(cad_json_path, 'r') as infile:
+            reader = _JSONReader(infile)
+            for key in reader.members():
+                if key == 'fields' and header is None:
+                    header = reader.value()
+                elif key == 'data' and header is not None:
+                    missing = [field for field in fields if field not in header]
+                    if missing:
+                        raise ValueError(f"{cad_json_path} has no {', '.join(map(repr, missing))} field(s).")
+                    getter = operator.itemgetter(*(header.index(field) for field in fields))
+                    for row in reader.items():
+                        yield getter(row)
+                    return
+                else:
+                    reader.skip()
+        if header is None:
+            raise ValueError(f"{cad_json_path} has no 'fields' header.")
+    raise ValueError(f"{cad_json_path} has no 'data' array.")
+
+
+def _locate_cad_rows(cad_json_path, fields):
+    """Find the positions of the given fields, and the byte offset of the `data` array.
+
+    The file is read as Latin-1, so that character offsets are byte offsets; JSON
+    syntax is entirely ASCII, so the structure of the file is read correctly.
+
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :param fields: The names of the fields to extract from each row.
+    :return: The positions of the fields in each row, and the offset of the opening
+        bracket of the `data` array; or None if the `data` array doesn't follow the
+        `fields` header.
+    :raise ValueError: If a field is missing from the `fields` header.
+    """
+    with open(cad_json_path, 'r', encoding='latin-1') as infile:
+        reader = _JSONReader(infile)
+        header = None
+        for key in reader.members():
+            if key == 'fields' and header is None:
+                header = reader.value()
+            elif key == 'data':
+                if header is None or reader.peek() != '[':
+                    return None
+                missing = [field for field in fields if field not in header]
+                if missing:
+                    raise ValueError(f"{cad_json_path} has no {', '.join(map(repr, missing))} field(s).")
+                return tuple(header.index(field) for field in fields), reader.tell()
+            else:
+                reader.skip()
+    return None
+
+
+def _split_cad_rows(cad_json_path, start, count):
+    """Split the rows of a `data` array into about `count` contiguous byte ranges.
+
+    Each range ends at a row boundary found after an evenly spaced offset. The last
+    range is open-ended, since the end of the array is only found by decoding it.
+
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :param start: The byte offset of the opening bracket of the `data` array.
+    :param count: The desired number of ranges.
+    :return: A list of (start, stop) byte ranges, the last of which has a `stop` of None.
+    """
+    ranges = []
+    with open(cad_json_path, 'rb') as infile, \
+            mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data) - start
+        begin = start + 1
+        for index in range(1, count):
+            boundary = _ROW_BOUNDARY.search(data, max(begin, start + size * index // count))
+            if boundary is None:
+                break
+            ranges.append((begin, boundary.start() + 1))
+            begin = boundary.end() - 1
+    ranges.append((begin, None))
+    return ranges
+
+
+def _decode_cad_range(cad_json_path, start, stop, positions):
+    """Decode a range of rows of a `data` array, in a worker process.
+
+    The range is decoded as the text of a JSON array, with the bracket of the `data`
+    array (or of a previous row) that precedes it. Unless the range is the last, it
+    must then end exactly at the end of a row; a range split in the middle of a
+    string, or outside of the `data` array, never does.
+
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :param start: The byte offset of the range.
+    :param stop: The byte offset of the end of the range, or None for the last range.
+    :param positions: The positions of the `des`, `cd`, `dist` and `v_rel` fields in each row.
+    :return: The designations, day ordinals, minutes, distances and velocities of the rows,
+        in compact arrays; or None if the range isn't aligned with the rows.
+    """
+    with open(cad_json_path, 'rb') as infile:
+        infile.seek(start)
+        text = '[' + infile.read(-1 if stop is None else stop - start).decode('utf-8')
+    if stop is not None:
+        text += ']'
+    try:
+        rows, end = json.JSONDecoder().raw_decode(text)
+    except json.JSONDecodeError:
+        return None
+    if stop is not None and end != len(text):
+        return None
+
+    getter = operator.itemgetter(*positions)
+    designations = []
+    days, minutes = array.array('l'), array.array('h')
+    distances, velocities = array.array('d'), array.array('d')
+    for row in rows:
+        designation, time, distance, velocity = getter(row)
+        day, minute = cd_to_day_minute(time)
+        designations.append(sys.intern(designation))
+        days.append(day)
+        minutes.append(minute)
+        distances.append(float(distance))
+        velocities.append(float(velocity))
+    return designations, days, minutes, distances, velocities
+
+
+def _iter_neo_rows(neo_csv_path, columns, offset=None):
+    """Generate the given columns of each row of a CSV file.
+
+    The positions of the columns are looked up once in the file's header, and
+    the other columns are never converted or stored. Lines without quotes are
+    split on commas directly, up to the last of the given columns; other lines (whose fields may contain commas or
+    line breaks) are parsed with a `csv.reader`.
+
+    :param neo_csv_path: Path to the CSV file containing near-Earth object data.
+    :param columns: The names of the columns to extract from each row.
+    :param offset: The byte offset of the start of a line after the header from which
+        to read rows, or None to read every row.
+    :yield: A tuple of the values of the given columns, for each row.
+    :raise ValueError: If the file has no header, or a column is missing.
+    """
+    with open(neo_csv_path, 'r', newline='') as infile:
+        header = next(csv.reader(infile), None)
+        if header is None:
+            raise ValueError(f"{neo_csv_path} has no header.")
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ValueError(f"{neo_csv_path} has no {', '.join(map(repr, missing))} column(s).")
+        positions = [header.index(column) for column in columns]
+        getter = operator.itemgetter(*positions)
+        if len(columns) == 1:
+            getter = lambda row, get=getter: (get(row),)
+        # Lines are only split up to the last of the given columns.
+        width = max(positions) + 1
+        if offset is None:
+            yield from _split_neo_rows(infile, getter, width)
+            return
+
+    with open(neo_csv_path, 'rb') as binary:
+        binary.seek(offset)
+        with io.TextIOWrapper(binary, newline='') as infile:
+            yield from _split_neo_rows(infile, getter, width)
+
+
+def _split_neo_rows(infile, getter, width):
+    """Generate the given columns of each remaining row of an open CSV file.
 
-def load_neos(neo_csv_path):
+    :param infile: A CSV file opened in text mode, positioned at the start of a line.
+    :param getter: A function that picks the given columns out of a row.
+    :param width: The number of fields to split each row into, at least.
+    :yield: A tuple of the values of the given columns, for each row.
+    """
+    for line in infile:
+        if '"' in line:
+            # The reader takes any further lines of a multi-line record from the file.
+            row = next(csv.reader(itertools.chain((line,), infile)))
+        else:
+            row = line.rstrip('\r\n').split(',', width)
+        if len(row) < width:
+            if not any(row):
+                continue
+            row += [''] * (width - len(row))
+        yield getter(row)
+
+
+def load_neos(neo_csv_path, extra_columns=()):
     """Extract near-Earth objects from a CSV file.
 
     This function reads near-Earth object data from a CSV file and creates a collection
     of `NearEarthObject` instances based on the data.
 
     The CSV file should contain columns for primary designation (`pdes`), name (`name`),
-    diameter (`diameter`), and whether the object is hazardous (`pha`).
+    diameter (`diameter`), and whether the object is hazardous (`pha`). Only these
+    columns are extracted, unless others are requested with `extra_columns`.
 
     :param neo_csv_path: Path to the CSV file containing near-Earth object data.
+    :param extra_columns: The names of any other columns (such as `moid`, `H` or `albedo`)
+        whose values to store in each NEO's `extra` dictionary, as strings, or None if empty.
     :return: A list of `NearEarthObject` instances created from the CSV data.
+    :raise ValueError: If the file has no header, or a column is missing.
+    """
+    extra_columns = tuple(extra_columns)
+    return _make_neos(_iter_neo_rows(neo_csv_path, _NEO_COLUMNS + extra_columns), extra_columns)
+
+
+def _make_neos(rows, extra_columns=()):
+    """Create near-Earth objects from the columns of the rows of a CSV file.
+
+    :param rows: An iterable of the `pdes`, `name`, `diameter` and `pha` columns of
+        each row, followed by any extra columns.
+    :param extra_columns: The names of the extra columns.
+    :return: A list of `NearEarthObject` instances.
     """
     neos = []
-    with open(neo_csv_path, 'r') as infile:
-        reader = csv.DictReader(infile)
-        for line in reader:
-            neos.append(NearEarthObject(
-                designation=line['pdes'],
-                name=line['name'] if line['name'] else None,
-                diameter=float(line['diameter']) if line['diameter'] else float('nan'),
-                hazardous=line['pha'] == 'Y'
-            ))
+    for row in rows:
+        designation, name, diameter, hazardous = row[:4]
+        neo = NearEarthObject(
+            designation=sys.intern(designation),
+            name=name if name else None,
+            diameter=float(diameter) if diameter else float('nan'),
+            hazardous=hazardous == 'Y'
+        )
+        if extra_columns:
+            neo.extra = {column: value if value else None for column, value in zip(extra_columns, row[4:])}
+        neos.append(neo)
     return neos
 
 
+def iter_approaches(cad_json_path):
+    """Generate close approaches from a JSON file, while streaming through it.
+
+    The JSON file should contain a key `fields` with a list of field names, and a
+    key `data` with a list of lists, where each inner list contains information
+    about a close approach in the order given by `fields`. The relevant fields are
+    `des`, `cd`, `dist` and `v_rel`: designation, time, distance, and velocity.
+
+    Rows are decoded one at a time, so approaches are generated before the file
+    has been fully read, and the raw rows are discarded as soon as they're used.
+
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :yield: The `CloseApproach` instances created from the JSON data, in file order.
+    """
+    for designation, time, distance, velocity in _iter_cad_rows(cad_json_path, _CAD_FIELDS):
+        yield CloseApproach(
+            designation=sys.intern(designation),
+            time=time,
+            distance=distance,
+            velocity=velocity
+        )
+
+
 def load_approaches(cad_json_path):
     """Extract close approaches from a JSON file.
 
     This function reads close approach data from a JSON file and creates a collection
-    of `CloseApproach` instances based on the data.
-
-    The JSON file should contain a key `data` with a list of lists, where each inner list
-    contains information about a close approach. The relevant fields are:
-    designation, time, distance, and velocity.
+    of `CloseApproach` instances based on the data, as described in `iter_approaches`.
 
     :param cad_json_path: Path to the JSON file containing close approach data.
     :return: A list of `CloseApproach` instances created from the JSON data.
     """
-    approaches = []
-    with open(cad_json_path, 'r') as infile:
-        contents = json.load(infile)
-        for approach in contents['data']:
-            approaches.append(CloseApproach(
-                designation=approach[0],
-                time=approach[3],
-                distance=approach[4],
-                velocity=approach[7]
-            ))
-    return approaches
+    return list(iter_approaches(cad_json_path))
+
+
+def load_parallel(neo_csv_path, cad_json_path, jobs=None):
+    """Extract near-Earth objects and close approaches with a pool of worker processes.
+
+    The CSV file is parsed by one worker, while the rows of the JSON file's `data`
+    array are split into contiguous byte ranges, each decoded by another worker. The
+    workers return the parsed fields of their rows in compact arrays, from which the
+    `CloseApproach` objects are built, in file order, in this process.
+
+    If the `data` array precedes the `fields` header or is too small to be worth
+    splitting, both files are read in this process instead. If the array can't be
+    split at row boundaries, the JSON file is read by `load_approaches`.
+
+    :param neo_csv_path: Path to the CSV file containing near-Earth object data.
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :param jobs: The number of worker processes, or None to use one per CPU.
+    :return: A list of `NearEarthObject` instances and a list of `CloseApproach` instances.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    location = _locate_cad_rows(cad_json_path, _CAD_FIELDS)
+    if location is None:
+        return load_neos(neo_csv_path), load_approaches(cad_json_path)
+    positions, start = location
+    count = min(jobs * _RANGES_PER_JOB, (os.path.getsize(cad_json_path) - start) // _MIN_RANGE_SIZE)
+    if count < 2:
+        return load_neos(neo_csv_path), load_approaches(cad_json_path)
+    ranges = _split_cad_rows(cad_json_path, start, count)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        neos = executor.submit(load_neos, neo_csv_path)
+        chunks = [executor.submit(_decode_cad_range, cad_json_path, begin, end, positions)
+                  for begin, end in ranges]
+
+        approaches = []
+        for chunk in chunks:
+            columns = chunk.result()
+            # A range that isn't aligned with the rows precedes any range lying past the
+            # end of the `data` array, whose decoded "rows" are never used.
+            if columns is None:
+                approaches = load_approaches(cad_json_path)
+                break
+            # Share the `int` objects of equal days and minutes between approaches.
+            days = {}
+            for designation, day, minute, distance, velocity in zip(*columns):
+                approaches.append(CloseApproach.from_day_minute(
+                    sys.intern(designation), days.setdefault(day, day), _MINUTE_INTS[minute], distance, velocity))
+        return neos.result(), approaches
+
+
+@contextlib.contextmanager
+def _mapped(path):
+    """Map a file into memory, read-only.
+
+    :param path: The path of the file.
+    :yield: The contents of the file, as an `mmap` (or as empty bytes, if the file is empty).
+    """
+    with open(path, 'rb') as infile:
+        if not os.fstat(infile.fileno()).st_size:
+            yield b''
+            return
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def _digest(data, start, stop, hasher=None):
+    """Hash a range of bytes, without copying them.
+
+    :param data: A bytes-like object, such as an `mmap`.
+    :param start: The offset of the range.
+    :param stop: The offset of the end of the range.
+    :param hasher: A hash object to update, or None to create a new one.
+    :return: The updated hash object.
+    """
+    hasher = hasher or hashlib.sha1()
+    with memoryview(data) as view, view[start:stop] as part:
+        hasher.update(part)
+    return hasher
+
+
+def _end_of_rows(data, start):
+    """Find the end of the last row of a `data` array that is the last member of a JSON file.
+
+    :param data: The contents of the JSON file.
+    :param start: The byte offset of the opening bracket of the `data` array.
+    :return: The byte offset just past the last row (or past the opening bracket, if
+        there are no rows), or None if the file doesn't end with the `data` array.
+    """
+    match = _DOCUMENT_END.search(data, max(start + 1, len(data) - _DOCUMENT_END_SIZE))
+    if match is None:
+        return None
+    end = match.start()
+    while end > start + 1 and data[end - 1:end] in (b' ', b'\t', b'\n', b'\r'):
+        end -= 1
+    if end > start + 1 and data[end - 1:end] != b']':
+        return None
+    return end
+
+
+def neo_checkpoint(neo_csv_path):
+    """Describe the complete lines of a CSV file, so that lines appended later can be read alone.
+
+    :param neo_csv_path: Path to the CSV file containing near-Earth object data.
+    :return: A checkpoint to pass to `load_neos_since`, or None if the file has no complete line.
+    """
+    with _mapped(neo_csv_path) as data:
+        end = data.rfind(b'\n') + 1
+        if not end:
+            return None
+        return end, _digest(data, 0, end).digest()
+
+
+def load_neos_since(neo_csv_path, checkpoint):
+    """Extract the near-Earth objects appended to a CSV file since a checkpoint.
+
+    The lines described by the checkpoint must be unchanged, and are not parsed again.
+
+    :param neo_csv_path: Path to the CSV file containing near-Earth object data.
+    :param checkpoint: A checkpoint of the file, from `neo_checkpoint` or a previous call.
+    :return: A list of the appended `NearEarthObject`s, and a checkpoint of the file as
+        it is now; or None if the file shrank or the lines of the checkpoint changed.
+    """
+    length, digest = checkpoint
+    with _mapped(neo_csv_path) as data:
+        end = data.rfind(b'\n') + 1
+        if end < length:
+            return None
+        hasher = _digest(data, 0, length)
+        if hasher.digest() != digest:
+            return None
+        checkpoint = end, _digest(data, length, end, hasher).digest()
+    return _make_neos(_iter_neo_rows(neo_csv_path, _NEO_COLUMNS, offset=length)), checkpoint
+
+
+def cad_checkpoint(cad_json_path):
+    """Describe the rows of the `data` array of a JSON file, so that rows appended later can be read alone.
+
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :return: A checkpoint to pass to `load_approaches_since`, or None if the `data`
+        array doesn't follow the `fields` header and end the file.
+    :raise ValueError: If the file is malformed, or a field is missing from the `fields` header.
+    """
+    location = _locate_cad_rows(cad_json_path, _CAD_FIELDS)
+    if location is None:
+        return None
+    positions, start = location
+    with _mapped(cad_json_path) as data:
+        end = _end_of_rows(data, start)
+        if end is None:
+            return None
+        return positions, end - start, _digest(data, start, end).digest()
+
+
+def load_approaches_since(cad_json_path, checkpoint):
+    """Extract the close approaches appended to the `data` array of a JSON file since a checkpoint.
+
+    The rows described by the checkpoint must be unchanged, and are not decoded
+    again; the file's other members, such as its `count`, may change.
+
+    :param cad_json_path: Path to the JSON file containing close approach data.
+    :param checkpoint: A checkpoint of the file, from `cad_checkpoint` or a previous call.
+    :return: A list of the appended `CloseApproach`es, in file order, and a checkpoint of
+        the file as it is now; or None if the rows of the checkpoint changed or can't be found.
+    :raise ValueError: If the file is malformed, or a field is missing from the `fields` header.
+    """
+    location = _locate_cad_rows(cad_json_path, _CAD_FIELDS)
+    if location is None or location[0] != checkpoint[0]:
+        return None
+    positions, start = location
+    _positions, length, digest = checkpoint
+    with _mapped(cad_json_path) as data:
+        end = _end_of_rows(data, start)
+        if end is None or end - start < length:
+            return None
+        hasher = _digest(data, start, start + length)
+        if hasher.digest() != digest:
+            return None
+        tail = data[start + length:end].decode('utf-8').lstrip(' \t\n\r')
+        checkpoint = positions, end - start, _digest(data, start + length, end, hasher).digest()
+
+    if tail and length > 1:
+        # The appended rows follow the last row of the checkpoint, after a comma.
+        if not tail.startswith(','):
+            return None
+        tail = tail[1:]
+    try:
+        rows = json.loads(f'[{tail}]')
+    except json.JSONDecodeError:
+        return None
+    getter = operator.itemgetter(*positions)
+    approaches = [CloseApproach(designation=sys.intern(designation), time=time, distance=distance, velocity=velocity)
+                  for designation, time, distance, velocity in map(getter, rows)]
+    return approaches, checkpoint
@@ -11,11 +11,14 @@ which are callable (on a `CloseApproach`) constructed from a comparator (from th
 can override to fetch an attribute of interest from the supplied `CloseApproach`.
 
 The `limit` function simply limits the maximum number of values produced by an
-iterator.
+iterator. The `sort_results` function orders the results by one of `SORT_KEYS`,
+and keeps only the first few of them without sorting the rest.
 
 You will edit this file in Tasks 3a and 3c.
 """
 
+import heapq
+import math
 import operator
 from datetime import datetime
 
@@ -35,8 +38,11 @@ class AttributeFilter:
     comparator.
 
     Subclasses should override the `get` class method to provide custom behavior for
-    retrieving the desired attribute from the given `CloseApproach`.
+    retrieving the desired attribute from the given `CloseApproach`. Subclasses may
+    also name the `column` that holds the attribute in a columnar store, so that
+    the filter can be evaluated on a whole column at once with `mask`.
     """
+    column = None
 
     def __init__(self, op, value):
         """Initialize an `AttributeFilter` with a comparator and reference value.
@@ -72,20 +78,61 @@ class AttributeFilter:
         """
         raise UnsupportedCriterionError("Subclasses must override this method.")
 
+    def reference(self):
+        """Return the reference value in the units of this filter's column.
+
+        :return: The reference value, comparable with the entries of the column.
+        """
+        return self.value
+
+    def mask(self, columns):
+        """Apply the filter to every entry of this filter's column at once.
+
+        The comparator is applied to an entire array, so that (for example) with
+        NumPy arrays the result is a boolean array of matching positions.
+
+        :param columns: A mapping from column names to arrays of attribute values.
+        :return: The result of `column OP reference` for this filter's column.
+        :raise UnsupportedCriterionError: If the filter doesn't name a column.
+        """
+        if self.column is None:
+            raise UnsupportedCriterionError(f"{self.__class__.__name__} has no columnar representation.")
+        return self.op(columns[self.column], self.reference())
+
     def __repr__(self):
         return f"{self.__class__.__name__}(op=operator.{self.op.__name__}, value={self.value})"
 
 class DateFilter(AttributeFilter):
-    """Filter for `CloseApproach` dates."""
-    
+    """Filter for `CloseApproach` dates.
+
+    Rather than building the date of each `CloseApproach`, the filter compares
+    the integer day ordinal stored on each approach with the ordinal of the
+    reference date, which is computed once.
+    """
+    column = 'date'
+
+    def __init__(self, op, value):
+        """Initialize a `DateFilter` with a comparator and reference date."""
+        super().__init__(op, value)
+        self._day = value.toordinal()
+
+    def __call__(self, approach):
+        """Compare the day of a `CloseApproach` with the reference date."""
+        return self.op(approach.day, self._day)
+
     @classmethod
     def get(cls, approach):
         """Retrieve the date of a `CloseApproach`."""
         return approach.time.date()
 
+    def reference(self):
+        """Return the reference date as a proleptic Gregorian ordinal."""
+        return self._day
+
 class DistanceFilter(AttributeFilter):
     """Filter for `CloseApproach` distances."""
-    
+    column = 'distance'
+
     @classmethod
     def get(cls, approach):
         """Retrieve the distance of a `CloseApproach`."""
@@ -93,7 +140,8 @@ class DistanceFilter(AttributeFilter):
 
 class VelocityFilter(AttributeFilter):
     """Filter for `CloseApproach` velocities."""
-    
+    column = 'velocity'
+
     @classmethod
     def get(cls, approach):
         """Retrieve the velocity of a `CloseApproach`."""
@@ -101,7 +149,8 @@ class VelocityFilter(AttributeFilter):
 
 class DiameterFilter(AttributeFilter):
     """Filter for NEO diameters associated with `CloseApproach` objects."""
-    
+    column = 'diameter'
+
     @classmethod
     def get(cls, approach):
         """Retrieve the diameter of the NEO associated with a `CloseApproach`."""
@@ -109,7 +158,8 @@ class DiameterFilter(AttributeFilter):
 
 class HazardousFilter(AttributeFilter):
     """Filter for hazardous NEOs associated with `CloseApproach` objects."""
-    
+    column = 'hazardous'
+
     @classmethod
     def get(cls, approach):
         """Retrieve the hazardous status of the NEO associated with a `CloseApproach`."""
@@ -182,3 +232,66 @@ def limit(iterator, n=None):
     else:
         for _, value in zip(range(n), iterator):
             yield value
+
+
+def _diameter(approach):
+    """Get the diameter of an approach's NEO, which is NaN if unknown."""
+    return approach.neo.diameter if approach.neo else math.nan
+
+
+def _diameter_ascending(approach):
+    """Rank an approach by its NEO's diameter, above every known diameter if unknown."""
+    value = _diameter(approach)
+    return (math.isnan(value), value)
+
+
+def _diameter_descending(approach):
+    """Rank an approach by its NEO's diameter, below every known diameter if unknown."""
+    value = _diameter(approach)
+    return (not math.isnan(value), value)
+
+
+# Fetch the value of each key by which results can be sorted from a `CloseApproach`.
+_SORT_KEYS = {
+    'time': operator.attrgetter('sort_key'),
+    'distance': operator.attrgetter('distance'),
+    'velocity': operator.attrgetter('velocity'),
+    'diameter': _diameter,
+}
+
+# The keys by which results can be sorted.
+SORT_KEYS = tuple(_SORT_KEYS)
+
+
+def sort_results(iterator, by, n=None, descending=False):
+    """Sort close approaches by a key, keeping at most `n` of them.
+
+    When `n` is given, the first `n` approaches are selected with a bounded heap,
+    in O(N log n) time and O(n) memory, without sorting the other approaches.
+    Approaches with equal keys stay in the order in which they were produced, and
+    unknown (NaN) diameters sort last in either direction.
+
+    Query results are already in chronological order, so sorting them by time in
+    ascending order only limits them.
+
+    :param iterator: An iterator of `CloseApproach` objects, such as the results of a query.
+    :param by: The key to sort by, one of `SORT_KEYS`.
+    :param n: The maximum number of approaches to produce, or None or zero for all of them.
+    :param descending: Whether to sort from the largest key to the smallest.
+    :return: An iterator of the sorted `CloseApproach` objects.
+    :raise UnsupportedCriterionError: If the key is unknown.
+    """
+    if by not in _SORT_KEYS:
+        raise UnsupportedCriterionError(f"Can't sort by {by!r}. Use one of {', '.join(SORT_KEYS)}.")
+    if by == 'time' and not descending:
+        return limit(iterator, n)
+
+    if by == 'diameter':
+        key = _diameter_descending if descending else _diameter_ascending
+    else:
+        key = _SORT_KEYS[by]
+
+    if not n:
+        return iter(sorted(iterator, key=key, reverse=descending))
+    select = heapq.nlargest if descending else heapq.nsmallest
+    return iter(select(n, iterator, key=key))
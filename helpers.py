@@ -3,7 +3,15 @@
 NASA's dataset provides timestamps as naive datetimes (corresponding to UTC).
 
 The `cd_to_datetime` function converts a string, formatted as the `cd` field of
-NASA's close approach data, into a Python `datetime`
+NASA's close approach data, into a Python `datetime`. It parses NASA's fixed
+format directly, and only falls back to `datetime.strptime` for strings that
+don't follow that format exactly.
+
+The `cd_to_day_minute` function converts such a string into a pair of integers -
+the proleptic Gregorian ordinal of its date, and the minute of that day - which
+is much cheaper to compute and store than a `datetime`. The `day_minute_to_datetime`
+function converts such a pair back into a Python `datetime`, and the
+`day_minute_to_str` function formats it like `datetime_to_str`.
 
 The `datetime_to_str` function converts a Python `datetime` into a string.
 Although `datetime`s already have human-readable string representations, those
@@ -11,6 +19,61 @@ representations display seconds, but NASA's data (and our datetimes!) don't
 provide that level of resolution, so the output format also will not.
 """
 import datetime
+import functools
+import re
+
+# English abbreviated month names, as used by NASA's `cd` field.
+_MONTHS = {name: number for number, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)}
+
+# Every valid `hh:mm` time of day, mapped to its hour and minute.
+_TIMES = {f"{hour:02d}:{minute:02d}": (hour, minute) for hour in range(24) for minute in range(60)}
+
+# Every valid `hh:mm` time of day, mapped to the minute of the day. Every caller
+# shares these int objects, instead of allocating their own.
+_MINUTES = {time: hour * 60 + minute for time, (hour, minute) in _TIMES.items()}
+
+# The `hh:mm` time of day of every minute of the day, in order.
+_TIME_STRS = list(_TIMES)
+
+_CD_DATE_PATTERN = re.compile(r'([0-9]{4})-([A-Z][a-z]{2})-([0-9]{2})')
+
+
+@functools.lru_cache(maxsize=None)
+def _cd_date(prefix):
+    """Parse the `YYYY-bb-DD` date prefix of a NASA-formatted calendar date.
+
+    Close approaches are dense in time, so there are far fewer distinct dates
+    than approaches; each distinct date prefix is only parsed once.
+
+    :param prefix: The first 11 characters of a calendar date.
+    :return: A tuple of the year, month and day, or None if the prefix isn't a valid date.
+    """
+    match = _CD_DATE_PATTERN.fullmatch(prefix)
+    if not match or match.group(2) not in _MONTHS:
+        return None
+    year, month, day = int(match.group(1)), _MONTHS[match.group(2)], int(match.group(3))
+    try:
+        datetime.date(year, month, day)
+    except ValueError:
+        return None
+    return year, month, day
+
+
+@functools.lru_cache(maxsize=None)
+def _cd_day(prefix):
+    """Convert the `YYYY-bb-DD` date prefix of a calendar date into a day ordinal.
+
+    As with `_cd_date`, each distinct date prefix is only converted once, so all
+    approaches on the same date share a single int object for its ordinal.
+
+    :param prefix: The first 11 characters of a calendar date.
+    :return: The proleptic Gregorian ordinal of the date, or None if the prefix isn't a valid date.
+    """
+    date = _cd_date(prefix)
+    if date is None:
+        return None
+    return datetime.date(*date).toordinal()
 
 
 def cd_to_datetime(calendar_date):
@@ -23,12 +86,72 @@ def cd_to_datetime(calendar_date):
 
     This will become the Python object `datetime.datetime(2020, 12, 31, 12, 0)`.
 
+    Calendar dates in exactly this format are parsed by slicing. Anything else
+    is handed to `datetime.strptime`, so that the results (and errors) are the
+    same as those of `datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")`.
+
     :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
     :return: A naive `datetime` corresponding to the given calendar date and time.
     """
+    if type(calendar_date) is str and len(calendar_date) == 17 and calendar_date[11] == ' ':
+        date = _cd_date(calendar_date[:11])
+        time = _TIMES.get(calendar_date[12:])
+        if date is not None and time is not None:
+            return datetime.datetime(*date, *time)
     return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
 
 
+def cd_to_day_minute(calendar_date):
+    """Convert a NASA-formatted calendar date/time description into integers.
+
+    For example, `2020-Dec-31 12:00` becomes `(737790, 720)`: the proleptic
+    Gregorian ordinal of December 31st, 2020, and the 720th minute of that day.
+
+    Calendar dates that `cd_to_datetime` can't parse raise the same errors.
+
+    :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
+    :return: A tuple of the day ordinal and the minute of the day.
+    """
+    if type(calendar_date) is str and len(calendar_date) == 17 and calendar_date[11] == ' ':
+        day = _cd_day(calendar_date[:11])
+        minute = _MINUTES.get(calendar_date[12:])
+        if day is not None and minute is not None:
+            return day, minute
+    dt = cd_to_datetime(calendar_date)
+    return dt.toordinal(), dt.hour * 60 + dt.minute
+
+
+def day_minute_to_datetime(day, minute):
+    """Convert a day ordinal and a minute of that day into a naive datetime.
+
+    This is the inverse of `cd_to_day_minute`.
+
+    :param day: The proleptic Gregorian ordinal of a date.
+    :param minute: The minute of that day.
+    :return: A naive `datetime` corresponding to the given day and minute.
+    """
+    return datetime.datetime.fromordinal(day) + datetime.timedelta(minutes=minute)
+
+
+@functools.lru_cache(maxsize=None)
+def _day_str(day):
+    """Format a day ordinal as a `YYYY-MM-DD` date, once per distinct day."""
+    return datetime.date.fromordinal(day).strftime("%Y-%m-%d")
+
+
+def day_minute_to_str(day, minute):
+    """Convert a day ordinal and a minute of that day into a human-readable string.
+
+    The result is the same as `datetime_to_str(day_minute_to_datetime(day, minute))`,
+    but neither a `datetime` nor a call to `strftime` is needed for each conversion.
+
+    :param day: The proleptic Gregorian ordinal of a date.
+    :param minute: The minute of that day.
+    :return: That date and time, as a human-readable string without seconds.
+    """
+    return f"{_day_str(day)} {_TIME_STRS[minute]}"
+
+
 def datetime_to_str(dt):
     """Convert a naive Python datetime into a human-readable string.
 
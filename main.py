@@ -5,7 +5,7 @@ See `README.md` for a detailed discussion of this project.
 
 This script can be invoked from the command line::
 
-    $ python3 main.py {inspect,query,interactive} [args]
+    $ python3 main.py {inspect,query,interactive,serve} [args]
 
 The `inspect` subcommand looks up an NEO by name or by primary designation, and
 optionally lists all of that NEO's known close approaches:
@@ -23,32 +23,97 @@ The `query` subcommand searches for close approaches that match given criteria:
     $ python3 main.py query --start-date 2000-01-01 --max-diameter 0.1 --not-hazardous
     $ python3 main.py query --hazardous --max-distance 0.05 --min-velocity 30
 
-The set of results can be limited in size and/or saved to an output file in CSV
-or JSON format:
+The plan chosen to evaluate a query's filters can be shown with `--explain`:
+
+    $ python3 main.py query --start-date 2020-01-01 --max-distance 0.025 --hazardous --explain
+
+The set of results can be limited in size and/or saved to an output file in CSV,
+JSON, newline-delimited JSON (`.ndjson` or `.jsonl`) or NumPy NPZ format:
 
     $ python3 main.py query --limit 5 --outfile results.csv
     $ python3 main.py query --limit 15 --outfile results.json
+    $ python3 main.py query --hazardous --outfile results.ndjson
+    $ python3 main.py query --start-date 2020-01-01 --outfile results.npz
+
+The results can be sorted by time, distance, velocity or diameter, for instance
+to find the ten closest approaches, or the fastest approaches of hazardous NEOs:
+
+    $ python3 main.py query --sort-by distance --limit 10
+    $ python3 main.py query --hazardous --sort-by velocity --desc --limit 20
+
+Queries that scan many close approaches, such as large exports, can be evaluated
+by several worker processes at once with `--jobs` (0 for one per CPU):
+
+    $ python3 main.py query --min-velocity 10 --jobs 0 --outfile results.csv
 
 The `interactive` subcommand loads the NEO database and spawns an interactive
 command shell that can repeatedly execute `inspect` and `query` commands without
-having to wait to reload the database each time. However, it doesn't hot-reload.
+having to wait to reload the database each time. When the data files change, the
+shell ingests their new and changed records into its database before the next
+command (unless `--no-reload` is given), but changes to the code still require a
+restart. The shell caches the results of recent queries (see `querycache.py`); its `cache`
+command shows the cache's hit rate, and `cache clear` empties it.
+
+The `serve` subcommand loads the NEO database once, and then answers `inspect`
+and `query` requests from concurrent clients with JSON responses, over HTTP on a
+localhost port or on a Unix domain socket (see `server.py` for the endpoints):
+
+    $ python3 main.py serve --port 8000
+    $ curl 'http://127.0.0.1:8000/query?start-date=2020-01-01&max-distance=0.025&limit=5'
 
 If needed, the script can load data from data files other than the default with
 `--neofile` or `--cadfile`.
+
+Queries can be answered by a columnar query engine, which evaluates the filters
+as vectorized NumPy masks, with `--engine columnar`:
+
+    $ python3 main.py --engine columnar query --hazardous --max-distance 0.05
+
+With `--engine mapped`, the close approaches are instead exported to a binary
+store file of fixed-width records in the `.cache` folder, which is memory-mapped
+and queried without building objects for the approaches that don't match.
+Processes that map the same store share one copy of it in the page cache. The
+mapped database is read-only, so the interactive shell doesn't reload it.
+
+The linked database is saved to a snapshot in the `.cache` folder, which later
+runs load directly for as long as the data files are unchanged. Use `--no-cache`
+to bypass the snapshot, or `--rebuild-cache` to replace it.
+
+When the data files are loaded rather than a snapshot, they can be parsed by
+several worker processes at once with `--load-jobs` (0 for one per CPU):
+
+    $ python3 main.py --rebuild-cache --load-jobs 0 query --hazardous
+
+With `--profile`, the wall-clock and CPU time of each phase of the run (loading
+the NEOs and the close approaches, linking them into a database, querying or
+inspecting, and writing the results) is printed to stderr when the run ends.
+`--profile-memory` adds the peak and retained memory of each phase, as traced by
+`tracemalloc`, and `--profile-output` saves a `cProfile` profile of the whole run,
+which can be browsed with `pstats` or `snakeviz`:
+
+    $ python3 main.py --no-cache --profile-memory query --hazardous --outfile results.csv
+    $ python3 main.py --profile-output main.prof query --start-date 2020-01-01
 """
 
 import argparse
 import cmd
+import cProfile
 import datetime
 import pathlib
 import shlex
 import sys
 import time
 
-from extract import load_neos, load_approaches
 from database import NEODatabase
-from filters import create_filters, limit
-from write import write_to_csv, write_to_json
+from columnar import ColumnarNEODatabase
+from mapped import load_store
+from profiling import PhaseProfiler, enabled as profiling_enabled, phase
+from snapshot import load_database
+from querycache import DEFAULT_MAX_BYTES, QueryCache
+from reloader import DataReloader, describe
+from filters import SORT_KEYS, create_filters, limit, sort_results
+from write import write_to_csv, write_to_json, write_to_ndjson, write_to_npz
+from server import serve
 
 # Paths to the root of the project and the `data` subfolder.
 PROJECT_ROOT = pathlib.Path(__file__).parent.resolve()
@@ -91,6 +156,26 @@ def make_parser():
     parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'),
                         type=pathlib.Path,
                         help="Path to JSON file of close approach data.")
+    parser.add_argument('--engine', choices=('python', 'columnar', 'mapped'), default='python',
+                        help="The query engine to use. The columnar engine evaluates filters "
+                             "as vectorized masks, and requires NumPy. The mapped engine queries "
+                             "a memory-mapped binary store of the close approaches.")
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument('--no-cache', dest='use_cache', action='store_false',
+                       help="Load the data files directly, without reading or saving a snapshot "
+                            "of the database.")
+    cache.add_argument('--rebuild-cache', action='store_true',
+                       help="Ignore any existing snapshot of the database, and save a fresh one.")
+    parser.add_argument('--load-jobs', type=int, default=1, metavar='N',
+                        help="The number of worker processes that parse the data files, "
+                             "or 0 for one per CPU. Defaults to 1, parsing them in this process.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Print the wall-clock and CPU time of each phase of the run to stderr.")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Also print the peak and retained memory of each phase, as traced by "
+                             "tracemalloc. Implies --profile.")
+    parser.add_argument('--profile-output', type=pathlib.Path, metavar='PATH',
+                        help="Save a cProfile profile of the run to this .prof file. Implies --profile.")
     subparsers = parser.add_subparsers(dest='cmd')
 
     # Add the `inspect` subcommand parser.
@@ -149,15 +234,43 @@ def make_parser():
     query.add_argument('-l', '--limit', type=int,
                        help="The maximum number of matches to return. "
                             "Defaults to 10 if no --outfile is given.")
+    query.add_argument('--sort-by', choices=SORT_KEYS,
+                       help="Sort the matches by this attribute, keeping only the first --limit of them. "
+                            "Unknown diameters sort last.")
+    query.add_argument('--desc', action='store_true',
+                       help="Sort the matches in descending order (by time, unless --sort-by is given).")
     query.add_argument('-o', '--outfile', type=pathlib.Path,
-                       help="File in which to save structured results. "
+                       help="File in which to save structured results, in a format chosen by its "
+                            "extension: .csv, .json, .ndjson, .jsonl or .npz. "
                             "If omitted, results are printed to standard output.")
+    query.add_argument('--compact', action='store_true',
+                       help="Write JSON output without indentation or whitespace.")
+    query.add_argument('--explain', action='store_true',
+                       help="Print how the query would be evaluated, instead of running it.")
+    query.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                       help="The number of worker processes that evaluate the query, "
+                            "or 0 for one per CPU. Defaults to 1.")
 
     repl = subparsers.add_parser('interactive',
                                  description="Start an interactive command session "
                                              "to repeatedly run `inspect` and `query` commands.")
     repl.add_argument('-a', '--aggressive', action='store_true',
                       help="If specified, kill the session whenever a project file is changed.")
+    repl.add_argument('--cache-size', type=float, default=DEFAULT_MAX_BYTES / (1 << 20), metavar='MIB',
+                      help="The memory budget, in MiB, of the cache of query results. "
+                           "Use 0 to disable the cache. Defaults to %(default)g.")
+    repl.add_argument('--no-reload', dest='reload', action='store_false',
+                      help="Don't reload the data files when they change during the session.")
+
+    serve_parser = subparsers.add_parser('serve',
+                                         description="Serve `inspect` and `query` requests as JSON "
+                                                     "over HTTP, loading the database only once.")
+    serve_parser.add_argument('--host', default='127.0.0.1',
+                              help="The address on which to listen. Defaults to localhost.")
+    serve_parser.add_argument('--port', type=int, default=8000,
+                              help="The TCP port on which to listen. Defaults to 8000.")
+    serve_parser.add_argument('--socket', type=pathlib.Path,
+                              help="Listen on a Unix domain socket at this path, instead of a TCP port.")
     return parser, inspect, query
 
 def inspect(database, pdes=None, name=None, verbose=False):
@@ -182,10 +295,11 @@ def inspect(database, pdes=None, name=None, verbose=False):
     :rtype: NearEarthObject or None
     """
     # Fetch the NEO of interest.
-    if pdes:
-        neo = database.get_neo_by_designation(pdes)
-    else:
-        neo = database.get_neo_by_name(name)
+    with phase('inspect'):
+        if pdes:
+            neo = database.get_neo_by_designation(pdes)
+        else:
+            neo = database.get_neo_by_name(name)
 
     # Ensure that we have received an NEO.
     if not neo:
@@ -193,27 +307,32 @@ def inspect(database, pdes=None, name=None, verbose=False):
         return None
 
     # Display information about this NEO, and optionally its close approaches if verbose.
-    print(neo)
-    if verbose:
-        for approach in neo.approaches:
-            print(f"- {approach}")
+    with phase('write'):
+        print(neo)
+        if verbose:
+            for approach in neo.approaches:
+                print(f"- {approach}")
     return neo
 
-def query(database, args):
+def query(database, args, cache=None):
     """Perform the `query` subcommand.
 
     Create a collection of filters with `create_filters` and supply them to the
     database's `query` method to produce a stream of matching results.
 
-    If an output file wasn't given, print these results to stdout, limiting to
-    10 entries if no limit was specified. If an output file was given, use the
-    file's extension to infer whether the file should hold CSV or JSON data, and
-    then write the results to the output file in that format.
+    If a sort order was given, sort the results, keeping only as many of them as
+    will be shown or written. If an output file wasn't given, print these results
+    to stdout, limiting to 10 entries if no limit was specified. If an output file
+    was given, use the file's extension to infer whether the file should hold CSV,
+    JSON, NDJSON or NPZ data, and then write the results to the output file in that
+    format.
 
     :param database: The `NEODatabase` containing data on NEOs and their close approaches.
     :type database: NEODatabase
     :param args: All arguments from the command line, as parsed by the top-level parser.
     :type args: argparse.Namespace
+    :param cache: A cache of the results of previous queries against the database.
+    :type cache: QueryCache, optional
     """
     # Construct a collection of filters from arguments supplied at the command line.
     filters = create_filters(
@@ -223,9 +342,35 @@ def query(database, args):
         diameter_min=args.diameter_min, diameter_max=args.diameter_max,
         hazardous=args.hazardous
     )
-    # Query the database with the collection of filters.
-    results = database.query(filters)
+    if args.explain:
+        # Describe the query plan, without running the query.
+        print(database.explain(filters))
+        return
+
+    # Query the database (or the cache) with the collection of filters.
+    n = args.limit if args.outfile else args.limit or 10
+    with phase('query'):
+        if cache is not None:
+            results = cache.query(filters, jobs=args.jobs)
+        else:
+            results = database.query(filters, jobs=args.jobs)
+        if args.sort_by or args.desc:
+            # Keep only as many of the sorted results as will be shown or written.
+            results = sort_results(results, args.sort_by or 'time', n, descending=args.desc)
+        if profiling_enabled():
+            # Run the query to completion here, so its time isn't counted as writing.
+            results = list(limit(results, n))
+
+    with phase('write'):
+        _write_results(results, args)
 
+def _write_results(results, args):
+    """Print the results of the `query` subcommand, or write them to an output file.
+
+    :param results: An iterable of `CloseApproach`es.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    :type args: argparse.Namespace
+    """
     if not args.outfile:
         # Write the results to stdout, limiting to 10 entries if not specified.
         for result in limit(results, args.limit or 10):
@@ -235,9 +380,14 @@ def query(database, args):
         if args.outfile.suffix == '.csv':
             write_to_csv(limit(results, args.limit), args.outfile)
         elif args.outfile.suffix == '.json':
-            write_to_json(limit(results, args.limit), args.outfile)
+            write_to_json(limit(results, args.limit), args.outfile, compact=args.compact)
+        elif args.outfile.suffix in ('.ndjson', '.jsonl'):
+            write_to_ndjson(limit(results, args.limit), args.outfile)
+        elif args.outfile.suffix == '.npz':
+            write_to_npz(limit(results, args.limit), args.outfile)
         else:
-            print("Please use an output file that ends with `.csv` or `.json`.", file=sys.stderr)
+            print("Please use an output file that ends with `.csv`, `.json`, `.ndjson`, `.jsonl` "
+                  "or `.npz`.", file=sys.stderr)
 
 class NEOShell(cmd.Cmd):
     """Perform the `interactive` subcommand.
@@ -255,7 +405,8 @@ class NEOShell(cmd.Cmd):
              "Type `help` or `?` to list commands and `exit` to exit.\n")
     prompt = '(neo) '
 
-    def __init__(self, database, inspect_parser, query_parser, aggressive=False, **kwargs):
+    def __init__(self, database, inspect_parser, query_parser, aggressive=False, cache=None, reloader=None,
+                 **kwargs):
         """Create a new `NEOShell`.
 
         Creating this object doesn't start the session - for that, use `.cmdloop()`.
@@ -268,6 +419,10 @@ class NEOShell(cmd.Cmd):
         :type query_parser: argparse.ArgumentParser
         :param aggressive: Whether to kill the session whenever a project file is changed.
         :type aggressive: bool
+        :param cache: A cache of query results, or None to run every query against the database.
+        :type cache: QueryCache, optional
+        :param reloader: A watcher of the data files, or None to never reload them.
+        :type reloader: DataReloader, optional
         :param kwargs: A dictionary of excess keyword arguments passed to the superclass.
         :type kwargs: dict
         """
@@ -276,6 +431,8 @@ class NEOShell(cmd.Cmd):
         self.inspect = inspect_parser
         self.query = query_parser
         self.aggressive = aggressive
+        self.cache = cache
+        self.reloader = reloader
 
     @classmethod
     def parse_arg_with(cls, arg, parser):
@@ -352,18 +509,42 @@ class NEOShell(cmd.Cmd):
 
             (neo) query --limit 2
 
+        The results can be sorted with `--sort-by`, in descending order with `--desc`:
+
+            (neo) query --sort-by distance --limit 5
+
         The results can be saved to a file (instead of displayed to stdout) with
         `--outfile`:
 
             (neo) query --limit 5 --outfile results.csv
             (neo) query --limit 5 --outfile results.json
+            (neo) query --limit 5 --outfile results.ndjson
+
+        The results of recent queries are cached, so repeating a query, or narrowing
+        it down with more options, doesn't scan the whole database again.
         """
         args = self.parse_arg_with(arg, self.query)
         if not args:
             return
 
         # Run the `query` subcommand.
-        query(self.db, args)
+        query(self.db, args, cache=self.cache)
+
+    def do_cache(self, arg):
+        """Show the statistics of the cache of query results, or clear it.
+
+            (neo) cache
+            (neo) cache clear
+        """
+        if self.cache is None:
+            print("The cache of query results is disabled.", file=sys.stderr)
+        elif arg.strip() == 'clear':
+            self.cache.clear()
+            print("Cleared the cache of query results.")
+        elif arg.strip():
+            print(f"Unknown argument {arg.strip()!r}. Use `cache` or `cache clear`.", file=sys.stderr)
+        else:
+            print(self.cache)
 
     def do_EOF(self, _arg):
         """Exit the interactive session."""
@@ -374,12 +555,15 @@ class NEOShell(cmd.Cmd):
     do_quit = do_EOF
 
     def precmd(self, line):
-        """Watch for changes to the files in this project.
+        """Watch for changes to the files in this project, and to the data files.
 
         This method checks if any project files have been modified since the
         interactive session began. If changes are detected and `aggressive` mode
         is enabled, the session will be terminated.
 
+        Changed data files are reloaded into the database, and the cache of query
+        results is invalidated.
+
         :param line: The command line input.
         :type line: str
         :return: The command line input if no file changes are detected or if not in aggressive mode;
@@ -397,6 +581,17 @@ class NEOShell(cmd.Cmd):
             else:
                 print("Preemptively terminating the session aggressively.", file=sys.stderr)
                 return 'exit'
+
+        if self.reloader is not None:
+            try:
+                summary = self.reloader.poll()
+            except (OSError, ValueError) as err:
+                print(f"Couldn't reload the data files: {err}", file=sys.stderr)
+            else:
+                if summary is not None:
+                    print(describe(summary), file=sys.stderr)
+                    if self.cache is not None:
+                        self.cache.invalidate()
         return line
 
 def main():
@@ -408,9 +603,43 @@ def main():
     """
     parser, inspect_parser, query_parser = make_parser()
     args = parser.parse_args()
+    if not (args.profile or args.profile_memory or args.profile_output):
+        run(args, inspect_parser, query_parser)
+        return
+
+    # Time each phase of the run, and optionally profile the whole run with cProfile.
+    profile = cProfile.Profile() if args.profile_output else None
+    with PhaseProfiler(memory=args.profile_memory) as profiler:
+        try:
+            if profile is not None:
+                profile.enable()
+            run(args, inspect_parser, query_parser)
+        finally:
+            if profile is not None:
+                profile.disable()
+                profile.dump_stats(args.profile_output)
+            print(profiler.report(), file=sys.stderr)
+
+def run(args, inspect_parser, query_parser):
+    """Load the database, and run the chosen subcommand.
 
-    # Extract data from the data files into structured Python objects.
-    database = NEODatabase(load_neos(args.neofile), load_approaches(args.cadfile))
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    :type args: argparse.Namespace
+    :param inspect_parser: The subparser for the `inspect` subcommand.
+    :type inspect_parser: argparse.ArgumentParser
+    :param query_parser: The subparser for the `query` subcommand.
+    :type query_parser: argparse.ArgumentParser
+    """
+    # Extract data from the data files into structured Python objects, or load
+    # them from a snapshot saved by a previous run on the same data files.
+    if args.engine == 'mapped':
+        database = load_store(args.neofile, args.cadfile, use_cache=args.use_cache,
+                              rebuild=args.rebuild_cache, jobs=args.load_jobs)
+    else:
+        database_class = ColumnarNEODatabase if args.engine == 'columnar' else NEODatabase
+        database = load_database(args.neofile, args.cadfile, database_class,
+                                 use_cache=args.use_cache, rebuild=args.rebuild_cache,
+                                 jobs=args.load_jobs)
 
     # Run the chosen subcommand.
     if args.cmd == 'inspect':
@@ -418,7 +647,13 @@ def main():
     elif args.cmd == 'query':
         query(database, args)
     elif args.cmd == 'interactive':
-        NEOShell(database, inspect_parser, query_parser, aggressive=args.aggressive).cmdloop()
+        cache = QueryCache(database, int(args.cache_size * (1 << 20))) if args.cache_size > 0 else None
+        reloader = (DataReloader(database, args.neofile, args.cadfile)
+                    if args.reload and args.engine != 'mapped' else None)
+        NEOShell(database, inspect_parser, query_parser,
+                 aggressive=args.aggressive, cache=cache, reloader=reloader).cmdloop()
+    elif args.cmd == 'serve':
+        serve(database, host=args.host, port=args.port, socket_path=args.socket)
 
 if __name__ == '__main__':
     main()
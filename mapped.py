@@ -0,0 +1,395 @@
+"""A memory-mapped, read-only query engine for close approaches.
+
+`write_store` exports NEOs and close approaches to a binary store file, in which
+each close approach is a fixed-width record:
+
+    int64    timestamp, in minutes since 1970-01-01 00:00
+    float64  nominal approach distance, in au
+    float64  relative approach velocity, in km/s
+    int32    index of the approach's NEO in the NEO table
+
+The records are sorted chronologically, and are followed by the positions of
+each NEO's records (grouped by NEO, and chronological within each group), and
+by a small JSON table of the NEOs. Designations of approaches whose NEO isn't
+known are kept in the NEO table too, so that no approach loses its designation.
+
+A `MappedNEODatabase` `mmap`s a store file, and answers `inspect` and `query`
+requests like an `NEODatabase`. Only the NEO table is parsed into Python
+objects when the store is opened. A query bisects the timestamps into a date
+window, evaluates the other criteria on the window's records (as vectorized
+NumPy masks, or record by record with `struct` if NumPy isn't installed), and
+only builds `CloseApproach` objects for the matching records. The records are
+never copied into the process, so any number of processes that open the same
+store share one page-cached copy of it.
+
+`load_store` keeps a store file in the `.cache` folder, alongside the snapshots
+of the `snapshot` module, and rebuilds it whenever the data files change.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from extract import load_neos, load_approaches, load_parallel
+from models import NearEarthObject, CloseApproach
+from planner import collect_statistics, plan_query
+from profiling import phase
+from snapshot import CACHE_ROOT, snapshot_key, snapshot_path
+
+# Bump this whenever the layout of store files changes.
+STORE_VERSION = 1
+
+_MAGIC = b'NEOSTORE'
+
+# The header: magic, version, key length, record count, NEO table entry count, NEO table length.
+_HEADER = struct.Struct('<8sIIqqq')
+
+# A close approach: timestamp, distance, velocity and NEO index.
+_RECORD = struct.Struct('<qddi')
+
+# The position of a record in the chronological records.
+_POSITION = struct.Struct('<i')
+
+# The day ordinal of the Unix epoch, from which timestamps are counted.
+_EPOCH_DAY = 719163
+
+_MINUTES_PER_DAY = 1440
+
+# The number of matching records converted to Python values at a time by a query.
+_SLICE_SIZE = 4096
+
+if np is not None:
+    _RECORD_DTYPE = np.dtype([('timestamp', '<i8'), ('distance', '<f8'), ('velocity', '<f8'), ('neo', '<i4')])
+
+
+def write_store(neos, approaches, path, key=b''):
+    """Export NEOs and close approaches to a binary store file.
+
+    :param neos: A collection of `NearEarthObject`s.
+    :param approaches: A collection of `CloseApproach`es.
+    :param path: The path of the store file.
+    :param key: Bytes that identify the data the store is built from, checked by `MappedNEODatabase`.
+    """
+    table = [[neo.designation, neo.name, neo.diameter, neo.hazardous, True] for neo in neos]
+    indices = {neo.designation: index for index, neo in enumerate(neos)}
+    ordered = sorted(approaches, key=lambda approach: approach.sort_key)
+
+    neo_indices = []
+    for approach in ordered:
+        index = indices.get(approach._designation)
+        if index is None:
+            index = indices[approach._designation] = len(table)
+            table.append([approach._designation, None, float('nan'), False, False])
+        neo_indices.append(index)
+
+    # Group the positions of the records by NEO, keeping each group chronological.
+    by_neo = sorted(range(len(ordered)), key=neo_indices.__getitem__)
+    counts = [0] * len(table)
+    for index in neo_indices:
+        counts[index] += 1
+    for entry, count in zip(table, counts):
+        entry.append(count)
+    table_bytes = json.dumps(table).encode('utf-8')
+
+    with open(path, 'wb') as outfile:
+        outfile.write(_HEADER.pack(_MAGIC, STORE_VERSION, len(key), len(ordered), len(table), len(table_bytes)))
+        outfile.write(key)
+        outfile.write(b''.join(
+            _RECORD.pack((approach.day - _EPOCH_DAY) * _MINUTES_PER_DAY + approach._minute,
+                         approach.distance, approach.velocity, index)
+            for approach, index in zip(ordered, neo_indices)))
+        outfile.write(struct.pack(f'<{len(by_neo)}i', *by_neo))
+        outfile.write(table_bytes)
+
+
+class _Days:
+    """The day ordinals of a store's chronological records, as a sequence for bisection."""
+
+    def __init__(self, buffer, offset, count):
+        """Wrap the records of a store.
+
+        :param buffer: The contents of the store file.
+        :param offset: The offset of the first record.
+        :param count: The number of records.
+        """
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        """Count the records."""
+        return self._count
+
+    def __getitem__(self, position):
+        """Get the day ordinal of the record at a position."""
+        timestamp, = struct.unpack_from('<q', self._buffer, self._offset + position * _RECORD.size)
+        return _EPOCH_DAY + timestamp // _MINUTES_PER_DAY
+
+
+class MappedNEODatabase:
+    """A read-only database of near-Earth objects, served off a memory-mapped store file.
+
+    A `MappedNEODatabase` has the same `get_neo_by_designation`, `get_neo_by_name`,
+    `explain` and `query` methods as an `NEODatabase`. Each query builds new
+    `CloseApproach` objects for its results, and an NEO's approaches are built
+    the first time the NEO is looked up.
+    """
+
+    def __init__(self, path, key=None):
+        """Open a store file.
+
+        :param path: The path of the store file, as written by `write_store`.
+        :param key: The key that the store must have been written with, or None to accept any key.
+        :raise ValueError: If the file isn't a store file of this version, or has a different key.
+        """
+        with open(path, 'rb') as infile:
+            self._buffer = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError(f"{path} is not a close approach store.")
+        magic, version, key_length, count, entries, table_length = _HEADER.unpack_from(self._buffer)
+        if magic != _MAGIC or version != STORE_VERSION:
+            raise ValueError(f"{path} is not a version {STORE_VERSION} close approach store.")
+        if key is not None and self._buffer[_HEADER.size:_HEADER.size + key_length] != key:
+            raise ValueError(f"{path} was built from other data.")
+
+        self._records_offset = _HEADER.size + key_length
+        self._by_neo_offset = self._records_offset + count * _RECORD.size
+        table_offset = self._by_neo_offset + count * _POSITION.size
+        table = json.loads(self._buffer[table_offset:table_offset + table_length].decode('utf-8'))
+        self._count = count
+
+        # Build the NEOs, and find the positions of each NEO's records.
+        self._designations = []
+        self._neos = []
+        self._groups = []
+        first = 0
+        for designation, name, diameter, hazardous, known, group_count in table:
+            self._designations.append(designation)
+            self._neos.append(NearEarthObject(designation, name, diameter, hazardous) if known else None)
+            self._groups.append((first, group_count))
+            first += group_count
+        self._indices = {neo: index for index, neo in enumerate(self._neos) if neo is not None}
+        self._designation_dict = {neo.designation: neo for neo in self._indices}
+        self._name_dict = {neo.name: neo for neo in self._indices if neo.name}
+        self._linked = set()
+
+        self._days = _Days(self._buffer, self._records_offset, count)
+        if np is not None:
+            self._records = np.frombuffer(self._buffer, dtype=_RECORD_DTYPE, count=count,
+                                          offset=self._records_offset)
+            self._diameters = np.array([neo.diameter if neo else np.nan for neo in self._neos], dtype=np.float64)
+            self._hazardous = np.array([neo.hazardous if neo else False for neo in self._neos], dtype=np.bool_)
+
+        # Summarize the distribution of each filterable column from a sample of the records.
+        step = max(1, count // 2048)
+        self._statistics = collect_statistics([self._approach(position) for position in range(0, count, step)])
+
+    def __len__(self):
+        """Count the close approaches in the store."""
+        return self._count
+
+    def _build(self, timestamp, distance, velocity, index):
+        """Build a `CloseApproach` from the values of a record, linked to its NEO."""
+        day, minute = divmod(timestamp, _MINUTES_PER_DAY)
+        approach = CloseApproach.from_day_minute(self._designations[index], _EPOCH_DAY + day, minute,
+                                                 distance, velocity)
+        approach.neo = self._neos[index]
+        return approach
+
+    def _approach(self, position):
+        """Build the `CloseApproach` of the record at a position."""
+        return self._build(*_RECORD.unpack_from(self._buffer, self._records_offset + position * _RECORD.size))
+
+    def _link(self, neo):
+        """Build the approaches of an NEO, the first time it is looked up.
+
+        :param neo: A `NearEarthObject` from the store, or None.
+        :return: The NEO.
+        """
+        if neo is not None and neo not in self._linked:
+            first, count = self._groups[self._indices[neo]]
+            offset = self._by_neo_offset + first * _POSITION.size
+            neo.approaches = [self._approach(position)
+                              for position, in struct.iter_unpack('<i', self._buffer[offset:offset + count * 4])]
+            self._linked.add(neo)
+        return neo
+
+    def get_neo_by_designation(self, designation):
+        """Retrieve an NEO by its primary designation.
+
+        :param designation: The primary designation of the NEO to search for.
+        :return: The `NearEarthObject` with the desired primary designation, or `None`.
+        """
+        return self._link(self._designation_dict.get(designation))
+
+    def get_neo_by_name(self, name):
+        """Retrieve an NEO by its name.
+
+        :param name: The name of the NEO to search for.
+        :return: The `NearEarthObject` with the specified name, or `None` if not found.
+        """
+        return self._link(self._name_dict.get(name))
+
+    def plan(self, filters=()):
+        """Plan the evaluation of a query, without running it.
+
+        Like the columnar engine, this always scans the window of the date index.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :return: A `planner.QueryPlan` for the query.
+        """
+        return plan_query(filters, self._statistics, self._days)
+
+    def explain(self, filters=()):
+        """Explain how a query would be evaluated, without running it.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :return: A human-readable description of the query plan.
+        """
+        return str(self.plan(filters))
+
+    def query(self, filters=(), jobs=1):
+        """Query close approaches based on specified filters.
+
+        The fused predicates of the plan are evaluated on the records of its date
+        window, and `CloseApproach` objects are only built for the records that
+        satisfy them, before any other callable filters are applied. The matching
+        records are converted a slice at a time, as the results are consumed.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :param jobs: Ignored, for compatibility with `NEODatabase.query`.
+        :return: An iterator yielding `CloseApproach` objects that match the filters, in
+            chronological order.
+        """
+        plan = self.plan(filters)
+        start, stop = plan.window
+        if np is not None:
+            records = self._records[start:stop]
+            if plan.predicates:
+                columns = {
+                    'distance': records['distance'],
+                    'velocity': records['velocity'],
+                }
+                if any(predicate.column in ('diameter', 'hazardous') for predicate in plan.predicates):
+                    columns['diameter'] = self._diameters[records['neo']]
+                    columns['hazardous'] = self._hazardous[records['neo']]
+                mask = np.ones(stop - start, dtype=np.bool_)
+                for predicate in plan.predicates:
+                    mask &= predicate.mask(columns)
+                positions = np.flatnonzero(mask)
+                slices = (records[positions[i:i + _SLICE_SIZE]] for i in range(0, len(positions), _SLICE_SIZE))
+            else:
+                slices = (records[i:i + _SLICE_SIZE] for i in range(0, len(records), _SLICE_SIZE))
+            rows = (row for part in slices for row in part.tolist())
+        else:
+            buffer = self._buffer[self._records_offset + start * _RECORD.size:
+                                  self._records_offset + stop * _RECORD.size]
+            rows = (row for row in _RECORD.iter_unpack(buffer)
+                    if self._matches(row, plan.predicates))
+
+        for row in rows:
+            approach = self._build(*row)
+            if all(f(approach) for f in plan.opaque):
+                yield approach
+
+    def _matches(self, row, predicates):
+        """Check whether the values of a record satisfy range predicates.
+
+        :param row: The values of a record.
+        :param predicates: A sequence of `RangePredicate`s.
+        :return: Whether the record satisfies every predicate.
+        """
+        _timestamp, distance, velocity, index = row
+        neo = self._neos[index]
+        values = {
+            'distance': distance,
+            'velocity': velocity,
+            'diameter': neo.diameter if neo else float('nan'),
+            'hazardous': neo.hazardous if neo else False,
+        }
+        return all(predicate.mask(values) for predicate in predicates)
+
+
+def _build_store(neofile, cadfile, path, key, jobs=1):
+    """Extract NEOs and close approaches from the data files into a store file.
+
+    :param neofile: Path to the CSV file of near-Earth objects.
+    :param cadfile: Path to the JSON file of close approach data.
+    :param path: The path of the store file.
+    :param key: Bytes that identify the data files.
+    :param jobs: The number of worker processes that parse the data files, or 1 to parse them in this process.
+    """
+    if jobs == 1:
+        with phase('load_neos'):
+            neos = load_neos(neofile)
+        with phase('load_approaches'):
+            approaches = load_approaches(cadfile)
+    else:
+        with phase('load_parallel'):
+            neos, approaches = load_parallel(neofile, cadfile, jobs or None)
+    with phase('write_store'):
+        write_store(neos, approaches, path, key)
+
+
+def _map_store(path, key):
+    """Open a store file as a `MappedNEODatabase`."""
+    with phase('map_store'):
+        return MappedNEODatabase(path, key)
+
+
+def _open_temporary_store(neofile, cadfile, key, jobs=1):
+    """Build a store of the data files in a temporary file, which is removed once it's mapped."""
+    descriptor, temporary = tempfile.mkstemp(suffix='.neostore')
+    os.close(descriptor)
+    try:
+        _build_store(neofile, cadfile, temporary, key, jobs)
+        return _map_store(temporary, key)
+    finally:
+        os.unlink(temporary)
+
+
+def load_store(neofile, cadfile, use_cache=True, rebuild=False, cache_root=CACHE_ROOT, jobs=1):
+    """Open a store of the data files, building it first if it's missing or stale.
+
+    The store is kept in the cache folder, keyed like a snapshot. Without the
+    cache, a store is built in a temporary file that is removed once it's mapped.
+
+    :param neofile: Path to the CSV file of near-Earth objects.
+    :param cadfile: Path to the JSON file of close approach data.
+    :param use_cache: Whether to keep the store in the cache folder at all.
+    :param rebuild: Whether to ignore any existing store, and build a fresh one.
+    :param cache_root: The folder in which stores are kept.
+    :param jobs: The number of worker processes that parse the data files, if the store is
+        built, 0 for one per CPU, or 1 to parse them in this process.
+    :return: A `MappedNEODatabase` holding the data from the data files.
+    """
+    snapshot = snapshot_key(neofile, cadfile, MappedNEODatabase)
+    key = repr(snapshot).encode('utf-8')
+    if not use_cache:
+        return _open_temporary_store(neofile, cadfile, key, jobs)
+
+    path = snapshot_path(snapshot, cache_root).with_suffix('.neostore')
+    if not rebuild:
+        try:
+            return _map_store(path, key)
+        except (OSError, ValueError):
+            pass
+
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _build_store(neofile, cadfile, partial, key, jobs)
+        os.replace(partial, path)
+    except OSError:
+        # A read-only project folder shouldn't prevent using the data.
+        return _open_temporary_store(neofile, cadfile, key, jobs)
+    finally:
+        if partial.exists():
+            partial.unlink()
+    return _map_store(path, key)
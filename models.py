@@ -6,7 +6,8 @@ for whether the object is potentially hazardous.
 
 The `CloseApproach` class represents a close approach to Earth by an NEO. Each
 has an approach datetime, a nominal approach distance, and a relative approach
-velocity.
+velocity. The approach time is stored as a pair of integers - the day and the
+minute of the day - and is only converted to a `datetime` when first accessed.
 
 A `NearEarthObject` maintains a collection of its close approaches, and a
 `CloseApproach` maintains a reference to its NEO.
@@ -14,10 +15,13 @@ A `NearEarthObject` maintains a collection of its close approaches, and a
 These classes are designed to handle data extracted from NASA's datasets, including
 handling missing or incomplete information such as unknown names or diameters.
 
+There are hundreds of thousands of close approaches in the full dataset, so both
+classes declare `__slots__` rather than carrying a `__dict__` per instance.
+
 You will edit this file in Task 1.
 """
 
-from helpers import cd_to_datetime, datetime_to_str
+from helpers import cd_to_day_minute, day_minute_to_datetime, day_minute_to_str
 
 
 class NearEarthObject:
@@ -27,8 +31,10 @@ class NearEarthObject:
     optional name, diameter, and whether it's classified as potentially hazardous.
 
     This class also maintains a list of associated close approaches, which is initially
-    empty but populated in the `NEODatabase` constructor.
+    empty but populated in the `NEODatabase` constructor, and a dictionary of any
+    other attributes extracted from the data files on request.
     """
+    __slots__ = ('designation', 'name', 'diameter', 'hazardous', 'approaches', 'extra')
 
     def __init__(self, designation, name=None, diameter=None, hazardous=False):
         """Initialize a `NearEarthObject`.
@@ -46,6 +52,9 @@ class NearEarthObject:
         # Initialize an empty list for close approaches.
         self.approaches = []
 
+        # Any other columns extracted from the data files, by name (see `extract.load_neos`).
+        self.extra = None
+
     @property
     def fullname(self):
         """Get the full name of the NEO.
@@ -83,6 +92,7 @@ class CloseApproach:
     This class also holds a reference to the associated `NearEarthObject`. Initially,
     the NEO reference is set to `None` but is populated later in the `NEODatabase` constructor.
     """
+    __slots__ = ('_designation', 'day', '_minute', '_time', 'distance', 'velocity', 'neo')
 
     def __init__(self, designation, time, distance, velocity):
         """Initialize a `CloseApproach`.
@@ -93,21 +103,65 @@ class CloseApproach:
         :param velocity: The relative approach velocity in kilometers per second.
         """
         self._designation = designation
-        # Convert time from string to datetime object using helper function.
-        self.time = cd_to_datetime(time)
+        # Store the time as the ordinal of its date and the minute of that day.
+        # The `datetime` itself is only built if and when `time` is accessed.
+        self.day, self._minute = cd_to_day_minute(time)
+        self._time = None
         self.distance = float(distance)
         self.velocity = float(velocity)
 
         # Initialize the NEO reference as None.
         self.neo = None
 
+    @classmethod
+    def from_day_minute(cls, designation, day, minute, distance, velocity):
+        """Create a `CloseApproach` from an already-parsed time, distance and velocity.
+
+        :param designation: The primary designation of the NEO involved in the close approach.
+        :param day: The ordinal of the date of closest approach.
+        :param minute: The minute of that day of closest approach.
+        :param distance: The nominal approach distance in astronomical units, as a float.
+        :param velocity: The relative approach velocity in kilometers per second, as a float.
+        :return: A new `CloseApproach`, not yet linked to its NEO.
+        """
+        approach = cls.__new__(cls)
+        approach._designation = designation
+        approach.day = day
+        approach._minute = minute
+        approach._time = None
+        approach.distance = distance
+        approach.velocity = velocity
+        approach.neo = None
+        return approach
+
+    @property
+    def time(self):
+        """Get the date and time of closest approach.
+
+        :return: A naive `datetime` of the approach, built on first access.
+        """
+        if self._time is None:
+            self._time = day_minute_to_datetime(self.day, self._minute)
+        return self._time
+
+    @property
+    def sort_key(self):
+        """Get a key that orders close approaches chronologically.
+
+        Simultaneous approaches are ordered by designation, so that the order of
+        any collection of approaches sorted by this key is fully determined.
+
+        :return: A tuple of the approach's day ordinal, minute of the day and designation.
+        """
+        return self.day, self._minute, self._designation
+
     @property
     def time_str(self):
         """Get the formatted string representation of the approach time.
 
         :return: A string representing the approach time in a readable format.
         """
-        return datetime_to_str(self.time)
+        return day_minute_to_str(self.day, self._minute)
 
     def __str__(self):
         """Return a user-friendly string representation of the close approach.
@@ -0,0 +1,463 @@
+"""Plan how an `NEODatabase` evaluates the filters of a query.
+
+The `create_filters` function produces one `AttributeFilter` per command-line
+option, in a fixed order. Evaluating those filters one by one on every close
+approach does redundant work: a `--min-distance` and a `--max-distance` option
+fetch the same attribute twice, and a very selective filter may be evaluated
+last, after several filters that almost every approach passes.
+
+The `plan_query` function turns a collection of filters into a `QueryPlan`:
+
+- The filters on each column are fused into a single `RangePredicate`, and a
+  range that can't match anything empties the whole plan.
+- The candidate approaches come either from bisecting the database's
+  chronological index into a window for the date range, or from the NEOs
+  selected by a diameter range and/or hazardous flag in the `NEOIndex` -
+  whichever yields fewer candidates.
+- The remaining predicates are ordered so that cheap, selective predicates
+  (as estimated from `ColumnStatistics` gathered when the database is built)
+  are evaluated first, and the rest are skipped for most approaches.
+
+Filters that don't name a known column (such as arbitrary callables) are kept
+as opaque predicates, and evaluated after the column predicates.
+
+A `QueryPlan` is a callable that generates the matching approaches, and its
+string representation explains the chosen plan.
+"""
+import bisect
+import datetime
+import heapq
+import operator
+
+# Fetch each column's value from a `CloseApproach`.
+_GETTERS = {
+    'date': operator.attrgetter('day'),
+    'distance': operator.attrgetter('distance'),
+    'velocity': operator.attrgetter('velocity'),
+    'diameter': operator.attrgetter('neo.diameter'),
+    'hazardous': operator.attrgetter('neo.hazardous'),
+}
+
+# The relative cost of evaluating a predicate on each column. Columns of the
+# approach's NEO need an extra attribute lookup.
+_COSTS = {
+    'date': 1.0,
+    'distance': 1.0,
+    'velocity': 1.0,
+    'diameter': 1.5,
+    'hazardous': 1.5,
+}
+
+# The assumed cost and selectivity of filters that the planner can't inspect.
+_OPAQUE_COST = 2.0
+_OPAQUE_SELECTIVITY = 0.5
+
+# The relative cost of generating a candidate by merging the approaches of the
+# NEOs selected from the NEO index, rather than reading the chronological index.
+_MERGE_COST = 2.0
+
+# The maximum number of approaches sampled to estimate the selectivity of predicates.
+_SAMPLE_SIZE = 2048
+
+
+class ColumnStatistics:
+    """A summary of the distribution of a column, for estimating selectivity.
+
+    The statistics hold a sorted, evenly-strided sample of the column's values,
+    from which the fraction of values within a range is estimated by bisection.
+    Missing values (NaN, or approaches without an NEO) never match a range.
+    """
+
+    def __init__(self, values):
+        """Summarize a sample of a column's values.
+
+        :param values: A sample of the column's values, with None for missing values.
+        """
+        self.size = len(values)
+        self.sample = sorted(value for value in values if value is not None and value == value)
+
+    def selectivity(self, predicate):
+        """Estimate the fraction of the column's values that satisfy a range predicate.
+
+        :param predicate: A `RangePredicate` on this column.
+        :return: A fraction between 0 and 1.
+        """
+        if not self.size:
+            return 1.0
+        start, stop = 0, len(self.sample)
+        if predicate.lower is not None:
+            find = bisect.bisect_left if predicate.lower_inclusive else bisect.bisect_right
+            start = find(self.sample, predicate.lower)
+        if predicate.upper is not None:
+            find = bisect.bisect_right if predicate.upper_inclusive else bisect.bisect_left
+            stop = find(self.sample, predicate.upper)
+        return max(0, stop - start) / self.size
+
+
+def collect_statistics(approaches):
+    """Gather `ColumnStatistics` for each column from a sample of close approaches.
+
+    :param approaches: A sequence of `CloseApproach` objects.
+    :return: A dictionary mapping column names to `ColumnStatistics`.
+    """
+    sample = approaches[::max(1, len(approaches) // _SAMPLE_SIZE)]
+    statistics = {}
+    for column, get in _GETTERS.items():
+        values = []
+        for approach in sample:
+            try:
+                values.append(get(approach))
+            except AttributeError:
+                values.append(None)
+        statistics[column] = ColumnStatistics(values)
+    return statistics
+
+
+class NEOIndex:
+    """An index of NEOs by their diameter and hazardous flag.
+
+    Criteria on an approach's NEO depend only on the NEO, so they can be answered
+    by selecting the qualifying NEOs, and then visiting only their approaches.
+    Only NEOs with at least one close approach are indexed.
+    """
+
+    def __init__(self, neos):
+        """Index a collection of NEOs.
+
+        :param neos: A collection of `NearEarthObject`s.
+        """
+        linked = [neo for neo in neos if neo.approaches]
+        self._by_diameter = sorted((neo for neo in linked if neo.diameter == neo.diameter),
+                                   key=operator.attrgetter('diameter'))
+        self._diameters = [neo.diameter for neo in self._by_diameter]
+        self._by_hazardous = {
+            True: [neo for neo in linked if neo.hazardous],
+            False: [neo for neo in linked if not neo.hazardous],
+        }
+
+    def add(self, neo):
+        """Index an NEO, as when it gains its first close approach.
+
+        :param neo: A `NearEarthObject` that isn't yet indexed.
+        """
+        if neo.diameter == neo.diameter:
+            position = bisect.bisect_right(self._diameters, neo.diameter)
+            self._diameters.insert(position, neo.diameter)
+            self._by_diameter.insert(position, neo)
+        self._by_hazardous[neo.hazardous].append(neo)
+
+    def discard(self, neo):
+        """Stop indexing an NEO, as before its diameter or hazardous flag changes.
+
+        :param neo: A `NearEarthObject`, which is indexed by its current attributes.
+        """
+        if neo.diameter == neo.diameter:
+            start = bisect.bisect_left(self._diameters, neo.diameter)
+            stop = bisect.bisect_right(self._diameters, neo.diameter)
+            for position in range(start, stop):
+                if self._by_diameter[position] is neo:
+                    del self._diameters[position]
+                    del self._by_diameter[position]
+                    break
+        neos = self._by_hazardous[neo.hazardous]
+        for position, indexed in enumerate(neos):
+            if indexed is neo:
+                del neos[position]
+                break
+
+    def select(self, ranges):
+        """Select the NEOs that satisfy the diameter and hazardous ranges of a query.
+
+        :param ranges: A dictionary mapping column names to `RangePredicate`s.
+        :return: A tuple of the selected NEOs and the names of the columns that
+                 the selection fully accounts for, or None if the index can't help.
+        """
+        diameter, hazardous = ranges.get('diameter'), ranges.get('hazardous')
+        if hazardous is not None and (hazardous.lower is None or hazardous.lower != hazardous.upper):
+            hazardous = None
+        if diameter is None and hazardous is None:
+            return None
+
+        if diameter is None:
+            return self._by_hazardous[bool(hazardous.lower)], ('hazardous',)
+
+        start, stop = 0, len(self._by_diameter)
+        if diameter.lower is not None:
+            find = bisect.bisect_left if diameter.lower_inclusive else bisect.bisect_right
+            start = find(self._diameters, diameter.lower)
+        if diameter.upper is not None:
+            find = bisect.bisect_right if diameter.upper_inclusive else bisect.bisect_left
+            stop = find(self._diameters, diameter.upper)
+        selected = self._by_diameter[start:stop]
+        if hazardous is None:
+            return selected, ('diameter',)
+        return [neo for neo in selected if neo.hazardous == hazardous.lower], ('diameter', 'hazardous')
+
+
+class RangePredicate:
+    """A predicate that a column's value lies within a (possibly open) range.
+
+    A `RangePredicate` fuses every comparison against the same column - for
+    example, the `DistanceFilter`s for `--min-distance` and `--max-distance` -
+    so the column's value is fetched once per approach.
+    """
+
+    def __init__(self, column):
+        """Create an unbounded `RangePredicate` on a column.
+
+        :param column: The name of the column.
+        """
+        self.column = column
+        self.lower = self.upper = None
+        self.lower_inclusive = self.upper_inclusive = True
+        self.empty = False
+        self.selectivity = 1.0
+        self.cost = _COSTS[column]
+
+    def narrow(self, op, value):
+        """Intersect the range with the values that satisfy `column OP value`.
+
+        :param op: One of `operator.eq`, `operator.ge`, `operator.gt`, `operator.le` or `operator.lt`.
+        :param value: The reference value, in the column's units.
+        """
+        if op in (operator.eq, operator.ge, operator.gt):
+            inclusive = op is not operator.gt
+            if self.lower is None or value > self.lower or (value == self.lower and not inclusive):
+                self.lower, self.lower_inclusive = value, inclusive
+        if op in (operator.eq, operator.le, operator.lt):
+            inclusive = op is not operator.lt
+            if self.upper is None or value < self.upper or (value == self.upper and not inclusive):
+                self.upper, self.upper_inclusive = value, inclusive
+        if self.lower is not None and self.upper is not None:
+            if self.lower > self.upper or (self.lower == self.upper
+                                           and not (self.lower_inclusive and self.upper_inclusive)):
+                self.empty = True
+
+    @property
+    def bounds(self):
+        """The bounds of the range, as a hashable tuple that's equal for equal ranges."""
+        return (self.column, self.lower, self.lower_inclusive, self.upper, self.upper_inclusive)
+
+    def contains(self, other):
+        """Check whether every value within another range on the same column is within this range.
+
+        :param other: A `RangePredicate` on the same column.
+        :return: Whether this range contains the other range.
+        """
+        if other.empty:
+            return True
+        if self.lower is not None:
+            if other.lower is None or other.lower < self.lower:
+                return False
+            if other.lower == self.lower and other.lower_inclusive and not self.lower_inclusive:
+                return False
+        if self.upper is not None:
+            if other.upper is None or other.upper > self.upper:
+                return False
+            if other.upper == self.upper and other.upper_inclusive and not self.upper_inclusive:
+                return False
+        return True
+
+    def compile(self):
+        """Build a function that evaluates this predicate on a `CloseApproach`.
+
+        :return: A 1-argument predicate on `CloseApproach` objects.
+        """
+        get = _GETTERS[self.column]
+        lower, upper = self.lower, self.upper
+        lower_op = operator.le if self.lower_inclusive else operator.lt
+        upper_op = operator.le if self.upper_inclusive else operator.lt
+        if lower is not None and lower == upper:
+            return lambda approach: get(approach) == lower
+        if upper is None:
+            return lambda approach: lower_op(lower, get(approach))
+        if lower is None:
+            return lambda approach: upper_op(get(approach), upper)
+
+        def predicate(approach):
+            value = get(approach)
+            return lower_op(lower, value) and upper_op(value, upper)
+        return predicate
+
+    def mask(self, columns):
+        """Evaluate this predicate on every entry of its column at once.
+
+        :param columns: A mapping from column names to arrays of attribute values.
+        :return: A boolean array of the entries that satisfy the predicate.
+        """
+        values = columns[self.column]
+        result = values == values
+        if self.lower is not None:
+            result &= (operator.le if self.lower_inclusive else operator.lt)(self.lower, values)
+        if self.upper is not None:
+            result &= (operator.le if self.upper_inclusive else operator.lt)(values, self.upper)
+        return result
+
+    def __str__(self):
+        """Describe the range, e.g. `0.05 <= distance < 0.5`."""
+        def show(value):
+            return datetime.date.fromordinal(value).isoformat() if self.column == 'date' else repr(value)
+        if self.lower is not None and self.lower == self.upper:
+            return f"{self.column} == {show(self.lower)}"
+        text = self.column
+        if self.lower is not None:
+            text = f"{show(self.lower)} {'<=' if self.lower_inclusive else '<'} {text}"
+        if self.upper is not None:
+            text = f"{text} {'<=' if self.upper_inclusive else '<'} {show(self.upper)}"
+        return text
+
+
+class QueryPlan:
+    """The chosen strategy for evaluating a query against an `NEODatabase`.
+
+    A plan either scans a window of the database's chronological index, or
+    merges the (chronological) approaches of NEOs selected from the NEO index.
+    It tests each candidate approach against an ordered sequence of predicates.
+    Calling the plan with the chronological index generates the matching approaches.
+    """
+
+    def __init__(self, size, date_range, window, predicates, opaque, neos=None, neo_ranges=()):
+        """Create a new `QueryPlan`.
+
+        :param size: The total number of approaches in the database.
+        :param date_range: The date `RangePredicate` of the query, or None.
+        :param window: A tuple of the start and stop positions of the date window.
+        :param predicates: The `RangePredicate`s to evaluate, in order of evaluation.
+        :param opaque: Any other filters to evaluate, after the predicates.
+        :param neos: The NEOs selected from the NEO index, or None to scan the date window.
+        :param neo_ranges: The `RangePredicate`s answered by selecting `neos`.
+        """
+        self.size = size
+        self.date_range = date_range
+        self.window = window
+        self.predicates = predicates
+        self.opaque = opaque
+        self.neos = neos
+        self.neo_ranges = neo_ranges
+
+    @property
+    def candidates(self):
+        """Count the candidate approaches that the plan tests against its predicates."""
+        if self.neos is not None:
+            return sum(len(neo.approaches) for neo in self.neos)
+        start, stop = self.window
+        return stop - start
+
+    @property
+    def estimated_rows(self):
+        """Estimate the number of approaches that the query produces."""
+        estimate = self.candidates
+        for predicate in self.predicates:
+            estimate *= predicate.selectivity
+        return estimate * _OPAQUE_SELECTIVITY ** len(self.opaque)
+
+    def tests(self):
+        """Compile the predicates of this plan, followed by its opaque filters.
+
+        :return: A list of functions that each test a `CloseApproach`, in order of evaluation.
+        """
+        return [predicate.compile() for predicate in self.predicates] + list(self.opaque)
+
+    def __call__(self, approaches):
+        """Generate the approaches that match this plan.
+
+        :param approaches: The chronological index of the database.
+        :yield: The matching `CloseApproach` objects, in chronological order.
+        """
+        start, stop = self.window
+        tests = self.tests()
+        if self.neos is not None:
+            candidates = heapq.merge(*(neo.approaches for neo in self.neos),
+                                     key=operator.attrgetter('sort_key'))
+        else:
+            candidates = (approaches[index] for index in range(start, stop))
+        if len(tests) == 1:
+            yield from filter(tests[0], candidates)
+            return
+        for approach in candidates:
+            for test in tests:
+                if not test(approach):
+                    break
+            else:
+                yield approach
+
+    def __str__(self):
+        """Explain the plan in a human-readable form."""
+        start, stop = self.window
+        lines = [f"Query plan over {self.size} close approaches:"]
+        if self.neos is not None:
+            lines.append(f"  merge approaches of {len(self.neos)} NEOs from NEO index for "
+                         f"{', '.join(map(str, self.neo_ranges))} ({self.candidates} rows)")
+        elif self.date_range is None:
+            lines.append(f"  scan all approaches in chronological order ({stop - start} rows)")
+        else:
+            lines.append(f"  scan date index for {self.date_range}: rows [{start}, {stop}) ({stop - start} rows)")
+        step = 0
+        for step, predicate in enumerate(self.predicates, start=1):
+            lines.append(f"  {step}. filter {predicate} "
+                         f"(est. selectivity {predicate.selectivity:.3f}, cost {predicate.cost:.1f})")
+        for step, f in enumerate(self.opaque, start=step + 1):
+            lines.append(f"  {step}. filter {f!r} (opaque)")
+        lines.append(f"Estimated results: {self.estimated_rows:.0f} close approaches.")
+        return '\n'.join(lines)
+
+
+def fuse_filters(filters):
+    """Fuse the filters on each known column into a single `RangePredicate`.
+
+    :param filters: A collection of filters, as from `create_filters`, or any callables.
+    :return: A dictionary mapping column names to `RangePredicate`s, and a list of
+        the other (opaque) filters.
+    """
+    ranges = {}
+    opaque = []
+    for f in filters:
+        column = getattr(f, 'column', None)
+        if column in _GETTERS and f.op in (operator.eq, operator.ge, operator.gt, operator.le, operator.lt):
+            ranges.setdefault(column, RangePredicate(column)).narrow(f.op, f.reference())
+        else:
+            opaque.append(f)
+    return ranges, opaque
+
+
+def plan_query(filters, statistics, days, neo_index=None):
+    """Plan the evaluation of a collection of filters.
+
+    :param filters: A collection of filters, as from `create_filters`, or any callables.
+    :param statistics: A dictionary mapping column names to `ColumnStatistics`.
+    :param days: The sorted day ordinals of the database's chronological index.
+    :param neo_index: The `NEOIndex` of the database, or None to always scan the date window.
+    :return: A `QueryPlan`.
+    """
+    ranges, opaque = fuse_filters(filters)
+    date_range = ranges.pop('date', None)
+    start, stop = 0, len(days)
+    if date_range is not None:
+        if date_range.lower is not None:
+            find = bisect.bisect_left if date_range.lower_inclusive else bisect.bisect_right
+            start = find(days, date_range.lower)
+        if date_range.upper is not None:
+            find = bisect.bisect_right if date_range.upper_inclusive else bisect.bisect_left
+            stop = find(days, date_range.upper)
+    if any(predicate.empty for predicate in ranges.values()):
+        stop = start
+    window = (start, max(start, stop))
+
+    # Prefer to merge the approaches of the NEOs selected by criteria on NEOs, if
+    # there are sufficiently fewer of them than in the date window.
+    neos, neo_ranges = None, ()
+    selection = neo_index.select(ranges) if neo_index is not None and start < stop else None
+    if selection is not None:
+        selected, columns = selection
+        if sum(len(neo.approaches) for neo in selected) * _MERGE_COST < stop - start:
+            neos, neo_ranges = selected, tuple(ranges.pop(column) for column in columns)
+            if date_range is not None:
+                ranges['date'] = date_range
+
+    predicates = list(ranges.values())
+    for predicate in predicates:
+        predicate.selectivity = statistics[predicate.column].selectivity(predicate)
+    # Evaluating the predicates in increasing order of cost / (1 - selectivity)
+    # minimizes the expected cost of rejecting an approach.
+    predicates.sort(key=lambda predicate: predicate.cost / max(1 - predicate.selectivity, 1e-9))
+    return QueryPlan(len(days), date_range, window, predicates, opaque, neos, neo_ranges)
@@ -0,0 +1,118 @@
+"""Measure the time and memory spent in each phase of a run of the main module.
+
+The main module's `--profile` option reports the wall-clock and CPU time of
+each phase of a run - such as `load_neos`, `load_approaches`, `link` (the
+construction of the `NEODatabase`), `query` and `write` - and `--profile-memory`
+additionally reports the peak memory allocated in each phase, as traced by
+`tracemalloc`, and the memory that the phase retained when it ended.
+
+Code that makes up a phase runs in a `phase` context:
+
+    with phase('load_neos'):
+        neos = load_neos(neofile)
+
+Phases are recorded only while a `PhaseProfiler` is active, so `phase` costs
+next to nothing otherwise. Phases are not nested.
+"""
+import contextlib
+import time
+import tracemalloc
+
+# The active `PhaseProfiler`, if any.
+_active = None
+
+
+class PhaseProfiler:
+    """Record the time, and optionally the memory, spent in each phase of a run."""
+
+    def __init__(self, memory=False):
+        """Create a new, inactive `PhaseProfiler`.
+
+        :param memory: Whether to trace the memory allocated in each phase, which slows it down.
+        """
+        self.memory = memory
+        # The name, wall-clock time, CPU time, peak and retained memory of each phase, in order.
+        self.phases = []
+
+    def __enter__(self):
+        """Activate the profiler, so phases are recorded."""
+        global _active
+        _active = self
+        if self.memory:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Deactivate the profiler."""
+        global _active
+        _active = None
+        if self.memory:
+            tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Record the time, and optionally the memory, spent in a context.
+
+        :param name: The name of the phase.
+        """
+        if self.memory:
+            start_memory = tracemalloc.get_traced_memory()[0]
+            _reset_peak()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+            peak = retained = None
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak, retained = peak - start_memory, current - start_memory
+            self.phases.append((name, wall, cpu, peak, retained))
+
+    def report(self):
+        """Describe the recorded phases in a table.
+
+        :return: A human-readable description of the time and memory spent in each phase.
+        """
+        header = f"{'Phase':<16} {'Wall':>10} {'CPU':>10}"
+        if self.memory:
+            header += f" {'Peak memory':>12} {'Retained':>12}"
+        lines = [header]
+        for name, wall, cpu, peak, retained in self.phases:
+            line = f"{name:<16} {wall:9.3f}s {cpu:9.3f}s"
+            if self.memory:
+                line += f" {peak / 2**20:8.1f} MiB {retained / 2**20:8.1f} MiB"
+            lines.append(line)
+        total_wall = sum(wall for _name, wall, _cpu, _peak, _retained in self.phases)
+        total_cpu = sum(cpu for _name, _wall, cpu, _peak, _retained in self.phases)
+        lines.append(f"{'total':<16} {total_wall:9.3f}s {total_cpu:9.3f}s")
+        return '\n'.join(lines)
+
+
+def _reset_peak():
+    """Make the peak of the traced memory start again from the current traced memory."""
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    else:
+        # Before Python 3.9, the peak is only reset by restarting the trace, which also
+        # forgets earlier allocations, so the memory of a phase is measured from zero.
+        tracemalloc.stop()
+        tracemalloc.start()
+
+
+def enabled():
+    """Check whether a `PhaseProfiler` is active."""
+    return _active is not None
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Record a phase with the active `PhaseProfiler`, if any.
+
+    :param name: The name of the phase.
+    """
+    if _active is None:
+        yield
+    else:
+        with _active.phase(name):
+            yield
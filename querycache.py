@@ -0,0 +1,201 @@
+"""Cache the results of repeated queries against an `NEODatabase`.
+
+The interactive shell tends to run the same query several times, or to narrow
+down a previous query one option at a time. A `QueryCache` remembers the
+results of recent queries, keyed by their fused ranges (see `planner.fuse_filters`),
+so that equivalent collections of filters - such as `--min-distance 0.1` given
+before or after `--max-velocity 20` - share an entry.
+
+A query is answered:
+
+- From the entry with the same ranges, if there is one (a hit).
+- Otherwise, by filtering the smallest entry whose ranges contain the query's
+  ranges (a refinement), since every result of the query is among its results.
+- Otherwise, by querying the database (a miss).
+
+Queries with filters that aren't fused into ranges (such as arbitrary callables)
+bypass the cache.
+
+Each entry holds references to the matching `CloseApproach` objects, which are
+shared with the database, in chronological order. Results are only cached once
+they have been completely generated. When a caller stops early, as `--limit`
+does, at most a few more results are generated for the cache, so that short
+queries are still cached without scanning long ones to their end. The least
+recently used entries are evicted to keep the size of the entries within a
+memory budget.
+"""
+import collections
+import itertools
+import sys
+
+from planner import fuse_filters
+
+# The default memory budget of a `QueryCache`, in bytes.
+DEFAULT_MAX_BYTES = 64 << 20
+
+# The most results generated for the cache after a caller stops early.
+_DRAIN_LIMIT = 100
+
+
+class QueryCache:
+    """A cache of the results of queries against an `NEODatabase`, with LRU eviction."""
+
+    def __init__(self, database, max_bytes=DEFAULT_MAX_BYTES):
+        """Create a new, empty `QueryCache`.
+
+        :param database: The `NEODatabase` to query.
+        :param max_bytes: The memory budget of the cached results, in bytes.
+        """
+        self.database = database
+        self.max_bytes = max_bytes
+        # Map the key of each query to its ranges and results, least recently used first.
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self.hits = self.refinements = self.misses = self.bypasses = 0
+
+    def __len__(self):
+        """Count the cached queries."""
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        """The total size of the cached results, in bytes."""
+        return self._bytes
+
+    @property
+    def hit_rate(self):
+        """The fraction of cacheable queries answered from the cache, by a hit or a refinement."""
+        lookups = self.hits + self.refinements + self.misses
+        return (self.hits + self.refinements) / lookups if lookups else 0.0
+
+    def invalidate(self):
+        """Evict every entry, as when the database changes, but keep the statistics."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def clear(self):
+        """Evict every entry, and reset the statistics."""
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.refinements = self.misses = self.bypasses = 0
+
+    def query(self, filters=(), jobs=1):
+        """Query close approaches based on specified filters, from the cache if possible.
+
+        :param filters: A sequence of functions to apply as filters on `CloseApproach` objects.
+        :param jobs: The number of worker processes used by the database on a miss.
+        :return: An iterator yielding `CloseApproach` objects that match the filters, in
+            chronological order.
+        """
+        ranges, opaque = fuse_filters(filters)
+        if opaque:
+            self.bypasses += 1
+            return self.database.query(filters, jobs=jobs)
+
+        key = frozenset(predicate.bounds for predicate in ranges.values())
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return iter(entry[1])
+
+        base = self._find_containing(ranges)
+        if base is not None:
+            self.refinements += 1
+            base_ranges, base_results = base
+            # Only test the ranges that are narrower than those of the cached query.
+            tests = [predicate.compile() for column, predicate in ranges.items()
+                     if column not in base_ranges or base_ranges[column].bounds != predicate.bounds]
+            results = (approach for approach in base_results
+                       if all(test(approach) for test in tests))
+        else:
+            self.misses += 1
+            results = self.database.query(filters, jobs=jobs)
+        return self._record(key, ranges, results)
+
+    def _find_containing(self, ranges):
+        """Find the smallest cached entry whose ranges contain the given ranges.
+
+        :param ranges: A dictionary mapping column names to `RangePredicate`s.
+        :return: The ranges and results of the entry, or None if there's no such entry.
+        """
+        best = None
+        for key, (entry_ranges, results) in self._entries.items():
+            if best is not None and len(results) >= len(best[2]):
+                continue
+            if all(column in ranges and predicate.contains(ranges[column])
+                   for column, predicate in entry_ranges.items()):
+                best = (key, entry_ranges, results)
+        if best is None:
+            return None
+        key, entry_ranges, results = best
+        self._entries.move_to_end(key)
+        return entry_ranges, results
+
+    def _record(self, key, ranges, results):
+        """Generate results, and cache them once they have all been generated.
+
+        A consumer that stops early, such as `limit`, closes the generator; the query
+        is still cached if at most `_DRAIN_LIMIT` results remain, which are generated
+        without being yielded. Results that outgrow the memory budget are generated,
+        but not cached.
+
+        :param key: The key of the query.
+        :param ranges: The fused ranges of the query.
+        :param results: An iterator of the results of the query.
+        :yield: The results of the query.
+        """
+        recorded = []
+        try:
+            for approach in results:
+                recorded = self._append(recorded, approach)
+                yield approach
+        except GeneratorExit:
+            if recorded is not None:
+                rest = list(itertools.islice(results, _DRAIN_LIMIT + 1))
+                if len(rest) <= _DRAIN_LIMIT:
+                    for approach in rest:
+                        recorded = self._append(recorded, approach)
+                    if recorded is not None:
+                        self._store(key, ranges, tuple(recorded))
+            raise
+        if recorded is not None:
+            self._store(key, ranges, tuple(recorded))
+
+    def _append(self, recorded, approach):
+        """Record a result, unless the recorded results have outgrown the memory budget.
+
+        :param recorded: A list of the results recorded so far, or None if they outgrew the budget.
+        :param approach: The next result.
+        :return: The recorded results, or None if they have outgrown the budget.
+        """
+        if recorded is not None:
+            recorded.append(approach)
+            if sys.getsizeof(recorded) > self.max_bytes:
+                return None
+        return recorded
+
+    def _store(self, key, ranges, results):
+        """Cache the results of a query, evicting the least recently used entries to make room.
+
+        :param key: The key of the query.
+        :param ranges: The fused ranges of the query.
+        :param results: A tuple of the results of the query.
+        """
+        size = sys.getsizeof(results)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= sys.getsizeof(self._entries.pop(key)[1])
+        while self._entries and self._bytes + size > self.max_bytes:
+            _key, (_ranges, evicted) = self._entries.popitem(last=False)
+            self._bytes -= sys.getsizeof(evicted)
+        self._entries[key] = (ranges, results)
+        self._bytes += size
+
+    def __str__(self):
+        """Summarize the contents and statistics of the cache."""
+        return (f"Cached queries: {len(self)} ({self.nbytes / (1 << 20):.1f} of "
+                f"{self.max_bytes / (1 << 20):.1f} MiB). Hits: {self.hits}, refinements: "
+                f"{self.refinements}, misses: {self.misses} ({self.hit_rate:.0%} hit rate). "
+                f"Uncacheable queries: {self.bypasses}.")
@@ -0,0 +1,130 @@
+"""Reload changed data files into a live `NEODatabase`.
+
+The interactive shell keeps one database for the whole session. A `DataReloader`
+remembers the size and modification time of the data files the database was
+built from, and a checkpoint of the records they held (see `extract.neo_checkpoint`
+and `extract.cad_checkpoint`). When either file changes - for instance, because a
+fresh pull of close approach data was appended to it - `poll` extracts only the
+records appended since the checkpoint, and `NEODatabase.ingest`s them, so a
+reload costs time in proportion to the appended records rather than to the file.
+
+If a file shrank, or the records of its checkpoint changed, the whole file is
+parsed again and ingested instead: records that are new are added and linked,
+records whose values changed are updated in place, and the rest are skipped.
+Records that were removed from a data file remain in the database until it is
+rebuilt.
+"""
+import os
+
+from extract import (load_neos, load_neos_since, neo_checkpoint,
+                     load_approaches, load_approaches_since, cad_checkpoint)
+
+
+def _signature(path):
+    """Describe the current version of a file, or None if it doesn't exist.
+
+    :param path: The path of the file.
+    :return: A tuple of the file's size and modification time.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _checkpoint(checkpoint, path):
+    """Take a checkpoint of a data file, or None if the file is missing or can't be checkpointed.
+
+    :param checkpoint: The function that takes a checkpoint of the file.
+    :param path: The path of the file.
+    """
+    if path is None:
+        return None
+    try:
+        return checkpoint(path)
+    except (OSError, ValueError):
+        return None
+
+
+class DataReloader:
+    """Watch the data files of a database, and ingest their changes."""
+
+    def __init__(self, database, neofile, cadfile):
+        """Create a new `DataReloader` for data files that the database currently reflects.
+
+        :param database: The `NEODatabase` built from the data files.
+        :param neofile: Path to the CSV file of near-Earth objects.
+        :param cadfile: Path to the JSON file of close approach data.
+        """
+        self.database = database
+        self.neofile = neofile
+        self.cadfile = cadfile
+        self._signatures = {path: _signature(path) for path in (neofile, cadfile)}
+        self._checkpoints = {neofile: _checkpoint(neo_checkpoint, neofile),
+                             cadfile: _checkpoint(cad_checkpoint, cadfile)}
+
+    def changed(self):
+        """List the data files that changed since they were last loaded.
+
+        :return: A list of the paths of the changed files.
+        """
+        return [path for path, signature in self._signatures.items()
+                if path is not None and _signature(path) not in (signature, None)]
+
+    def poll(self):
+        """Ingest the records of any data files that changed since they were last loaded.
+
+        Only the records appended to a file since it was last loaded are parsed,
+        unless the file shrank or its earlier records changed. A file is only marked
+        as loaded once it has been parsed successfully, so a file that is still being
+        written is retried on the next poll.
+
+        :return: A dictionary counting the NEOs and approaches that were added or
+            updated, as from `NEODatabase.ingest`, or None if no file changed.
+        :raise ValueError: If a changed file is malformed.
+        """
+        changed = self.changed()
+        if not changed:
+            return None
+        signatures = {path: _signature(path) for path in changed}
+        checkpoints = {}
+        neos = approaches = ()
+        if self.neofile in changed:
+            neos, checkpoints[self.neofile] = self._read(self.neofile, load_neos_since, neo_checkpoint, load_neos)
+        if self.cadfile in changed:
+            approaches, checkpoints[self.cadfile] = self._read(self.cadfile, load_approaches_since,
+                                                               cad_checkpoint, load_approaches)
+        summary = self.database.ingest(neos, approaches)
+        self._signatures.update(signatures)
+        self._checkpoints.update(checkpoints)
+        return summary
+
+    def _read(self, path, load_since, checkpoint, load):
+        """Extract the records appended to a data file since it was last loaded, or else all of its records.
+
+        :param path: The path of the file.
+        :param load_since: The function that extracts the records appended since a checkpoint.
+        :param checkpoint: The function that takes a checkpoint of the file.
+        :param load: The function that extracts all of the records of the file.
+        :return: The extracted records, and a checkpoint of the file for the next poll.
+        """
+        previous = self._checkpoints.get(path)
+        if previous is not None:
+            appended = load_since(path, previous)
+            if appended is not None:
+                return appended
+        # Take the checkpoint first, so that any records appended while the file is
+        # parsed are read again on the next poll, rather than missed.
+        current = _checkpoint(checkpoint, path)
+        return load(path), current
+
+
+def describe(summary):
+    """Describe the changes ingested by a `DataReloader`.
+
+    :param summary: A dictionary counting the NEOs and approaches that were added or updated.
+    :return: A human-readable sentence.
+    """
+    return ("Reloaded the data files: {neos_added} new and {neos_updated} updated NEOs, "
+            "{approaches_added} new and {approaches_updated} updated close approaches.").format(**summary)
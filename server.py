@@ -0,0 +1,283 @@
+"""Serve `inspect` and `query` requests against a loaded `NEODatabase` over HTTP.
+
+The `serve` subcommand of the main module loads the database once, and then
+answers requests from any number of concurrent clients, each in its own thread,
+on a localhost TCP port or on a Unix domain socket. Every response is a JSON
+document.
+
+Queries take the same options as the `query` subcommand, as URL parameters
+without the leading dashes. Flags (`hazardous`, `not-hazardous`) are given as
+`true` or `false`, and a flag that is `false` is the same as leaving it out:
+
+    GET /query?start-date=2020-01-01&max-distance=0.025&limit=5
+    GET /query?hazardous=true&min-velocity=30
+    GET /query?sort-by=distance&limit=10
+    GET /query?hazardous=true&sort-by=velocity&desc=true&limit=20
+
+The response is an object with a `results` list, whose elements are formatted
+as by `write.json_record`. Like the `query` subcommand printing to stdout, a
+query returns at most 10 results unless a `limit` is given, so that a request
+never serializes the whole database by accident. Inspecting an NEO takes `pdes` or `name`, and
+optionally `verbose`:
+
+    GET /inspect?pdes=433
+    GET /inspect?name=Halley&verbose=true
+
+The response is an object describing the NEO and, if verbose, its approaches.
+
+Unknown diameters, which are NaN in the database, are reported as `null`, so
+that responses are strictly valid JSON.
+"""
+import datetime
+import http.server
+import json
+import math
+import os
+import socketserver
+import traceback
+import urllib.parse
+
+from filters import SORT_KEYS, create_filters, limit, sort_results
+from write import json_record
+
+
+# The number of results of a query without a `limit`.
+DEFAULT_LIMIT = 10
+
+
+class RequestError(ValueError):
+    """Exception raised for malformed requests."""
+
+
+def _parse_date(value):
+    """Parse a date in YYYY-MM-DD format."""
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise RequestError(f"'{value}' is not a valid date. Use YYYY-MM-DD.")
+
+
+def _parse_float(value):
+    """Parse a floating-point number."""
+    try:
+        return float(value)
+    except ValueError:
+        raise RequestError(f"'{value}' is not a valid number.")
+
+
+def _parse_int(value):
+    """Parse an integer."""
+    try:
+        return int(value)
+    except ValueError:
+        raise RequestError(f"'{value}' is not a valid integer.")
+
+
+def _parse_flag(value):
+    """Parse a boolean flag, given as `true` or `false`."""
+    if value.lower() in ('true', '1', 'yes', ''):
+        return True
+    if value.lower() in ('false', '0', 'no'):
+        return False
+    raise RequestError(f"'{value}' is not a valid flag. Use true or false.")
+
+
+# The URL parameters of a query, mapped to the `create_filters` argument and parser of each.
+_QUERY_PARAMETERS = {
+    'date': ('date', _parse_date),
+    'start-date': ('start_date', _parse_date),
+    'end-date': ('end_date', _parse_date),
+    'min-distance': ('distance_min', _parse_float),
+    'max-distance': ('distance_max', _parse_float),
+    'min-velocity': ('velocity_min', _parse_float),
+    'max-velocity': ('velocity_max', _parse_float),
+    'min-diameter': ('diameter_min', _parse_float),
+    'max-diameter': ('diameter_max', _parse_float),
+}
+
+
+def _parameters(query_string, allowed):
+    """Parse the parameters of a URL's query string, each of which may occur once.
+
+    :param query_string: The query string of a URL.
+    :param allowed: The names of the allowed parameters.
+    :return: A dictionary mapping parameter names to their values.
+    :raise RequestError: If a parameter is unknown or repeated.
+    """
+    parameters = {}
+    for name, value in urllib.parse.parse_qsl(query_string, keep_blank_values=True):
+        if name not in allowed:
+            raise RequestError(f"Unknown parameter '{name}'.")
+        if name in parameters:
+            raise RequestError(f"Parameter '{name}' was given more than once.")
+        parameters[name] = value
+    return parameters
+
+
+def _strict(value):
+    """Replace NaN floats with None, so a value serializes to strictly valid JSON."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _strict(item) for key, item in value.items()}
+    return value
+
+
+def neo_record(neo):
+    """Describe a `NearEarthObject` as a JSON-serializable dictionary.
+
+    :param neo: A `NearEarthObject`.
+    :return: A dictionary of the NEO's attributes.
+    """
+    return {
+        'designation': neo.designation,
+        'name': neo.name if neo.name else '',
+        'diameter_km': neo.diameter,
+        'potentially_hazardous': neo.hazardous,
+    }
+
+
+def run_query(database, query_string):
+    """Answer a `/query` request.
+
+    :param database: The `NEODatabase` to query.
+    :param query_string: The query string of the request's URL.
+    :return: A JSON-serializable response.
+    """
+    parameters = _parameters(query_string,
+                             set(_QUERY_PARAMETERS) | {'hazardous', 'not-hazardous', 'limit', 'sort-by', 'desc'})
+    criteria = {}
+    for name, value in parameters.items():
+        if name in _QUERY_PARAMETERS:
+            argument, parse = _QUERY_PARAMETERS[name]
+            criteria[argument] = parse(value)
+    # Like the `--hazardous` and `--not-hazardous` options, a flag only filters when it's set.
+    hazardous = _parse_flag(parameters.get('hazardous', 'false'))
+    not_hazardous = _parse_flag(parameters.get('not-hazardous', 'false'))
+    if hazardous and not_hazardous:
+        raise RequestError("Only one of 'hazardous' and 'not-hazardous' may be given.")
+    if hazardous or not_hazardous:
+        criteria['hazardous'] = hazardous
+    n = _parse_int(parameters['limit']) if 'limit' in parameters else 0
+    n = n or DEFAULT_LIMIT
+    sort_by = parameters.get('sort-by')
+    if sort_by is not None and sort_by not in SORT_KEYS:
+        raise RequestError(f"'{sort_by}' is not a valid sort key. Use one of {', '.join(SORT_KEYS)}.")
+    descending = _parse_flag(parameters.get('desc', 'false'))
+
+    results = database.query(create_filters(**criteria))
+    if sort_by or descending:
+        results = sort_results(results, sort_by or 'time', n, descending=descending)
+    results = limit(results, n)
+    return {'results': [_strict(json_record(approach)) for approach in results]}
+
+
+def run_inspect(database, query_string):
+    """Answer an `/inspect` request.
+
+    :param database: The `NEODatabase` to inspect.
+    :param query_string: The query string of the request's URL.
+    :return: A JSON-serializable response, or None if no NEO matches.
+    """
+    parameters = _parameters(query_string, {'pdes', 'name', 'verbose'})
+    if ('pdes' in parameters) == ('name' in parameters):
+        raise RequestError("Exactly one of 'pdes' and 'name' must be given.")
+    if 'pdes' in parameters:
+        neo = database.get_neo_by_designation(parameters['pdes'])
+    else:
+        neo = database.get_neo_by_name(parameters['name'])
+    if not neo:
+        return None
+
+    response = {'neo': _strict(neo_record(neo))}
+    if _parse_flag(parameters.get('verbose', 'false')):
+        response['approaches'] = [_strict(json_record(approach)) for approach in neo.approaches]
+    return response
+
+
+class NEORequestHandler(http.server.BaseHTTPRequestHandler):
+    """Answer HTTP requests with the `NEODatabase` of the server."""
+    server_version = 'NEOServer/1.0'
+
+    def do_GET(self):
+        """Dispatch a GET request to the matching endpoint."""
+        url = urllib.parse.urlsplit(self.path)
+        try:
+            if url.path == '/query':
+                self.respond(200, run_query(self.server.database, url.query))
+            elif url.path == '/inspect':
+                response = run_inspect(self.server.database, url.query)
+                if response is None:
+                    self.respond(404, {'error': "No matching NEOs exist in the database."})
+                else:
+                    self.respond(200, response)
+            else:
+                self.respond(404, {'error': f"Unknown endpoint '{url.path}'. Use /query or /inspect."})
+        except RequestError as err:
+            self.respond(400, {'error': str(err)})
+        except Exception:
+            # Answer the client rather than dropping the connection, and log the traceback.
+            self.log_error("Error answering %s:\n%s", self.path, traceback.format_exc())
+            self.respond(500, {'error': "Internal server error."})
+
+    def respond(self, status, response):
+        """Send a JSON response.
+
+        :param status: The HTTP status code.
+        :param response: A JSON-serializable response body.
+        """
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        """Describe the client, whose address is empty on a Unix domain socket."""
+        return self.client_address[0] if self.client_address else 'unix'
+
+
+class NEOServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """A threaded HTTP server for an `NEODatabase` on a TCP port."""
+    daemon_threads = True
+
+    def __init__(self, database, address):
+        """Create a new `NEOServer` listening at a (host, port) address."""
+        self.database = database
+        super().__init__(address, NEORequestHandler)
+
+
+class UnixNEOServer(socketserver.ThreadingUnixStreamServer):
+    """A threaded HTTP server for an `NEODatabase` on a Unix domain socket."""
+    daemon_threads = True
+
+    def __init__(self, database, path):
+        """Create a new `UnixNEOServer` listening at a socket path."""
+        self.database = database
+        super().__init__(str(path), NEORequestHandler)
+
+
+def serve(database, host='127.0.0.1', port=8000, socket_path=None):
+    """Serve requests against a database until interrupted.
+
+    :param database: The `NEODatabase` to serve.
+    :param host: The host name or address on which to listen.
+    :param port: The TCP port on which to listen.
+    :param socket_path: A Unix domain socket path on which to listen, instead of a TCP port.
+    """
+    if socket_path is not None:
+        server = UnixNEOServer(database, socket_path)
+        where = f"unix socket {socket_path}"
+    else:
+        server = NEOServer(database, (host, port))
+        where = "http://{}:{}/".format(*server.server_address[:2])
+    print(f"Serving close approaches on {where} (press Ctrl-C to stop).", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,181 @@
+"""Cache a linked `NEODatabase` on disk to avoid re-parsing the data files.
+
+Extracting NEOs and close approaches from the CSV and JSON data files, and then
+linking them together in an `NEODatabase`, takes several seconds on the full
+dataset. A snapshot is a pickled copy of the fully linked database, stored in
+the `.cache` folder at the root of the project.
+
+Each snapshot is keyed by the path, size and modification time of the data files
+it was built from, as well as by the class of the database and the format
+version of the snapshot. The `load_database` function loads a snapshot when its
+key matches the current data files, and otherwise rebuilds the database from
+the data files and saves a fresh snapshot.
+"""
+import contextlib
+import gc
+import hashlib
+import os
+import pathlib
+import pickle
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_parallel
+from profiling import phase
+
+# The folder in which snapshots are saved, by default.
+CACHE_ROOT = pathlib.Path(__file__).parent.resolve() / '.cache'
+
+# Bump this whenever the pickled layout of the models or databases changes.
+SNAPSHOT_VERSION = 8
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector for the duration of a context.
+
+    (Un)pickling a database allocates hundreds of thousands of container objects,
+    none of which are garbage, but each of which counts towards triggering a
+    collection pass over every object allocated so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def snapshot_key(neofile, cadfile, database_class=NEODatabase):
+    """Describe the data files and database class that a snapshot is built from.
+
+    :param neofile: Path to the CSV file of near-Earth objects.
+    :param cadfile: Path to the JSON file of close approach data.
+    :param database_class: The class of the database held in the snapshot.
+    :return: A tuple that changes whenever any of the data files changes.
+    """
+    sources = []
+    for path in (neofile, cadfile):
+        path = pathlib.Path(path).resolve()
+        stat = path.stat()
+        sources.append((str(path), stat.st_size, stat.st_mtime_ns))
+    return (SNAPSHOT_VERSION, database_class.__module__, database_class.__qualname__, tuple(sources))
+
+
+def snapshot_path(key, cache_root=CACHE_ROOT):
+    """Return the path of the snapshot file for a snapshot key.
+
+    Snapshots of different pairs of data files (or database classes) are saved
+    to different files, so that switching between them doesn't evict the others.
+
+    :param key: A snapshot key, as returned by `snapshot_key`.
+    :param cache_root: The folder in which snapshots are saved.
+    :return: The path of the snapshot file.
+    """
+    _version, module, qualname, sources = key
+    identity = repr((module, qualname, tuple(path for path, _size, _mtime in sources)))
+    digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+    return pathlib.Path(cache_root) / f"neodb-{digest}.pickle"
+
+
+def load_snapshot(path, key):
+    """Load a database from a snapshot file, if the snapshot is still valid.
+
+    The key is stored ahead of the database in the snapshot file, so a stale
+    snapshot is rejected without unpickling the database itself.
+
+    :param path: The path of the snapshot file.
+    :param key: The snapshot key that the snapshot must have been saved with.
+    :return: The database held in the snapshot, or None if it is missing, stale or unreadable.
+    """
+    try:
+        with open(path, 'rb') as infile:
+            if pickle.load(infile) != key:
+                return None
+            with _gc_paused():
+                return pickle.load(infile)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def save_snapshot(path, key, database):
+    """Save a database to a snapshot file.
+
+    The snapshot is written to a temporary file that then replaces the snapshot
+    file, so concurrent readers never see a partially written snapshot.
+
+    :param path: The path of the snapshot file.
+    :param key: The snapshot key describing the data files the database was built from.
+    :param database: The database to save.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(partial, 'wb') as outfile:
+            pickle.dump(key, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            with _gc_paused():
+                pickle.dump(database, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+
+
+def _load_data(neofile, cadfile, jobs=1):
+    """Extract NEOs and close approaches from the data files.
+
+    :param neofile: Path to the CSV file of near-Earth objects.
+    :param cadfile: Path to the JSON file of close approach data.
+    :param jobs: The number of worker processes, 0 for one per CPU, or 1 to parse them in this process.
+    :return: A collection of `NearEarthObject`s and a collection of `CloseApproach`es.
+    """
+    if jobs == 1:
+        with phase('load_neos'):
+            neos = load_neos(neofile)
+        with phase('load_approaches'):
+            approaches = load_approaches(cadfile)
+        return neos, approaches
+    with phase('load_parallel'):
+        return load_parallel(neofile, cadfile, jobs or None)
+
+
+def _link(database_class, neofile, cadfile, jobs=1):
+    """Extract NEOs and close approaches from the data files, and link them in a database."""
+    neos, approaches = _load_data(neofile, cadfile, jobs)
+    with phase('link'):
+        return database_class(neos, approaches)
+
+
+def load_database(neofile, cadfile, database_class=NEODatabase,
+                  use_cache=True, rebuild=False, cache_root=CACHE_ROOT, jobs=1):
+    """Load a linked database, from a snapshot if possible.
+
+    :param neofile: Path to the CSV file of near-Earth objects.
+    :param cadfile: Path to the JSON file of close approach data.
+    :param database_class: The class of the database to construct.
+    :param use_cache: Whether to load and save snapshots at all.
+    :param rebuild: Whether to ignore any existing snapshot, and save a fresh one.
+    :param cache_root: The folder in which snapshots are saved.
+    :param jobs: The number of worker processes that parse the data files, if a snapshot isn't used.
+    :return: An instance of `database_class` holding the data from the data files.
+    """
+    if not use_cache:
+        return _link(database_class, neofile, cadfile, jobs)
+
+    key = snapshot_key(neofile, cadfile, database_class)
+    path = snapshot_path(key, cache_root)
+    if not rebuild:
+        with phase('load_snapshot'):
+            database = load_snapshot(path, key)
+        if database is not None:
+            return database
+
+    database = _link(database_class, neofile, cadfile, jobs)
+    try:
+        with phase('save_snapshot'):
+            save_snapshot(path, key, database)
+    except OSError:
+        # A read-only project folder shouldn't prevent using the data.
+        pass
+    return database
@@ -0,0 +1,141 @@
+"""Check that the columnar query engine agrees with the default `NEODatabase`.
+
+The `ColumnarNEODatabase` evaluates filters as vectorized masks over NumPy
+arrays. For any collection of filters, it should produce exactly the same close
+approaches, in the same order, as `NEODatabase.query`.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_columnar
+
+These tests are skipped if NumPy is not installed.
+"""
+import datetime
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, limit
+from models import NearEarthObject, CloseApproach
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from columnar import ColumnarNEODatabase
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed.")
+class TestColumnarQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.columnar = ColumnarNEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def assertSameResults(self, **criteria):
+        filters = create_filters(**criteria)
+        expected = [repr(approach) for approach in self.db.query(filters)]
+        received = [repr(approach) for approach in self.columnar.query(filters)]
+        self.assertEqual(expected, received)
+        return received
+
+    def test_query_all(self):
+        self.assertEqual(len(self.assertSameResults()), 4700)
+
+    def test_query_with_date_bounds(self):
+        self.assertSameResults(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 3, 31))
+        self.assertSameResults(date=datetime.date(2020, 3, 2))
+
+    def test_query_with_distance_and_velocity_bounds(self):
+        self.assertSameResults(distance_min=0.05, distance_max=0.5, velocity_min=5, velocity_max=25)
+
+    def test_query_with_diameter_bounds(self):
+        self.assertSameResults(diameter_min=0.5, diameter_max=1.5)
+
+    def test_query_with_hazardous(self):
+        self.assertSameResults(hazardous=True)
+        self.assertSameResults(hazardous=False)
+
+    def test_query_with_all_bounds(self):
+        results = self.assertSameResults(
+            start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 5, 31),
+            distance_max=0.5, velocity_max=25, diameter_min=0.5, hazardous=False
+        )
+        self.assertGreater(len(results), 0)
+
+    def test_query_accepts_plain_callables(self):
+        filters = [lambda approach: approach.distance < 0.01]
+        expected = list(self.db.query(filters))
+        received = list(self.columnar.query(filters))
+        self.assertGreater(len(received), 0)
+        self.assertEqual([repr(a) for a in expected], [repr(a) for a in received])
+
+    def test_query_is_compatible_with_limit(self):
+        self.assertEqual(len(tuple(limit(self.columnar.query(), 5))), 5)
+
+    def test_ingest_rebuilds_columns(self):
+        approaches = load_approaches(TEST_CAD_FILE)
+        columnar = ColumnarNEODatabase(load_neos(TEST_NEO_FILE), approaches[:-1000])
+        columnar.ingest((), approaches[-1000:])
+        filters = create_filters(distance_max=0.1, hazardous=False)
+        self.assertEqual([repr(approach) for approach in columnar.query(filters)],
+                         [repr(approach) for approach in self.db.query(filters)])
+
+    def test_ingest_updates_neo_attributes(self):
+        columnar = ColumnarNEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        neos = load_neos(TEST_NEO_FILE)
+        for neo in neos[::10]:
+            neo.diameter, neo.hazardous = 2.0, not neo.hazardous
+        columnar.ingest(neos)
+        expected = NEODatabase(neos, load_approaches(TEST_CAD_FILE))
+        for criteria in ({'diameter_min': 1.5}, {'hazardous': True, 'distance_max': 0.2}):
+            filters = create_filters(**criteria)
+            self.assertEqual([repr(approach) for approach in columnar.query(filters)],
+                             [repr(approach) for approach in expected.query(filters)])
+
+    def test_add_inserts_into_columns(self):
+        neos, approaches = load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+        columnar = ColumnarNEODatabase(neos[:-200], approaches[::2])
+        columnar.add_approaches(approaches[1::2])
+        columnar.add_neos(neos[-200:])
+        expected = ColumnarNEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        for name, column in expected._columns.items():
+            numpy.testing.assert_array_equal(columnar._columns[name], column)
+
+    def test_add_neos_before_their_approaches(self):
+        neos, approaches = load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+        added = {neo.designation for neo in neos[-200:]}
+        later = [approach for approach in approaches if approach._designation in added]
+        self.assertTrue(later)
+        columnar = ColumnarNEODatabase(neos[:-200],
+                                       [approach for approach in approaches if approach._designation not in added])
+        columnar.add_neos(neos[-200:])
+        columnar.add_approaches(later)
+        expected = ColumnarNEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        for name, column in expected._columns.items():
+            numpy.testing.assert_array_equal(columnar._columns[name], column)
+        for criteria in ({'diameter_min': 1.5}, {'hazardous': True}, {'hazardous': False, 'distance_max': 0.2}):
+            filters = create_filters(**criteria)
+            self.assertEqual([repr(approach) for approach in columnar.query(filters)],
+                             [repr(approach) for approach in expected.query(filters)])
+
+    def test_ingest_new_neo_with_its_approaches(self):
+        neos, approaches = load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+        columnar = ColumnarNEODatabase(neos, approaches)
+        neo = NearEarthObject(designation='ZZZ1', diameter=5, hazardous=True)
+        approach = CloseApproach(designation='ZZZ1', time='2020-Jan-05 12:00', distance=0.1, velocity=10)
+        columnar.ingest([neo], [approach])
+        for criteria in ({'date': datetime.date(2020, 1, 5), 'hazardous': True}, {'diameter_min': 4}):
+            with self.subTest(**criteria):
+                self.assertIn(approach, list(columnar.query(create_filters(**criteria))))
+
+
+if __name__ == '__main__':
+    unittest.main()
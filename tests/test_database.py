@@ -17,6 +17,7 @@ import unittest
 
 from extract import load_neos, load_approaches
 from database import NEODatabase
+from filters import create_filters
 
 
 # Paths to the test data files.
@@ -114,6 +115,74 @@ class TestDatabase(unittest.TestCase):
         nonexistent = self.db.get_neo_by_name('not-real-name')
         self.assertIsNone(nonexistent)
 
+    def test_database_construction_from_iterators(self):
+        neos, approaches = load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+        db = NEODatabase(iter(neos), iter(approaches))
+        self.assertTrue(all(approach.neo is not None for approach in approaches))
+        self.assertIs(db.get_neo_by_name('Jormungandr'), db.get_neo_by_designation('471926'))
+        self.assertEqual(len(list(db.query(create_filters(hazardous=True)))),
+                         len(list(self.db.query(create_filters(hazardous=True)))))
+
+
+class TestIncrementalAppend(unittest.TestCase):
+    def setUp(self):
+        neos = load_neos(TEST_NEO_FILE)
+        approaches = load_approaches(TEST_CAD_FILE)
+        self.expected = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+        # Start from all but some NEOs and approaches, so some approaches have no NEO yet.
+        self.db = NEODatabase(neos[:-200], approaches[:-500])
+        self.neos, self.approaches = neos[-200:], approaches[-500:]
+
+    def assertSameDatabase(self, db, expected):
+        self.assertEqual([repr(approach) for approach in db._approaches_by_time],
+                         [repr(approach) for approach in expected._approaches_by_time])
+        self.assertEqual(db._approach_days, expected._approach_days)
+        for neo in expected._neos:
+            known = db.get_neo_by_designation(neo.designation)
+            self.assertEqual(repr(known), repr(neo))
+            self.assertEqual([approach.sort_key for approach in known.approaches],
+                             [approach.sort_key for approach in neo.approaches])
+            self.assertTrue(all(approach.neo is known for approach in known.approaches))
+            if neo.name:
+                self.assertIs(db.get_neo_by_name(neo.name), known)
+        for criteria in ({'diameter_min': 0.5}, {'hazardous': True, 'distance_max': 0.1},
+                         {'start_date': expected._approaches_by_time[1000].time.date(), 'velocity_min': 20}):
+            filters = create_filters(**criteria)
+            self.assertEqual([repr(approach) for approach in db.query(filters)],
+                             [repr(approach) for approach in expected.query(filters)])
+
+    def test_add_approaches_then_neos(self):
+        self.assertEqual(self.db.add_approaches(self.approaches), 500)
+        self.assertEqual(self.db.add_neos(self.neos), 200)
+        self.assertSameDatabase(self.db, self.expected)
+
+    def test_add_neos_then_approaches(self):
+        self.assertEqual(self.db.add_neos(self.neos), 200)
+        self.assertEqual(self.db.add_approaches(reversed(self.approaches)), 500)
+        self.assertSameDatabase(self.db, self.expected)
+
+    def test_add_rejects_duplicates(self):
+        self.db.add_neos(self.neos)
+        self.db.add_approaches(self.approaches)
+        self.assertEqual(self.db.add_neos(load_neos(TEST_NEO_FILE)), 0)
+        self.assertEqual(self.db.add_approaches(load_approaches(TEST_CAD_FILE)), 0)
+        self.assertSameDatabase(self.db, self.expected)
+
+    def test_add_approaches_rejects_duplicates_within_a_batch(self):
+        self.assertEqual(self.db.add_approaches(self.approaches + load_approaches(TEST_CAD_FILE)[-500:]), 500)
+        self.db.add_neos(self.neos)
+        self.assertSameDatabase(self.db, self.expected)
+
+    def test_add_approaches_links_orphans_to_neos_added_later(self):
+        self.db.add_approaches(self.approaches)
+        orphans = [approach for approach in self.approaches
+                   if approach._designation in {neo.designation for neo in self.neos}]
+        self.assertTrue(orphans)
+        self.assertTrue(all(approach.neo is None for approach in orphans))
+        self.db.add_neos(self.neos)
+        self.assertTrue(all(approach.neo is not None for approach in orphans))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -11,12 +11,16 @@ To run these tests from the project root, run:
 These tests should pass when Task 2 is complete.
 """
 import collections.abc
+import csv
 import datetime
+import json
 import pathlib
 import math
+import tempfile
 import unittest
+import unittest.mock
 
-from extract import load_neos, load_approaches
+from extract import load_neos, load_approaches, iter_approaches, load_parallel
 from models import NearEarthObject, CloseApproach
 
 
@@ -68,6 +72,11 @@ class TestLoadNEOs(unittest.TestCase):
         self.assertTrue(math.isnan(neo.diameter))
         self.assertEqual(neo.hazardous, True)
 
+    def test_neos_are_compact(self):
+        neo = self.get_first_neo_or_none()
+        self.assertIsNotNone(neo)
+        self.assertFalse(hasattr(neo, '__dict__'))
+
     def test_adonis_is_potentially_hazardous(self):
         self.assertIn('2101', self.neos_by_designation)
         neo = self.neos_by_designation['2101']
@@ -78,6 +87,57 @@ class TestLoadNEOs(unittest.TestCase):
         self.assertEqual(neo.hazardous, True)
 
 
+class TestLoadNEOsProjection(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(TEST_NEO_FILE, newline='') as infile:
+            cls.rows = list(csv.DictReader(infile))
+        cls.expected = [repr(NearEarthObject(row['pdes'], row['name'], row['diameter'], row['pha'] == 'Y'))
+                        for row in cls.rows]
+
+    def write_rows(self, fieldnames, rows):
+        outfile = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False)
+        self.addCleanup(pathlib.Path(outfile.name).unlink)
+        with outfile:
+            writer = csv.DictWriter(outfile, fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        return outfile.name
+
+    def test_load_neos_matches_dict_reader(self):
+        self.assertEqual([repr(neo) for neo in load_neos(TEST_NEO_FILE)], self.expected)
+
+    def test_load_neos_locates_columns_by_name(self):
+        fieldnames = list(reversed(list(self.rows[0])))
+        received = [repr(neo) for neo in load_neos(self.write_rows(fieldnames, self.rows))]
+        self.assertEqual(received, self.expected)
+
+    def test_load_neos_with_quoted_fields(self):
+        rows = [dict(row) for row in self.rows[:20]]
+        rows[3]['name'] = 'Comma, Name'
+        rows[5]['full_name'] = 'Two\nlines, "quoted"'
+        rows[7]['name'] = 'Two\nlines'
+        neos = load_neos(self.write_rows(list(self.rows[0]), rows))
+        self.assertEqual(len(neos), 20)
+        self.assertEqual(neos[3].name, 'Comma, Name')
+        self.assertEqual(neos[5].designation, rows[5]['pdes'])
+        self.assertEqual(neos[7].name, 'Two\nlines')
+        self.assertEqual([repr(neo) for neo in neos[8:]], self.expected[8:20])
+
+    def test_load_neos_with_extra_columns(self):
+        neos = load_neos(TEST_NEO_FILE, extra_columns=('moid', 'H', 'albedo'))
+        self.assertEqual([repr(neo) for neo in neos], self.expected)
+        for neo, row in zip(neos, self.rows):
+            self.assertEqual(neo.extra, {column: row[column] or None for column in ('moid', 'H', 'albedo')})
+        self.assertIsNone(load_neos(TEST_NEO_FILE)[0].extra)
+
+    def test_load_neos_requires_columns(self):
+        with self.assertRaises(ValueError):
+            load_neos(TEST_NEO_FILE, extra_columns=('not-a-column',))
+        with self.assertRaises(ValueError):
+            load_neos(self.write_rows(['pdes', 'name', 'pha'], [{'pdes': '433', 'name': 'Eros', 'pha': 'N'}]))
+
+
 class TestLoadApproaches(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -117,6 +177,128 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsNotNone(approach)
         self.assertIsInstance(approach.velocity, float)
 
+    def test_approaches_are_compact(self):
+        approach = self.get_first_approach_or_none()
+        self.assertIsNotNone(approach)
+        self.assertFalse(hasattr(approach, '__dict__'))
+
+    def test_approaches_share_designations_with_their_neos(self):
+        neos = {neo.designation: neo for neo in load_neos(TEST_NEO_FILE)}
+        linked = [approach for approach in self.approaches if approach._designation in neos]
+        self.assertGreater(len(linked), 0)
+        for approach in linked:
+            self.assertIs(approach._designation, neos[approach._designation].designation)
+
+
+class TestIterApproaches(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = [repr(approach) for approach in load_approaches(TEST_CAD_FILE)]
+        with open(TEST_CAD_FILE) as infile:
+            cls.contents = json.load(infile)
+
+    def write_contents(self, contents):
+        outfile = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        self.addCleanup(pathlib.Path(outfile.name).unlink)
+        with outfile:
+            json.dump(contents, outfile, indent=1)
+        return outfile.name
+
+    def test_iter_approaches_is_a_generator(self):
+        approaches = iter_approaches(TEST_CAD_FILE)
+        self.assertIsInstance(approaches, collections.abc.Generator)
+        self.assertIsInstance(next(approaches), CloseApproach)
+
+    def test_iter_approaches_with_fields_before_data(self):
+        contents = {key: self.contents[key] for key in ('signature', 'count', 'fields', 'data')}
+        received = [repr(approach) for approach in iter_approaches(self.write_contents(contents))]
+        self.assertEqual(received, self.expected)
+
+    def test_iter_approaches_locates_fields_by_name(self):
+        order = list(reversed(range(len(self.contents['fields']))))
+        contents = {
+            'fields': [self.contents['fields'][i] for i in order],
+            'data': [[row[i] for i in order] for row in self.contents['data']],
+        }
+        received = [repr(approach) for approach in iter_approaches(self.write_contents(contents))]
+        self.assertEqual(received, self.expected)
+
+    def test_iter_approaches_across_small_chunks(self):
+        with unittest.mock.patch('extract._CHUNK_SIZE', 7):
+            received = [repr(approach) for approach in iter_approaches(TEST_CAD_FILE)]
+        self.assertEqual(received, self.expected)
+
+    def test_iter_approaches_with_numbers_split_across_chunks(self):
+        contents = {'signature': {'version': '1.5'}, 'count': 12345.5, 'ratio': -2.5e-10,
+                    'sizes': [0, 10, 123.25, 6.02E+23], 'fields': self.contents['fields'],
+                    'data': self.contents['data'][:3]}
+        path = self.write_contents(contents)
+        expected = self.expected[:3]
+        for chunk_size in range(1, pathlib.Path(path).stat().st_size + 1):
+            with self.subTest(chunk_size=chunk_size), unittest.mock.patch('extract._CHUNK_SIZE', chunk_size):
+                self.assertEqual([repr(approach) for approach in iter_approaches(path)], expected)
+
+    def test_iter_approaches_requires_fields(self):
+        contents = {'fields': ['des', 'cd'], 'data': [['433', '2020-Jan-01 00:00']]}
+        with self.assertRaises(ValueError):
+            list(iter_approaches(self.write_contents(contents)))
+
+        contents = {'data': self.contents['data'][:2]}
+        with self.assertRaises(ValueError):
+            list(iter_approaches(self.write_contents(contents)))
+
+
+class TestLoadParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected_neos = [repr(neo) for neo in load_neos(TEST_NEO_FILE)]
+        cls.expected = [repr(approach) for approach in load_approaches(TEST_CAD_FILE)]
+        with open(TEST_CAD_FILE) as infile:
+            cls.contents = json.load(infile)
+
+    def setUp(self):
+        # Split even the small test file into many ranges.
+        patcher = unittest.mock.patch('extract._MIN_RANGE_SIZE', 1 << 12)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_contents(self, contents):
+        outfile = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        self.addCleanup(pathlib.Path(outfile.name).unlink)
+        with outfile:
+            json.dump(contents, outfile, indent=1)
+        return outfile.name
+
+    def load(self, cad_json_path):
+        neos, approaches = load_parallel(TEST_NEO_FILE, cad_json_path, jobs=2)
+        return [repr(neo) for neo in neos], [repr(approach) for approach in approaches]
+
+    def test_load_parallel_matches_sequential_loading(self):
+        neos, approaches = self.load(TEST_CAD_FILE)
+        self.assertEqual(neos, self.expected_neos)
+        self.assertEqual(approaches, self.expected)
+
+    def test_load_parallel_with_data_before_fields(self):
+        contents = {key: self.contents[key] for key in ('signature', 'count', 'data', 'fields')}
+        self.assertEqual(self.load(self.write_contents(contents))[1], self.expected)
+
+    def test_load_parallel_with_members_after_data(self):
+        contents = {key: self.contents[key] for key in ('fields', 'data')}
+        contents['trailer'] = [[str(i)] for i in range(4 * len(self.contents['data']))]
+        self.assertEqual(self.load(self.write_contents(contents))[1], self.expected)
+
+    def test_load_parallel_with_row_boundaries_inside_strings(self):
+        contents = {key: self.contents[key] for key in ('fields', 'data')}
+        contents['data'] = [list(row) for row in contents['data']]
+        for row in contents['data']:
+            row[1] = '], [' * 50
+        self.assertEqual(self.load(self.write_contents(contents))[1], self.expected)
+
+    def test_approaches_share_days_and_minutes(self):
+        _neos, approaches = load_parallel(TEST_NEO_FILE, TEST_CAD_FILE, jobs=2)
+        self.assertLess(len({id(approach.day) for approach in approaches}), 400)
+        self.assertLessEqual(len({id(approach._minute) for approach in approaches}), 24 * 60)
+
 
 if __name__ == '__main__':
     unittest.main()
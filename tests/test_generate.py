@@ -0,0 +1,71 @@
+"""Check that synthetic datasets can be loaded like the real data files.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_generate
+"""
+import datetime
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.generate import generate
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_parallel
+
+
+class TestGenerate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = pathlib.Path(tempfile.mkdtemp())
+        cls.neofile, cls.cadfile = generate(cls.root / 'first', 5000, neos=400, seed=7)
+        cls.neos, cls.approaches = load_neos(cls.neofile), load_approaches(cls.cadfile)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def test_sizes(self):
+        self.assertEqual(len(self.neos), 400)
+        self.assertEqual(len(self.approaches), 5000)
+
+    def test_generate_is_deterministic(self):
+        neofile, cadfile = generate(self.root / 'second', 5000, neos=400, seed=7)
+        self.assertEqual(neofile.read_bytes(), self.neofile.read_bytes())
+        self.assertEqual(cadfile.read_bytes(), self.cadfile.read_bytes())
+
+        neofile, cadfile = generate(self.root / 'third', 5000, neos=400, seed=8)
+        self.assertNotEqual(cadfile.read_bytes(), self.cadfile.read_bytes())
+
+    def test_designations_and_names_are_unique(self):
+        self.assertEqual(len({neo.designation for neo in self.neos}), len(self.neos))
+        names = [neo.name for neo in self.neos if neo.name]
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_approaches_are_chronological_and_linked(self):
+        times = [approach.time for approach in self.approaches]
+        self.assertEqual(times, sorted(times))
+        self.assertGreaterEqual(times[0], datetime.datetime(1900, 1, 1))
+        self.assertLess(times[-1], datetime.datetime(2201, 1, 1))
+
+        NEODatabase(self.neos, self.approaches)
+        self.assertTrue(all(approach.neo is not None for approach in self.approaches))
+
+    def test_distributions_are_plausible(self):
+        self.assertTrue(any(neo.name for neo in self.neos))
+        self.assertTrue(any(neo.diameter == neo.diameter for neo in self.neos))
+        self.assertTrue(0.02 < sum(neo.hazardous for neo in self.neos) / len(self.neos) < 0.25)
+        self.assertTrue(all(0 < approach.distance <= 0.5 for approach in self.approaches))
+        self.assertTrue(all(approach.velocity > 0 for approach in self.approaches))
+
+    def test_load_parallel(self):
+        neos, approaches = load_parallel(self.neofile, self.cadfile, jobs=2)
+        self.assertEqual([(approach._designation, approach.time_str, approach.distance, approach.velocity)
+                          for approach in approaches],
+                         [(approach._designation, approach.time_str, approach.distance, approach.velocity)
+                          for approach in self.approaches])
+
+
+if __name__ == '__main__':
+    unittest.main()
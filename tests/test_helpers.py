@@ -0,0 +1,80 @@
+"""Check that the datetime helpers agree with `datetime.strptime`.
+
+The `cd_to_datetime` function parses NASA's calendar dates without calling
+`datetime.strptime` when it can, but it must produce the same results - and
+raise the same errors - as `datetime.strptime` for every input.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_helpers
+"""
+import datetime
+import json
+import pathlib
+import unittest
+
+from helpers import (cd_to_datetime, cd_to_day_minute, day_minute_to_datetime, day_minute_to_str,
+                     datetime_to_str)
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+CD_FORMAT = "%Y-%b-%d %H:%M"
+
+
+class TestCdToDatetime(unittest.TestCase):
+    def assertSameAsStrptime(self, calendar_date):
+        try:
+            expected = datetime.datetime.strptime(calendar_date, CD_FORMAT)
+        except (TypeError, ValueError) as err:
+            with self.assertRaises(type(err)) as context:
+                cd_to_datetime(calendar_date)
+            self.assertEqual(str(context.exception), str(err))
+        else:
+            self.assertEqual(cd_to_datetime(calendar_date), expected)
+
+    def test_matches_strptime_on_test_data(self):
+        with open(TEST_CAD_FILE) as infile:
+            data = json.load(infile)['data']
+        for row in data:
+            self.assertSameAsStrptime(row[3])
+
+    def test_matches_strptime_on_edge_cases(self):
+        for calendar_date in ('1900-Jan-01 00:00', '2020-Feb-29 23:59', '2200-Dec-31 12:00',
+                              '2020-dec-31 12:00', '2020-DEC-31 12:00', '2020-Dec-1 12:00',
+                              '2020-Dec-31 1:05', '2020-Dec-31  12:00'):
+            with self.subTest(calendar_date=calendar_date):
+                self.assertSameAsStrptime(calendar_date)
+
+    def test_matches_strptime_errors(self):
+        for calendar_date in ('2021-Feb-29 00:00', '2020-Foo-01 00:00', '2020-Jan-32 00:00',
+                              '2020-Jan-01 24:00', '2020-Jan-01 12:60', '2020-Jan-01T12:00',
+                              '0000-Jan-01 00:00', '2020-01-01 00:00', '', None, 20200101):
+            with self.subTest(calendar_date=calendar_date):
+                self.assertSameAsStrptime(calendar_date)
+
+    def test_round_trip_to_str(self):
+        self.assertEqual(datetime_to_str(cd_to_datetime('2020-Dec-31 12:00')), '2020-12-31 12:00')
+
+
+class TestCdToDayMinute(unittest.TestCase):
+    def test_matches_cd_to_datetime_on_test_data(self):
+        with open(TEST_CAD_FILE) as infile:
+            data = json.load(infile)['data']
+        for row in data:
+            dt = cd_to_datetime(row[3])
+            day, minute = cd_to_day_minute(row[3])
+            self.assertEqual(day, dt.toordinal())
+            self.assertEqual(minute, dt.hour * 60 + dt.minute)
+            self.assertEqual(day_minute_to_datetime(day, minute), dt)
+            self.assertEqual(day_minute_to_str(day, minute), datetime_to_str(dt))
+
+    def test_falls_back_to_cd_to_datetime(self):
+        self.assertEqual(cd_to_day_minute('2020-DEC-31 12:00'), (737790, 720))
+        with self.assertRaises(ValueError):
+            cd_to_day_minute('2021-Feb-29 00:00')
+
+
+if __name__ == '__main__':
+    unittest.main()
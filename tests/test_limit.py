@@ -1,4 +1,4 @@
-"""Check that the `limit` function limits iterables.
+"""Check that the `limit` function limits iterables, and `sort_results` sorts them.
 
 To run these tests from the project root, run:
 
@@ -10,9 +10,18 @@ implement it imperatively with the tools from the `itertools` module.
 These tests should pass when Task 3c is complete.
 """
 import collections.abc
+import math
+import pathlib
 import unittest
 
-from filters import limit
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, limit, sort_results, UnsupportedCriterionError
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
 
 
 class TestLimit(unittest.TestCase):
@@ -50,5 +59,52 @@ class TestLimit(unittest.TestCase):
         self.assertIsInstance(limit(self.iterable, None), collections.abc.Iterable)
 
 
+class TestSortResults(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.results = list(cls.db.query(create_filters()))
+
+    def test_sort_results_by_distance(self):
+        expected = sorted(self.results, key=lambda approach: approach.distance)
+        self.assertEqual(list(sort_results(iter(self.results), 'distance', 10)), expected[:10])
+        self.assertEqual(list(sort_results(iter(self.results), 'distance')), expected)
+
+    def test_sort_results_by_velocity_descending(self):
+        expected = sorted(self.results, key=lambda approach: approach.velocity, reverse=True)
+        self.assertEqual(list(sort_results(iter(self.results), 'velocity', 20, descending=True)),
+                         expected[:20])
+        self.assertEqual(list(sort_results(iter(self.results), 'velocity', descending=True)), expected)
+
+    def test_sort_results_by_time(self):
+        self.assertEqual(list(sort_results(iter(self.results), 'time', 5)), self.results[:5])
+        self.assertEqual(list(sort_results(iter(self.results), 'time', 5, descending=True)),
+                         self.results[::-1][:5])
+
+    def test_sort_results_by_diameter_puts_unknown_diameters_last(self):
+        for descending in (False, True):
+            diameters = [approach.neo.diameter
+                         for approach in sort_results(iter(self.results), 'diameter', descending=descending)]
+            known = [diameter for diameter in diameters if not math.isnan(diameter)]
+            self.assertGreater(len(known), 0)
+            self.assertLess(len(known), len(diameters))
+            self.assertEqual(diameters[:len(known)], sorted(known, reverse=descending))
+            self.assertTrue(all(math.isnan(diameter) for diameter in diameters[len(known):]))
+
+            top = [approach.neo.diameter
+                   for approach in sort_results(iter(self.results), 'diameter', 10, descending=descending)]
+            self.assertEqual(top, diameters[:10])
+
+    def test_sort_results_keeps_ties_in_chronological_order(self):
+        ranked = list(sort_results(iter(self.results), 'diameter', descending=True))
+        for earlier, later in zip(ranked, ranked[1:]):
+            if earlier.neo is later.neo:
+                self.assertLess(earlier.sort_key, later.sort_key)
+
+    def test_sort_results_rejects_unknown_keys(self):
+        with self.assertRaises(UnsupportedCriterionError):
+            sort_results(iter(self.results), 'name')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,155 @@
+"""Check that the memory-mapped query engine agrees with the default `NEODatabase`.
+
+A `MappedNEODatabase` serves queries off a binary store file written by
+`write_store`. For any collection of filters, it should produce the same close
+approaches, in the same order, as `NEODatabase.query`, with or without NumPy.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_mapped
+"""
+import datetime
+import os
+import pathlib
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+import mapped
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from mapped import MappedNEODatabase, load_store, write_store
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+CRITERIA = (
+    {},
+    {'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 3, 31)},
+    {'date': datetime.date(2020, 3, 2)},
+    {'distance_min': 0.05, 'distance_max': 0.5, 'velocity_min': 5, 'velocity_max': 25},
+    {'diameter_min': 0.5, 'diameter_max': 1.5},
+    {'hazardous': True},
+    {'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 5, 31),
+     'distance_max': 0.5, 'velocity_max': 25, 'diameter_min': 0.5, 'hazardous': False},
+)
+
+
+class TestMappedQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = pathlib.Path(tempfile.mkdtemp())
+        neos, approaches = load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+        # Leave out some NEOs, so some approaches have no NEO.
+        cls.db = NEODatabase(neos[:-200], approaches)
+        write_store(neos[:-200], approaches, cls.root / 'test.neostore', b'key')
+        cls.mapped = MappedNEODatabase(cls.root / 'test.neostore', b'key')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def assertSameResults(self, filters):
+        expected = [repr(approach) for approach in self.db.query(filters)]
+        received = [repr(approach) for approach in self.mapped.query(filters)]
+        self.assertEqual(expected, received)
+        return received
+
+    def test_query(self):
+        for criteria in CRITERIA:
+            with self.subTest(**criteria):
+                self.assertSameResults(create_filters(**criteria))
+        self.assertEqual(len(self.assertSameResults(())), 4700)
+
+    def test_query_without_numpy(self):
+        with mock.patch.object(mapped, 'np', None):
+            for criteria in CRITERIA:
+                with self.subTest(**criteria):
+                    self.assertSameResults(create_filters(**criteria))
+
+    def test_query_in_small_slices(self):
+        with mock.patch.object(mapped, '_SLICE_SIZE', 7):
+            for criteria in CRITERIA:
+                with self.subTest(**criteria):
+                    self.assertSameResults(create_filters(**criteria))
+
+    @unittest.skipIf(mapped.np is None, "NumPy is not installed")
+    def test_query_converts_records_as_they_are_consumed(self):
+        for filters in ((), create_filters(distance_max=0.5)):
+            with self.subTest(filters=filters), mock.patch.object(mapped, '_SLICE_SIZE', 16):
+                results = self.mapped.query(filters)
+                tracemalloc.start()
+                try:
+                    next(results)
+                    _size, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                    results.close()
+                # Converting all 4700 records would allocate several hundred KiB.
+                self.assertLess(peak, 256 << 10)
+
+    def test_query_accepts_plain_callables(self):
+        received = self.assertSameResults([lambda approach: approach.distance < 0.01])
+        self.assertGreater(len(received), 0)
+
+    def test_query_keeps_designations_of_unknown_neos(self):
+        orphans = [approach for approach in self.mapped.query() if approach.neo is None]
+        self.assertTrue(orphans)
+        self.assertEqual([approach._designation for approach in orphans],
+                         [approach._designation for approach in self.db.query() if approach.neo is None])
+
+    def test_get_neo_builds_its_approaches(self):
+        for expected in self.db._neos[:50]:
+            neo = self.mapped.get_neo_by_designation(expected.designation)
+            self.assertEqual(repr(neo), repr(expected))
+            self.assertEqual([repr(approach) for approach in neo.approaches],
+                             [repr(approach) for approach in expected.approaches])
+            self.assertTrue(all(approach.neo is neo for approach in neo.approaches))
+            if expected.name:
+                self.assertIs(self.mapped.get_neo_by_name(expected.name), neo)
+        self.assertIsNone(self.mapped.get_neo_by_designation('not-real-designation'))
+
+    def test_store_with_other_key_is_rejected(self):
+        with self.assertRaises(ValueError):
+            MappedNEODatabase(self.root / 'test.neostore', b'other')
+
+
+class TestLoadStore(unittest.TestCase):
+    def setUp(self):
+        self.root = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.neofile = self.root / 'neos.csv'
+        self.cadfile = self.root / 'cad.json'
+        shutil.copy(TEST_NEO_FILE, self.neofile)
+        shutil.copy(TEST_CAD_FILE, self.cadfile)
+        self.cache_root = self.root / 'cache'
+
+    def test_store_is_reused_until_a_data_file_changes(self):
+        load_store(self.neofile, self.cadfile, cache_root=self.cache_root)
+        stores = list(self.cache_root.glob('*.neostore'))
+        self.assertEqual(len(stores), 1)
+
+        with mock.patch.object(mapped, 'write_store') as write:
+            load_store(self.neofile, self.cadfile, cache_root=self.cache_root)
+            write.assert_not_called()
+
+        stat = os.stat(self.cadfile)
+        os.utime(self.cadfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with mock.patch.object(mapped, 'write_store', wraps=write_store) as write:
+            database = load_store(self.neofile, self.cadfile, cache_root=self.cache_root)
+            write.assert_called_once()
+        self.assertEqual(len(list(database.query())), 4700)
+
+    def test_no_cache_leaves_no_store(self):
+        database = load_store(self.neofile, self.cadfile, use_cache=False, cache_root=self.cache_root)
+        self.assertEqual(len(list(database.query())), 4700)
+        self.assertFalse(self.cache_root.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
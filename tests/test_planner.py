@@ -0,0 +1,129 @@
+"""Check that the query planner fuses, orders and explains filters correctly.
+
+The planner should produce the same results as evaluating every filter on every
+close approach, while fusing filters on the same attribute into one range and
+evaluating the most selective ranges first.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_planner
+"""
+import datetime
+import operator
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, DistanceFilter, VelocityFilter
+from planner import RangePredicate
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestPlanner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+
+    def test_plan_fuses_filters_on_the_same_attribute(self):
+        plan = self.db.plan(create_filters(distance_min=0.05, distance_max=0.5, velocity_max=25))
+        self.assertEqual(sorted(predicate.column for predicate in plan.predicates), ['distance', 'velocity'])
+
+    def test_plan_resolves_dates_to_an_index_window(self):
+        plan = self.db.plan(create_filters(start_date=datetime.date(2020, 3, 1),
+                                           end_date=datetime.date(2020, 3, 31)))
+        start, stop = plan.window
+        self.assertEqual(plan.predicates, [])
+        expected = [approach for approach in self.approaches if approach.time.month == 3]
+        self.assertEqual(stop - start, len(expected))
+
+    def test_plan_with_conflicting_bounds_is_empty(self):
+        plan = self.db.plan(create_filters(velocity_min=30, velocity_max=10))
+        start, stop = plan.window
+        self.assertEqual(start, stop)
+        self.assertEqual(list(self.db.query(create_filters(velocity_min=30, velocity_max=10))), [])
+
+    def test_plan_orders_predicates_by_selectivity(self):
+        plan = self.db.plan(create_filters(velocity_max=100, distance_max=0.01))
+        self.assertEqual([predicate.column for predicate in plan.predicates], ['distance', 'velocity'])
+        selectivities = [predicate.selectivity for predicate in plan.predicates]
+        self.assertLess(selectivities[0], selectivities[1])
+
+    def test_plan_handles_strict_comparisons(self):
+        filters = [DistanceFilter(operator.gt, 0.1), DistanceFilter(operator.lt, 0.2),
+                   VelocityFilter(operator.ne, 10)]
+        expected = [approach for approach in self.approaches
+                    if 0.1 < approach.distance < 0.2 and approach.velocity != 10]
+        received = list(self.db.query(filters))
+        self.assertGreater(len(received), 0)
+        self.assertEqual(set(expected), set(received))
+
+    def test_plan_selects_neos_for_hazardous_criteria(self):
+        filters = create_filters(hazardous=True, distance_max=0.1)
+        plan = self.db.plan(filters)
+        self.assertIsNotNone(plan.neos)
+        self.assertTrue(all(neo.hazardous for neo in plan.neos))
+        self.assertEqual([predicate.column for predicate in plan.predicates], ['distance'])
+        self.assertLess(plan.candidates, len(self.approaches) / 2)
+
+        expected = [approach for approach in self.db.query()
+                    if approach.neo.hazardous and approach.distance <= 0.1]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(list(self.db.query(filters)), expected)
+
+    def test_plan_selects_neos_for_diameter_criteria(self):
+        filters = create_filters(start_date=datetime.date(2020, 2, 1), diameter_min=1.0, hazardous=False)
+        plan = self.db.plan(filters)
+        self.assertIsNotNone(plan.neos)
+        self.assertEqual([predicate.column for predicate in plan.predicates], ['date'])
+
+        expected = [approach for approach in self.db.query()
+                    if approach.time.date() >= datetime.date(2020, 2, 1)
+                    and approach.neo.diameter >= 1.0 and not approach.neo.hazardous]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(list(self.db.query(filters)), expected)
+
+    def test_explain_describes_the_plan(self):
+        explanation = self.db.explain(create_filters(date=datetime.date(2020, 3, 2), distance_max=0.4))
+        self.assertIn('date == 2020-03-02', explanation)
+        self.assertIn('distance <= 0.4', explanation)
+        self.assertIn('Estimated results', explanation)
+
+        explanation = self.db.explain(create_filters(hazardous=True))
+        self.assertIn('NEO index for hazardous == True', explanation)
+
+
+class TestRangePredicate(unittest.TestCase):
+    @staticmethod
+    def make(*comparisons):
+        predicate = RangePredicate('distance')
+        for op, value in comparisons:
+            predicate.narrow(op, value)
+        return predicate
+
+    def test_contains(self):
+        outer = self.make((operator.ge, 0.1), (operator.lt, 0.5))
+        self.assertTrue(outer.contains(self.make((operator.ge, 0.1), (operator.lt, 0.5))))
+        self.assertTrue(outer.contains(self.make((operator.gt, 0.1), (operator.le, 0.4))))
+        self.assertTrue(outer.contains(self.make((operator.eq, 0.3))))
+        self.assertFalse(outer.contains(self.make((operator.ge, 0.1))))
+        self.assertFalse(outer.contains(self.make((operator.ge, 0.1), (operator.le, 0.5))))
+        self.assertFalse(outer.contains(self.make((operator.ge, 0.05), (operator.lt, 0.5))))
+        self.assertTrue(RangePredicate('distance').contains(outer))
+
+    def test_contains_empty_ranges(self):
+        empty = self.make((operator.gt, 0.5), (operator.lt, 0.1))
+        self.assertTrue(self.make((operator.eq, 0.3)).contains(empty))
+
+    def test_equal_ranges_have_equal_bounds(self):
+        self.assertEqual(self.make((operator.le, 0.5), (operator.ge, 0.1)).bounds,
+                         self.make((operator.ge, 0.1), (operator.le, 0.7), (operator.le, 0.5)).bounds)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Check that the phases of a run are timed, and optionally traced, by a `PhaseProfiler`.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_profiling
+"""
+import contextlib
+import io
+import pathlib
+import pstats
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+import profiling
+from profiling import PhaseProfiler, phase
+from snapshot import load_database
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    def test_phases_are_recorded_in_order(self):
+        with PhaseProfiler() as profiler:
+            self.assertTrue(profiling.enabled())
+            with phase('first'):
+                sum(range(10000))
+            with phase('second'):
+                pass
+        self.assertFalse(profiling.enabled())
+
+        self.assertEqual([name for name, *_ in profiler.phases], ['first', 'second'])
+        for _name, wall, cpu, peak, retained in profiler.phases:
+            self.assertGreaterEqual(wall, 0)
+            self.assertGreaterEqual(cpu, 0)
+            self.assertIsNone(peak)
+            self.assertIsNone(retained)
+        self.assertIn('first', profiler.report())
+        self.assertNotIn('Peak memory', profiler.report())
+
+    def test_memory_is_attributed_to_phases(self):
+        with PhaseProfiler(memory=True) as profiler:
+            with phase('allocate'):
+                kept = [bytearray(1 << 20) for _ in range(4)]
+            with phase('free'):
+                del kept
+        (_, _, _, peak, retained), (_, _, _, _, freed) = profiler.phases
+        self.assertGreaterEqual(peak, 4 << 20)
+        self.assertGreaterEqual(retained, 4 << 20)
+        self.assertLess(freed, 0)
+        self.assertIn('Peak memory', profiler.report())
+
+    def test_phase_is_a_no_op_without_a_profiler(self):
+        self.assertFalse(profiling.enabled())
+        with phase('ignored'):
+            pass
+
+    def test_loading_a_database_is_split_into_phases(self):
+        with PhaseProfiler() as profiler:
+            load_database(TEST_NEO_FILE, TEST_CAD_FILE, use_cache=False)
+        self.assertEqual([name for name, *_ in profiler.phases], ['load_neos', 'load_approaches', 'link'])
+
+
+class TestMainProfile(unittest.TestCase):
+    def setUp(self):
+        self.root = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def run_main(self, *args):
+        argv = ['main.py', '--neofile', str(TEST_NEO_FILE), '--cadfile', str(TEST_CAD_FILE), '--no-cache', *args]
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch('sys.argv', argv), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            main.main()
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_profile_reports_each_phase(self):
+        outfile = self.root / 'results.csv'
+        _stdout, stderr = self.run_main('--profile-memory', 'query', '--hazardous', '--outfile', str(outfile))
+        phases = [line.split()[0] for line in stderr.splitlines()[1:]]
+        self.assertEqual(phases, ['load_neos', 'load_approaches', 'link', 'query', 'write', 'total'])
+        self.assertIn('Peak memory', stderr)
+        self.assertTrue(outfile.exists())
+
+    def test_profile_output_saves_a_cprofile_profile(self):
+        output = self.root / 'main.prof'
+        stdout, stderr = self.run_main('--profile-output', str(output), 'inspect', '--pdes', '1685')
+        self.assertIn('Toro', stdout)
+        self.assertIn('inspect', stderr)
+        stats = pstats.Stats(str(output))
+        self.assertTrue(any(function == 'load_neos' for _file, _line, function in stats.stats))
+
+    def test_no_report_without_profile(self):
+        _stdout, stderr = self.run_main('query', '--limit', '1')
+        self.assertEqual(stderr, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,12 +13,16 @@ To run these tests from the project root, run::
 These tests should pass when Tasks 3a and 3b are complete.
 """
 import datetime
+import itertools
+import multiprocessing
+import operator
 import pathlib
 import unittest
+import unittest.mock
 
 from database import NEODatabase
 from extract import load_neos, load_approaches
-from filters import create_filters
+from filters import create_filters, DateFilter
 
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -528,6 +532,63 @@ class TestQuery(unittest.TestCase):
         received = set(self.db.query(filters))
         self.assertEqual(expected, received, msg="Computed results do not match expected results.")
 
+    ###############################
+    # Ordering and the date index #
+    ###############################
+
+    def test_query_results_are_chronological(self):
+        filters = create_filters(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 5, 31))
+        received = [approach.time for approach in self.db.query(filters)]
+        self.assertGreater(len(received), 0)
+        self.assertEqual(received, sorted(received))
+
+    def test_query_with_unindexed_date_comparison(self):
+        date = datetime.date(2020, 3, 2)
+
+        expected = set(
+            approach for approach in self.approaches
+            if approach.time.date() < date
+        )
+        self.assertGreater(len(expected), 0)
+
+        received = set(self.db.query([DateFilter(operator.lt, date)]))
+        self.assertEqual(expected, received, msg="Computed results do not match expected results.")
+
+
+@unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), "Processes can't be forked.")
+class TestParallelQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def setUp(self):
+        # Split even the small test database into many shards.
+        patcher = unittest.mock.patch('database._MIN_SHARD_SIZE', 100)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertSameAsSerial(self, filters):
+        expected = list(self.db.query(filters))
+        self.assertEqual(list(self.db.query(filters, jobs=3)), expected)
+
+    def test_parallel_query_all(self):
+        self.assertSameAsSerial(create_filters())
+
+    def test_parallel_query_with_bounds(self):
+        self.assertSameAsSerial(create_filters(
+            start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 10, 31),
+            distance_max=0.2, velocity_min=5, hazardous=False
+        ))
+
+    def test_parallel_query_with_opaque_filters(self):
+        self.assertSameAsSerial([lambda approach: approach.time.hour < 12])
+
+    def test_parallel_query_can_stop_early(self):
+        expected = list(itertools.islice(self.db.query(create_filters()), 10))
+        results = self.db.query(create_filters(), jobs=3)
+        self.assertEqual(list(itertools.islice(results, 10)), expected)
+        results.close()
+
 
 if __name__ == '__main__':
     unittest.main()
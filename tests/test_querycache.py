@@ -0,0 +1,147 @@
+"""Check that a `QueryCache` answers queries like its database, from its cache when possible.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_querycache
+"""
+import contextlib
+import datetime
+import io
+import pathlib
+import sys
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from main import NEOShell, make_parser
+import querycache
+from querycache import QueryCache
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestQueryCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def setUp(self):
+        self.cache = QueryCache(self.db)
+
+    def assertSameAsDatabase(self, filters):
+        self.assertEqual(list(self.cache.query(filters)), list(self.db.query(filters)))
+
+    def test_repeated_query_is_a_hit(self):
+        filters = create_filters(distance_max=0.1, velocity_min=10)
+        expected = list(self.db.query(filters))
+        self.assertEqual(list(self.cache.query(filters)), expected)
+        with unittest.mock.patch.object(self.db, 'query') as query:
+            self.assertEqual(list(self.cache.query(create_filters(velocity_min=10, distance_max=0.1))),
+                             expected)
+            query.assert_not_called()
+        self.assertEqual((self.cache.hits, self.cache.refinements, self.cache.misses), (1, 0, 1))
+
+    def test_narrower_query_is_a_refinement(self):
+        self.assertSameAsDatabase(create_filters(start_date=datetime.date(2020, 3, 1), distance_max=0.2))
+        narrower = [
+            create_filters(start_date=datetime.date(2020, 4, 1), distance_max=0.2),
+            create_filters(start_date=datetime.date(2020, 3, 1), distance_max=0.1, hazardous=False),
+            create_filters(date=datetime.date(2020, 6, 1), distance_max=0.2, diameter_min=0.1),
+        ]
+        for filters in narrower:
+            expected = list(self.db.query(filters))
+            with unittest.mock.patch.object(self.db, 'query') as query:
+                self.assertEqual(list(self.cache.query(filters)), expected)
+                query.assert_not_called()
+        self.assertEqual(self.cache.refinements, 3)
+
+    def test_wider_query_is_a_miss(self):
+        self.assertSameAsDatabase(create_filters(distance_max=0.1))
+        self.assertSameAsDatabase(create_filters(distance_max=0.2))
+        self.assertSameAsDatabase(create_filters(velocity_min=5))
+        self.assertEqual((self.cache.hits, self.cache.refinements, self.cache.misses), (0, 0, 3))
+
+    def test_exclusive_bounds_are_not_refinements_of_each_other(self):
+        self.assertSameAsDatabase(create_filters(hazardous=True))
+        self.assertSameAsDatabase(create_filters(hazardous=False))
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_partially_consumed_short_results_are_cached(self):
+        filters = create_filters(hazardous=True, distance_max=0.05)
+        expected = list(self.db.query(filters))
+        self.assertLessEqual(len(expected), querycache._DRAIN_LIMIT)
+        results = self.cache.query(filters)
+        next(results)
+        results.close()
+        self.assertEqual(len(self.cache), 1)
+        with unittest.mock.patch.object(self.db, 'query') as query:
+            self.assertEqual(list(self.cache.query(filters)), expected)
+            query.assert_not_called()
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_partially_consumed_long_results_are_not_scanned_to_the_end(self):
+        generated = []
+        query = self.db.query
+        with unittest.mock.patch.object(self.db, 'query',
+                                        side_effect=lambda *args, **kwargs: (
+                                            generated.append(approach) or approach
+                                            for approach in query(*args, **kwargs))):
+            results = self.cache.query(create_filters())
+            next(results)
+            results.close()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(len(generated), querycache._DRAIN_LIMIT + 2)
+
+    def test_opaque_filters_bypass_the_cache(self):
+        self.assertSameAsDatabase([lambda approach: approach.distance < 0.1])
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.bypasses, 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        queries = [create_filters(date=datetime.date(2020, 1, day)) for day in (1, 2, 3)]
+        sizes = [sys.getsizeof(tuple(self.db.query(filters))) for filters in queries]
+        self.cache.max_bytes = sizes[1] + sizes[2]
+        for filters in queries:
+            self.assertSameAsDatabase(filters)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.nbytes, self.cache.max_bytes)
+        self.assertSameAsDatabase(queries[0])
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_results_over_the_budget_are_not_cached(self):
+        self.cache.max_bytes = sys.getsizeof(()) + 8
+        self.assertSameAsDatabase(create_filters())
+        self.assertEqual(len(self.cache), 0)
+
+    def test_clear(self):
+        self.assertSameAsDatabase(create_filters(distance_max=0.1))
+        self.cache.clear()
+        self.assertEqual((len(self.cache), self.cache.nbytes, self.cache.misses), (0, 0, 0))
+
+
+class TestShellCache(unittest.TestCase):
+    def setUp(self):
+        self.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        self.cache = QueryCache(self.db)
+        _parser, inspect_parser, query_parser = make_parser()
+        self.shell = NEOShell(self.db, inspect_parser, query_parser, cache=self.cache)
+
+    def test_repeated_limited_query_is_a_hit(self):
+        outputs = []
+        for _ in range(2):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                self.shell.onecmd('query --hazardous --max-distance 0.05 --limit 5')
+            outputs.append(stdout.getvalue())
+        self.assertEqual(len(outputs[0].splitlines()), 5)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual((len(self.cache), self.cache.hits, self.cache.misses), (1, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Check that changed data files are reloaded into a live `NEODatabase`.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_reloader
+"""
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from reloader import DataReloader
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestDataReloader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(TEST_NEO_FILE) as infile:
+            cls.neo_lines = infile.readlines()
+        with open(TEST_CAD_FILE) as infile:
+            cls.contents = json.load(infile)
+
+    def setUp(self):
+        self.root = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.neofile = self.root / 'neos.csv'
+        self.cadfile = self.root / 'cad.json'
+
+        # Start from all but the last NEOs and approaches, so some approaches have no NEO yet.
+        self.write(self.neo_lines[:-200], self.contents['data'][:-500])
+        self.db = NEODatabase(load_neos(self.neofile), load_approaches(self.cadfile))
+        self.reloader = DataReloader(self.db, self.neofile, self.cadfile)
+
+    def write(self, neo_lines, rows, indent=None):
+        with open(self.neofile, 'w') as outfile:
+            outfile.writelines(neo_lines)
+        with open(self.cadfile, 'w') as outfile:
+            json.dump({'signature': self.contents['signature'], 'count': str(len(rows)),
+                       'fields': self.contents['fields'], 'data': rows}, outfile, indent=indent)
+        # Make sure that the new contents have a new modification time.
+        for path in (self.neofile, self.cadfile):
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def assertMatchesFreshDatabase(self):
+        fresh = NEODatabase(load_neos(self.neofile), load_approaches(self.cadfile))
+        self.assertEqual([repr(approach) for approach in self.db.query()],
+                         [repr(approach) for approach in fresh.query()])
+        for neo in fresh._neos:
+            reloaded = self.db.get_neo_by_designation(neo.designation)
+            self.assertEqual(repr(reloaded), repr(neo))
+            self.assertEqual([repr(approach) for approach in reloaded.approaches],
+                             [repr(approach) for approach in neo.approaches])
+            if neo.name:
+                self.assertIs(self.db.get_neo_by_name(neo.name), reloaded)
+
+    def test_poll_without_changes(self):
+        self.assertIsNone(self.reloader.poll())
+
+    def test_poll_ingests_appended_records(self):
+        self.write(self.neo_lines, self.contents['data'])
+        summary = self.reloader.poll()
+        self.assertEqual(summary, {'neos_added': 200, 'neos_updated': 0,
+                                   'approaches_added': 500, 'approaches_updated': 0})
+        self.assertMatchesFreshDatabase()
+        self.assertIsNone(self.reloader.poll())
+
+    def test_poll_only_parses_appended_records(self):
+        steps = ((-100, -300), (-50, -1), (None, None))
+        for indent in (None, 2):
+            with self.subTest(indent=indent):
+                self.write(self.neo_lines[:-200], self.contents['data'][:-500], indent=indent)
+                self.db = NEODatabase(load_neos(self.neofile), load_approaches(self.cadfile))
+                self.reloader = DataReloader(self.db, self.neofile, self.cadfile)
+                for neo_stop, cad_stop in steps:
+                    self.write(self.neo_lines[:neo_stop], self.contents['data'][:cad_stop], indent=indent)
+                    with unittest.mock.patch('reloader.load_neos', side_effect=AssertionError), \
+                            unittest.mock.patch('reloader.load_approaches', side_effect=AssertionError), \
+                            unittest.mock.patch('extract._iter_cad_rows', side_effect=AssertionError):
+                        self.assertIsNotNone(self.reloader.poll())
+                self.assertMatchesFreshDatabase()
+                self.assertIsNone(self.reloader.poll())
+
+    def test_poll_parses_shrunk_files_in_full(self):
+        self.write(self.neo_lines[:-300], self.contents['data'][:-600])
+        summary = self.reloader.poll()
+        self.assertEqual(summary, {'neos_added': 0, 'neos_updated': 0,
+                                   'approaches_added': 0, 'approaches_updated': 0})
+        self.write(self.neo_lines, self.contents['data'])
+        self.reloader.poll()
+        self.assertMatchesFreshDatabase()
+
+    def test_poll_updates_changed_records(self):
+        rows = [list(row) for row in self.contents['data'][:-500]]
+        rows[10][4] = '0.5'
+        neo_lines = list(self.neo_lines[:-200])
+        fields = neo_lines[1].split(',')
+        fields[4], fields[7] = 'Renamed', 'Y' if fields[7] == 'N' else 'N'
+        neo_lines[1] = ','.join(fields)
+        self.write(neo_lines, rows)
+
+        summary = self.reloader.poll()
+        self.assertEqual(summary, {'neos_added': 0, 'neos_updated': 1,
+                                   'approaches_added': 0, 'approaches_updated': 1})
+        self.assertMatchesFreshDatabase()
+        self.assertIsNone(self.db.get_neo_by_name(self.neo_lines[1].split(',')[4]))
+
+    def test_poll_retries_malformed_files(self):
+        with open(self.cadfile, 'w') as outfile:
+            outfile.write('{"fields": ["des"], "data": [')
+        with self.assertRaises(ValueError):
+            self.reloader.poll()
+        self.write(self.neo_lines, self.contents['data'])
+        self.assertIsNotNone(self.reloader.poll())
+        self.assertMatchesFreshDatabase()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""Check that the HTTP server answers `query` and `inspect` requests.
+
+The server is started on an ephemeral localhost port, in a background thread,
+and is sent requests with `urllib`.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_server
+"""
+import datetime
+import json
+import pathlib
+import threading
+import unittest
+import unittest.mock
+import urllib.error
+import urllib.request
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from server import NEOServer
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.server = NEOServer(cls.db, ('127.0.0.1', 0))
+        cls.server.RequestHandlerClass.log_message = lambda *args: None
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = 'http://{}:{}'.format(*cls.server.server_address[:2])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get(self, path):
+        try:
+            with urllib.request.urlopen(self.url + path) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as err:
+            return err.code, json.load(err)
+
+    def test_query_matches_database(self):
+        status, response = self.get('/query?start-date=2020-03-01&end-date=2020-03-31&max-distance=0.1&limit=1000')
+        self.assertEqual(status, 200)
+        expected = list(self.db.query(create_filters(start_date=datetime.date(2020, 3, 1),
+                                                     end_date=datetime.date(2020, 3, 31),
+                                                     distance_max=0.1)))
+        self.assertGreater(len(expected), 0)
+        self.assertEqual([result['datetime_utc'] for result in response['results']],
+                         [approach.time_str for approach in expected])
+
+    def test_query_with_flags_and_limit(self):
+        status, response = self.get('/query?not-hazardous=true&limit=3')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(response['results']), 3)
+        for result in response['results']:
+            self.assertFalse(result['neo']['potentially_hazardous'])
+
+    def test_query_with_false_flags_ignores_them(self):
+        expected = self.get('/query?limit=20')[1]['results']
+        for path in ('/query?hazardous=false&limit=20', '/query?not-hazardous=false&limit=20',
+                     '/query?hazardous=false&not-hazardous=false&limit=20'):
+            with self.subTest(path=path):
+                status, response = self.get(path)
+                self.assertEqual(status, 200)
+                self.assertEqual(response['results'], expected)
+
+        status, response = self.get('/query?hazardous=true&not-hazardous=false&limit=5')
+        self.assertEqual(status, 200)
+        self.assertTrue(all(result['neo']['potentially_hazardous'] for result in response['results']))
+
+    def test_query_without_limit_is_limited_to_10_results(self):
+        for path in ('/query', '/query?limit=0'):
+            with self.subTest(path=path):
+                status, response = self.get(path)
+                self.assertEqual(status, 200)
+                self.assertEqual([result['datetime_utc'] for result in response['results']],
+                                 [approach.time_str for approach in list(self.db.query())[:10]])
+
+    def test_query_sorted_by_distance(self):
+        status, response = self.get('/query?sort-by=distance&limit=5')
+        self.assertEqual(status, 200)
+        expected = sorted(self.db.query(), key=lambda approach: approach.distance)[:5]
+        self.assertEqual([result['distance_au'] for result in response['results']],
+                         [approach.distance for approach in expected])
+
+    def test_query_rejects_bad_parameters(self):
+        self.assertEqual(self.get('/query?date=2020-13-01')[0], 400)
+        self.assertEqual(self.get('/query?sort-by=name')[0], 400)
+        self.assertEqual(self.get('/query?min-speed=3')[0], 400)
+        self.assertEqual(self.get('/query?hazardous=true&not-hazardous=true')[0], 400)
+
+    def test_unexpected_errors_are_internal_server_errors(self):
+        with unittest.mock.patch.object(self.db, 'query', side_effect=RuntimeError("broken")):
+            status, response = self.get('/query?limit=3')
+        self.assertEqual(status, 500)
+        self.assertEqual(response, {'error': "Internal server error."})
+        self.assertEqual(self.get('/query?limit=3')[0], 200)
+
+    def test_inspect(self):
+        status, response = self.get('/inspect?name=Adonis&verbose=true')
+        self.assertEqual(status, 200)
+        self.assertEqual(response['neo']['designation'], '2101')
+        self.assertEqual(len(response['approaches']), len(self.db.get_neo_by_name('Adonis').approaches))
+
+        status, response = self.get('/inspect?pdes=2020%20BS')
+        self.assertEqual(status, 200)
+        self.assertIsNone(response['neo']['diameter_km'])
+        self.assertNotIn('approaches', response)
+
+    def test_inspect_missing(self):
+        self.assertEqual(self.get('/inspect?pdes=not-real-designation')[0], 404)
+        self.assertEqual(self.get('/inspect')[0], 400)
+
+    def test_concurrent_requests(self):
+        statuses = []
+        threads = [threading.Thread(target=lambda: statuses.append(self.get('/query?limit=50')[0]))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(statuses, [200] * 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Check that snapshots of an `NEODatabase` are saved, reused and invalidated.
+
+A snapshot should be reused only for as long as the data files it was built
+from are unchanged, and it should faithfully reproduce the linked database.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_snapshot
+"""
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+import snapshot
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.root = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.neofile = self.root / 'neos.csv'
+        self.cadfile = self.root / 'cad.json'
+        shutil.copy(TEST_NEO_FILE, self.neofile)
+        shutil.copy(TEST_CAD_FILE, self.cadfile)
+        self.cache_root = self.root / 'cache'
+
+    def load(self, **kwargs):
+        return snapshot.load_database(self.neofile, self.cadfile, cache_root=self.cache_root, **kwargs)
+
+    def test_snapshot_reproduces_the_linked_database(self):
+        built = self.load()
+        with unittest.mock.patch('snapshot.load_approaches') as loader:
+            loaded = self.load()
+        loader.assert_not_called()
+
+        self.assertIsNot(built, loaded)
+        self.assertIsInstance(loaded, NEODatabase)
+        self.assertEqual([repr(a) for a in built.query()], [repr(a) for a in loaded.query()])
+        adonis = loaded.get_neo_by_designation('2101')
+        self.assertIsNotNone(adonis)
+        for approach in adonis.approaches:
+            self.assertIs(approach.neo, adonis)
+
+    def test_snapshot_is_invalidated_when_a_data_file_changes(self):
+        self.load()
+        stat = self.cadfile.stat()
+        os.utime(self.cadfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        with unittest.mock.patch('snapshot.load_approaches', wraps=snapshot.load_approaches) as loader:
+            self.load()
+        loader.assert_called_once()
+
+    def test_rebuild_ignores_a_valid_snapshot(self):
+        self.load()
+        with unittest.mock.patch('snapshot.load_approaches', wraps=snapshot.load_approaches) as loader:
+            self.load(rebuild=True)
+        loader.assert_called_once()
+
+    def test_no_cache_neither_reads_nor_writes_snapshots(self):
+        self.load(use_cache=False)
+        self.assertFalse(self.cache_root.exists())
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        self.load()
+        for path in self.cache_root.iterdir():
+            path.write_bytes(b'not a pickle')
+        database = self.load()
+        self.assertEqual(len(tuple(database.query())), 4700)
+
+
+if __name__ == '__main__':
+    unittest.main()
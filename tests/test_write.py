@@ -20,14 +20,22 @@ import csv
 import datetime
 import io
 import json
+import math
 import pathlib
+import shutil
+import tempfile
 import unittest
 import unittest.mock
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 from extract import load_neos, load_approaches
 from database import NEODatabase
-from write import write_to_csv, write_to_json
+from write import write_to_csv, write_to_json, write_to_ndjson, write_to_npz, json_record
 
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -132,6 +140,43 @@ class TestWriteToCSV(unittest.TestCase):
         self.assertSetEqual(set(fieldnames), set(rows[0].keys()))
 
 
+class TestWriteToCSVBatched(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(None)
+
+    @unittest.mock.patch('write.open')
+    def write(self, results, mock_file):
+        with UncloseableStringIO() as buf:
+            mock_file.return_value = buf
+            write_to_csv(results, None)
+            buf.seek(0)
+            return buf.getvalue()
+
+    def test_csv_output_matches_dict_writer(self):
+        fieldnames = ('datetime_utc', 'distance_au', 'velocity_km_s',
+                      'designation', 'name', 'diameter_km', 'potentially_hazardous')
+        expected = io.StringIO()
+        writer = csv.DictWriter(expected, fieldnames=fieldnames)
+        writer.writeheader()
+        for approach in self.results:
+            neo = approach.neo
+            writer.writerow({
+                'datetime_utc': datetime.datetime.strftime(approach.time, '%Y-%m-%d %H:%M'),
+                'distance_au': approach.distance,
+                'velocity_km_s': approach.velocity,
+                'designation': neo.designation,
+                'name': neo.name if neo.name else '',
+                'diameter_km': neo.diameter if neo.diameter else '',
+                'potentially_hazardous': neo.hazardous,
+            })
+        self.assertEqual(self.write(self.results), expected.getvalue())
+
+    def test_csv_output_consumes_an_iterator(self):
+        expected = self.write(self.results[:10])
+        self.assertEqual(self.write(iter(self.results[:10])), expected)
+
+
 class TestWriteToJSON(unittest.TestCase):
     @classmethod
     @unittest.mock.patch('write.open')
@@ -226,5 +271,100 @@ class TestWriteToJSON(unittest.TestCase):
         self.assertIsInstance(approach['neo']['potentially_hazardous'], bool)
 
 
+class TestWriteToJSONStreaming(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(5)
+
+    @unittest.mock.patch('write.open')
+    def write(self, results, mock_file, **kwargs):
+        with UncloseableStringIO() as buf:
+            mock_file.return_value = buf
+            write_to_json(results, None, **kwargs)
+            buf.seek(0)
+            return buf.getvalue()
+
+    def test_json_output_matches_json_dump(self):
+        expected = json.dumps([json_record(approach) for approach in self.results], indent=2)
+        self.assertEqual(self.write(self.results), expected)
+
+    def test_json_output_of_no_results(self):
+        self.assertEqual(self.write(()), '[]')
+        self.assertEqual(self.write((), compact=True), '[]')
+
+    def test_json_output_consumes_an_iterator(self):
+        expected = self.write(self.results)
+        self.assertEqual(self.write(iter(self.results)), expected)
+
+    def test_compact_json_output_has_no_whitespace_between_tokens(self):
+        value = self.write(self.results, compact=True)
+        self.assertNotIn('\n', value)
+        self.assertNotIn('": ', value)
+        self.assertEqual(value, json.dumps([json_record(approach) for approach in self.results],
+                                           separators=(',', ':')))
+
+
+class TestWriteToNDJSON(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(5)
+
+    @unittest.mock.patch('write.open')
+    def write(self, results, mock_file):
+        with UncloseableStringIO() as buf:
+            mock_file.return_value = buf
+            write_to_ndjson(results, None)
+            buf.seek(0)
+            return buf.getvalue()
+
+    def test_ndjson_output_has_one_record_per_line(self):
+        lines = self.write(self.results).splitlines()
+        self.assertEqual(len(lines), 5)
+        for line, approach in zip(lines, self.results):
+            self.assertEqual(line, json.dumps(json_record(approach), separators=(',', ':')))
+
+    def test_ndjson_output_ends_each_line(self):
+        value = self.write(self.results)
+        self.assertTrue(value.endswith('\n'))
+        self.assertEqual(self.write(()), '')
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed.")
+class TestWriteToNPZ(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(None)
+
+    def setUp(self):
+        self.root = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def write(self, results):
+        path = self.root / 'results.npz'
+        write_to_npz(results, path)
+        with numpy.load(path) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    def test_npz_columns_match_approaches(self):
+        columns = self.write(iter(self.results))
+        self.assertEqual(len(columns['distance_au']), len(self.results))
+        for index, approach in enumerate(self.results):
+            self.assertEqual(columns['datetime_utc'][index].astype(datetime.datetime), approach.time)
+            self.assertEqual(columns['distance_au'][index], approach.distance)
+            self.assertEqual(columns['velocity_km_s'][index], approach.velocity)
+            self.assertEqual(columns['designation'][index], approach.neo.designation)
+            self.assertEqual(columns['potentially_hazardous'][index], approach.neo.hazardous)
+            if math.isnan(approach.neo.diameter):
+                self.assertTrue(math.isnan(columns['diameter_km'][index]))
+            else:
+                self.assertEqual(columns['diameter_km'][index], approach.neo.diameter)
+
+    def test_npz_output_of_no_results(self):
+        columns = self.write(())
+        self.assertEqual(set(columns), {'datetime_utc', 'distance_au', 'velocity_km_s', 'designation',
+                                        'diameter_km', 'potentially_hazardous'})
+        self.assertTrue(all(len(column) == 0 for column in columns.values()))
+
+
 if __name__ == '__main__':
     unittest.main()
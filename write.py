@@ -1,23 +1,43 @@
-"""Write a stream of close approaches to CSV or to JSON.
+"""Write a stream of close approaches to CSV, to JSON, to NDJSON or to NPZ.
 
-This module provides two functions: `write_to_csv` and `write_to_json`. Each function
-takes an iterable of `CloseApproach` objects and a file path to write the data.
+This module provides four functions: `write_to_csv`, `write_to_json`, `write_to_ndjson`
+and `write_to_npz`. Each function takes an iterable of `CloseApproach` objects and a
+file path to write the data. The `json_record` function describes a single approach
+in the JSON output format.
 
 The file extension determines which function is invoked by the main module. The
-output format is specified in `README.md`.
+CSV and JSON output formats are specified in `README.md`. NDJSON output holds one
+compact JSON record per line, and NPZ output holds NumPy arrays of the numeric
+columns; NumPy is an optional dependency, only required to write NPZ output.
 
 You'll edit this file in Part 4.
 """
 
 import csv
+import itertools
 import json
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The number of rows written to a CSV file at a time, and the size of its output buffer.
+_CSV_BATCH_SIZE = 4096
+_CSV_BUFFER_SIZE = 1 << 20
+
+# The day ordinal of the Unix epoch, from which NPZ timestamps are counted.
+_EPOCH_DAY = 719163
+
 def write_to_csv(results, filename):
     """Write an iterable of `CloseApproach` objects to a CSV file.
 
     Each row in the CSV file corresponds to a single close approach and its associated
     near-Earth object. The output file includes columns for approach details and NEO attributes.
 
+    The NEO columns are computed once per `NearEarthObject` and shared by the rows of
+    all of its approaches, and rows are written in batches through a large buffer.
+
     :param results: An iterable of `CloseApproach` objects to be written to the CSV file.
     :param filename: A file path where the CSV data will be saved.
     """
@@ -26,43 +46,131 @@ def write_to_csv(results, filename):
         'designation', 'name', 'diameter_km', 'potentially_hazardous'
     )
 
-    with open(filename, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for approach in results:
-            writer.writerow({
-                'datetime_utc': approach.time_str,
-                'distance_au': approach.distance,
-                'velocity_km_s': approach.velocity,
-                'designation': approach._designation,
-                'name': approach.neo.name if approach.neo.name else '',
-                'diameter_km': approach.neo.diameter if approach.neo.diameter else '',
-                'potentially_hazardous': 'True' if approach.neo.hazardous else 'False'
-            })
-
-def write_to_json(results, filename):
+    with open(filename, 'w', newline='', buffering=_CSV_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+
+        # The `designation`, `name`, `diameter_km` and `potentially_hazardous` columns, by NEO.
+        neo_columns = {}
+        results = iter(results)
+        while True:
+            rows = []
+            for approach in itertools.islice(results, _CSV_BATCH_SIZE):
+                neo = approach.neo
+                columns = neo_columns.get(neo)
+                if columns is None:
+                    columns = neo_columns[neo] = (
+                        neo.designation,
+                        neo.name if neo.name else '',
+                        neo.diameter if neo.diameter else '',
+                        'True' if neo.hazardous else 'False',
+                    )
+                rows.append((approach.time_str, approach.distance, approach.velocity) + columns)
+            if not rows:
+                break
+            writer.writerows(rows)
+
+def json_record(approach):
+    """Describe a `CloseApproach` and its NEO as a JSON-serializable dictionary.
+
+    :param approach: A `CloseApproach` object, linked to its NEO.
+    :return: A dictionary in the format of the elements written by `write_to_json`.
+    """
+    return {
+        'datetime_utc': approach.time_str,
+        'distance_au': approach.distance,
+        'velocity_km_s': approach.velocity,
+        'neo': {
+            'designation': approach._designation,
+            'name': approach.neo.name if approach.neo.name else '',
+            'diameter_km': approach.neo.diameter if approach.neo.diameter else '',
+            'potentially_hazardous': approach.neo.hazardous,
+        }
+    }
+
+def write_to_json(results, filename, compact=False):
     """Write an iterable of `CloseApproach` objects to a JSON file.
 
     The JSON file will contain a list of dictionaries, each representing a close approach
     with its details and the associated near-Earth object attributes.
 
+    The list is written one element at a time as `results` is consumed, so memory use
+    doesn't grow with the number of results. The output is identical to that of
+    `json.dump(data, jsonfile, indent=2)` on the full list of elements.
+
     :param results: An iterable of `CloseApproach` objects to be written to the JSON file.
     :param filename: A file path where the JSON data will be saved.
+    :param compact: Whether to omit all indentation and whitespace, for machine consumers.
     """
-    data = []
-    for approach in results:
-        data.append({
-            'datetime_utc': approach.time_str,
-            'distance_au': approach.distance,
-            'velocity_km_s': approach.velocity,
-            'neo': {
-                'designation': approach._designation,
-                'name': approach.neo.name if approach.neo.name else '',
-                'diameter_km': approach.neo.diameter if approach.neo.diameter else '',
-                'potentially_hazardous': approach.neo.hazardous,
-            }
-        })
+    if compact:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+        opening, separator, closing = '[', ',', ']'
+    else:
+        encoder = json.JSONEncoder(indent=2)
+        opening, separator, closing = '[\n  ', ',\n  ', '\n]'
 
     with open(filename, 'w') as jsonfile:
-        json.dump(data, jsonfile, indent=2)
+        delimiter = opening
+        for approach in results:
+            text = encoder.encode(json_record(approach))
+            if not compact:
+                # Nest the element's lines one level deeper, inside the list.
+                text = text.replace('\n', '\n  ')
+            jsonfile.write(delimiter)
+            jsonfile.write(text)
+            delimiter = separator
+        jsonfile.write('[]' if delimiter is opening else closing)
+
+def write_to_ndjson(results, filename):
+    """Write an iterable of `CloseApproach` objects to a newline-delimited JSON file.
+
+    Each line of the file holds one compact JSON object, in the format of the elements
+    written by `write_to_json`, so downstream tools can process the file line by line.
+
+    :param results: An iterable of `CloseApproach` objects to be written to the NDJSON file.
+    :param filename: A file path where the NDJSON data will be saved.
+    """
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    with open(filename, 'w', buffering=_CSV_BUFFER_SIZE) as ndjsonfile:
+        for approach in results:
+            ndjsonfile.write(encoder.encode(json_record(approach)))
+            ndjsonfile.write('\n')
+
+def write_to_npz(results, filename):
+    """Write an iterable of `CloseApproach` objects to a NumPy `.npz` archive of columns.
+
+    The archive holds one array per column, each with one element per close approach:
+
+    - `datetime_utc`: the approach times, as `datetime64[m]` values.
+    - `distance_au` and `velocity_km_s`: the approach distances and velocities.
+    - `designation`: the primary designations of the NEOs, as a Unicode array.
+    - `diameter_km`: the NEO diameters, NaN where unknown.
+    - `potentially_hazardous`: whether the NEOs are potentially hazardous.
+
+    No value is formatted as a string, except for the designations, and the archive
+    loads with `numpy.load` without any parsing.
+
+    :param results: An iterable of `CloseApproach` objects to be written to the NPZ file.
+    :param filename: A file path where the NPZ data will be saved.
+    :raise ImportError: If NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError("Writing NPZ output requires NumPy. Install it with `pip install numpy`.")
+    approaches = list(results)
+    count = len(approaches)
+    minutes = np.fromiter(((approach.day - _EPOCH_DAY) * 1440 + approach._minute
+                           for approach in approaches), dtype=np.int64, count=count)
+    columns = {
+        'datetime_utc': minutes.astype('datetime64[m]'),
+        'distance_au': np.fromiter((approach.distance for approach in approaches),
+                                   dtype=np.float64, count=count),
+        'velocity_km_s': np.fromiter((approach.velocity for approach in approaches),
+                                     dtype=np.float64, count=count),
+        'designation': np.array([approach._designation for approach in approaches], dtype=np.str_),
+        'diameter_km': np.fromiter((approach.neo.diameter for approach in approaches),
+                                   dtype=np.float64, count=count),
+        'potentially_hazardous': np.fromiter((approach.neo.hazardous for approach in approaches),
+                                             dtype=np.bool_, count=count),
+    }
+    with open(filename, 'wb') as npzfile:
+        np.savez(npzfile, **columns)